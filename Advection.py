@@ -8,25 +8,32 @@ Documented by: Daniel Becerra Pedraza
 """
 
 import numpy as np
-from Coefficients import Coefficients
+from Coefficients import Coefficients, CartesianCoefficients
+from Mesh import faceWeights
+import Kernels
 
 class Advection1D(Coefficients):
     """
     Clase que modela la parte Advectiva, hereda atributos y métodos de Coefficients.
     """
-    def __init__(self, nvx = None, rho = None, dx = None):
+    def __init__(self, nvx = None, rho = None, dx = None, coefficients = None):
         """
         Constructor de la clase.
         
         @param nvx: número de volúmenes [nulo por defecto]
         @param rho: densidad [nulo por defecto]
-        @param dx: valor de los intervalos en x  [nulo por defecto]
+        @param dx: valor de los intervalos en x, o arreglo de anchos (tamaño nvx, ver Mesh.delta) en una malla no uniforme [nulo por defecto]
+        @param coefficients: objeto Coefficients (private = True) en cuyos arreglos se escribirán los coeficientes [nulo por defecto]
         """
-        super().__init__(nvx)
+        super().__init__(nvx, coefficients = coefficients)
         self.__nvx = nvx
         self.__rho = rho
         self.__dx = dx
+        self.__weights = None
+        if np.ndim(dx) and np.ptp(dx[1:-1]) > 0:
+            self.__weights = faceWeights(dx)
         self.__u = np.zeros(nvx-1)
+        self.__uCopy = self.__u.copy()
 
     def __del__(self):
         """
@@ -47,6 +54,9 @@ class Advection1D(Coefficients):
             self.__u.fill(u)
         else:
             self.__u = u
+        if not np.array_equal(self.__u, self.__uCopy):
+            self.__uCopy = np.array(self.__u)
+            self.touch()
 
     def u(self):
         """
@@ -60,36 +70,310 @@ class Advection1D(Coefficients):
         """
         Método que calcula la parte advectiva de los coeficientes que aparecerán en la matriz que se resolverá.
         Nota: para los métodos UpWind de segundo orden y QUICK se ajustó en este método el valor de los coeficientes de los volúmenes afectados por las fronteras.
+        El cálculo se hace con operaciones sobre arreglos completos (ver advectionCoef).
+        En una malla no uniforme sólo se pueden usar diferencias centradas y UpW.
         
         @param typeAp: Tipo de aproximación que se usará para resolver la parte advectiva [se usará Diferencias centradas por defecto]
         @param phiA: valor de la propiedad en la frontera izquierda [0 por defecto]
         @param phiB: valor de la propiedad en la frontera derecha [0 por defecto]
         @param D: valor definido por gamma entre delta x [0 por defecto]
         """
-        aE = self.aE()
-        aW = self.aW()
-        aEE = self.aEE()
-        aWW = self.aWW()
-        aP = self.aP()
-        u = self.__u
-        rho = self.__rho
-        Su = self.Su()
-        
-        if typeAp == 'UpW': 
-            for i in range(1,self.__nvx-1):
-                # Upwind
-                CE = max((-u[i],0)) 
-                CW = max((u[i-1],0))
-                aE[i] += CE 
+        if self.__weights is not None and typeAp in ('UpW2', 'QUICK'):
+            raise ValueError('El esquema {} sólo está implementado para mallas uniformes'.format(typeAp))
+        advectionCoef(self.aP(), self.aE(), self.aW(), self.aEE(), self.aWW(), self.Su(),
+                      self.__u, self.__rho, typeAp, phiA, phiB, D, self.__weights)
+
+def advectionCoef(aP, aE, aW, aEE, aWW, Su, u, rho, typeAp = '', phiA = 0, phiB = 0, D = 0, weights = None):
+    """
+    Función vectorizada que suma la parte advectiva a los coeficientes para los
+    esquemas de Advection1D.calcCoef. Los casos especiales de los volúmenes
+    i == 2 e i == nvx-3 se manejan con máscaras sobre el signo de u.
+    Los arreglos pueden ser de tamaño (nvx,) o (m, nvx) para calcular m problemas
+    a la vez; en ese caso rho, phiA, phiB y D pueden ser escalares o de tamaño (m,).
+    
+    @param aP, aE, aW, aEE, aWW, Su: arreglos de coeficientes que se actualizan
+    @param u: velocidades en las caras, de tamaño (nvx-1,) o (m, nvx-1)
+    @param rho: densidad
+    @param typeAp: 'UpW', 'UpW2', 'QUICK' o diferencias centradas ['' por defecto]
+    @param phiA: valor de la propiedad en la frontera izquierda [0 por defecto]
+    @param phiB: valor de la propiedad en la frontera derecha [0 por defecto]
+    @param D: valor definido por gamma entre delta x [0 por defecto]
+    @param weights: pesos de interpolación en las caras para diferencias centradas en una malla no uniforme (ver Mesh.faceWeights) [nulo por defecto: 1/2]
+    """
+    k = Kernels.kernel('advection')
+    if k is not None and aP.ndim == 1 and weights is None:
+        k(aP, aE, aW, aEE, aWW, Su, u, float(rho), Kernels.schemes.get(typeAp, 0),
+          float(phiA), float(phiB), float(D))
+        return
+    nvx = aP.shape[-1]
+    r = np.asarray(rho, dtype = float)
+    rc = r[..., None] if r.ndim else r
+    if typeAp == 'QUICK':
+        s = slice(2, nvx-2)
+        uE = u[..., 2:nvx-2]
+        uW = u[..., 1:nvx-3]
+        f = 0.125
+    else:
+        s = slice(1, nvx-1)
+        uE = u[..., 1:nvx-1]
+        uW = u[..., 0:nvx-2]
+        f = 0.5
+    if typeAp == 'UpW':
+        CE = np.maximum(-uE, 0)
+        CW = np.maximum(uW, 0)
+        aE[..., s] += CE
+        aW[..., s] += CW
+        aP[..., s] += CE + CW + rc * (uE - uW)
+    elif typeAp == 'UpW2' or typeAp == 'QUICK':
+        CE = np.maximum(rc*uE*f, 0)
+        CW = np.maximum(rc*uW*f, 0)
+        CEn = -np.maximum(-rc*uE*f, 0)
+        CWn = -np.maximum(-rc*uW*f, 0)
+        if typeAp == 'UpW2':
+            aE[..., s] += -3*CEn-CWn
+            aW[..., s] += CE+3*CW
+            aEE[..., s] += CEn
+            aWW[..., s] += -CW
+            aP[..., s] += CE + 2*CW -2*CEn - CWn + rc * (uE - uW)
+        else:
+            aE[..., s] += -3*CE - 6*CEn - CWn
+            aW[..., s] += 6*CW + CE + 3*CWn
+            aEE[..., s] += CEn
+            aWW[..., s] += -CW
+            aP[..., s] += - 2*CE + 5*CW - 5*CEn + 2*CWn + rc * (uE - uW)
+#
+# Volúmenes vecinos a las fronteras (i == 2 y i == nvx-3), sólo en los
+# problemas en que la velocidad tiene el signo indicado y si el volumen
+# está entre los que se calcularon (en mallas muy pequeñas puede no estar)
+#
+        if s.start <= 2 < s.stop:
+            i = 2 - s.start
+            mask = u[..., 2] > 0
+            CW2 = CW[..., i]
+            aW2 = np.where(mask, aW[..., 2] + CW2, aW[..., 2])
+            aW[..., 2] = aW2
+            if typeAp == 'QUICK':
+                aP[..., 2] = np.where(mask, aW2 + aE[..., 2] - 2*CW2, aP[..., 2])
+            Su[..., 2] = np.where(mask, Su[..., 2] + - 2*CW2*phiA, Su[..., 2])
+        if s.start <= nvx-3 < s.stop:
+            i = nvx-3 - s.start
+            mask = u[..., nvx-3] < 0
+            CEn3 = CEn[..., i]
+            aE3 = np.where(mask, aE[..., nvx-3] - CEn3, aE[..., nvx-3])
+            aE[..., nvx-3] = aE3
+            if typeAp == 'QUICK':
+                aP[..., nvx-3] = np.where(mask, aW[..., nvx-3] + aE3 + 2*CEn3, aP[..., nvx-3])
+            Su[..., nvx-3] = np.where(mask, Su[..., nvx-3] + 2*CEn3*phiB, Su[..., nvx-3])
+        if typeAp == 'UpW2':
+            #fronteras:
+            # Primer nodo
+            aP[..., 1] += aW[..., 1] + 3*aWW[..., 1]
+            Su[..., 1] += (2 * aW[..., 1] + 4 * aWW[..., 1]) * phiA
+            # Último nodo
+            aP[..., -2] += aE[..., -2] + 3 * aEE[..., -2]
+            Su[..., -2] += (2 * aE[..., -2] + 4 * aEE[..., -2]) * phiB
+        else:
+            #fronteras (estos cálculos se ajustan al esquema abordado en el libro Malalasekera):
+            # Primer nodo
+            CE1 = np.maximum(r*u[..., 1]*0.125, 0)
+            CW1 = np.maximum(r*u[..., 0]*0.125, 0)
+            CEn1 = -np.maximum(-r*u[..., 1]*0.125, 0)
+            CWn1 = -np.maximum(-r*u[..., 0]*0.125, 0)
+            aE[..., 1] += D/3 - 3*CE1 - 6*CEn1
+            aEE[..., 1] += CEn1
+            Sp1 = -(8*D/3 + 2*CE1 + 8*CW1 + 8*CWn1)
+            aP[..., 1] = aE[..., 1] + aEE[..., 1] -Sp1
+            Su[..., 1] += - Sp1 * phiA
+            # Último nodo
+            CEn = np.maximum(r*u[..., -2]*0.125, 0)
+            CWn = np.maximum(r*u[..., -3]*0.125, 0)
+            CEnn = -np.maximum(-r*u[..., -2]*0.125, 0)
+            CWnn = -np.maximum(-r*u[..., -3]*0.125, 0)
+            aW[..., -2] += D/3 + 6*CWn + 3*CWnn
+            aWW[..., -2] += -CWn
+            Spn = -(8*D/3 - 8*CEn - 8*CEnn -2*CWnn)
+            aP[..., -2] = aW[..., -2] + aWW[..., -2] -Spn
+            Su[..., -2] += -Spn * phiB
+    else:
+        # Diferencias Centradas
+        if weights is None:
+            CE = - rc * uE * 0.5
+            CW =   rc * uW * 0.5
+        else:
+            CE = - rc * uE * (1 - weights[..., 1:nvx-1])
+            CW =   rc * uW * weights[..., 0:nvx-2]
+        aE[..., s] += CE
+        aW[..., s] += CW
+        aP[..., s] += CE + CW + rc * (uE - uW)
+
+class _CartesianAdvection(CartesianCoefficients):
+    """
+    Parte Advectiva en una malla cartesiana; base de Advection2D y Advection3D.
+    """
+
+    def __init__(self, volumes, deltas, rho, coefficients):
+        super().__init__(volumes, deltas, coefficients = coefficients)
+        self.__rho = rho
+        nv = self.volumes()
+        self.__shapes = [nv[:a] + (nv[a] - 1,) + nv[a+1:] for a in range(len(nv))]
+        self.__u = tuple(np.zeros(shape) for shape in self.__shapes)
+        self.__weights = [faceWeights(w) if np.ptp(w[1:-1]) > 0 else None for w in self.widths()]
+
+    def setU(self, *u):
+        """
+        Método para asignar las velocidades en las caras, una componente por eje.
+        La componente del eje a tiene tamaño nv[a] - 1 en ese eje (una por cara)
+        y nv[b] en los demás; también puede ser un escalar.
+
+        @param u: componentes u, v[, w] de la velocidad
+        """
+        if len(u) != self.dim():
+            raise ValueError('Se requieren {} componentes de la velocidad'.format(self.dim()))
+        u = tuple(np.array(np.broadcast_to(c, shape), dtype = float) for c, shape in zip(u, self.__shapes))
+        if not all(np.array_equal(a, b) for a, b in zip(u, self.__u)):
+            self.__u = u
+            self.touch()
+
+    def u(self):
+        """
+        Método que regresa las componentes de la velocidad en las caras.
+
+        @return: tupla (u, v[, w])
+        """
+        return self.__u
+
+    def calcCoef(self, typeAp = ''):
+        """
+        Método que calcula la parte advectiva de los coeficientes (ver cartesianAdvectionCoef).
+        En 2D y 3D sólo se pueden usar diferencias centradas y UpW.
+
+        @param typeAp: 'UpW' o diferencias centradas ['' por defecto]
+        """
+        if typeAp in ('UpW2', 'QUICK'):
+            raise ValueError('El esquema {} sólo está implementado en 1D'.format(typeAp))
+        cartesianAdvectionCoef(self, self.__u, self.__rho, typeAp, self.__weights)
+
+class Advection2D(_CartesianAdvection):
+    """
+    Clase que modela la parte Advectiva en una malla cartesiana de 2 dimensiones,
+    hereda atributos y métodos de CartesianCoefficients.
+    """
+
+    def __init__(self, nvx = None, nvy = None, rho = None, dx = None, dy = None, coefficients = None):
+        """
+        Constructor de la clase.
+
+        @param nvx: número de volúmenes en x [nulo por defecto]
+        @param nvy: número de volúmenes en y [nulo por defecto]
+        @param rho: densidad [nulo por defecto]
+        @param dx: valor de los intervalos en x o arreglo de anchos [nulo por defecto]
+        @param dy: valor de los intervalos en y o arreglo de anchos [nulo por defecto]
+        @param coefficients: objeto CartesianCoefficients en cuyos arreglos se escribirán los coeficientes [nulo por defecto]
+        """
+        super().__init__((nvx, nvy), (dx, dy), rho, coefficients)
+
+class Advection3D(_CartesianAdvection):
+    """
+    Clase que modela la parte Advectiva en una malla cartesiana de 3 dimensiones,
+    hereda atributos y métodos de CartesianCoefficients.
+    """
+
+    def __init__(self, nvx = None, nvy = None, nvz = None, rho = None, dx = None, dy = None, dz = None, coefficients = None):
+        """
+        Constructor de la clase.
+
+        @param nvx, nvy, nvz: número de volúmenes en x, y, z [nulo por defecto]
+        @param rho: densidad [nulo por defecto]
+        @param dx, dy, dz: valor de los intervalos en x, y, z o arreglos de anchos [nulo por defecto]
+        @param coefficients: objeto CartesianCoefficients en cuyos arreglos se escribirán los coeficientes [nulo por defecto]
+        """
+        super().__init__((nvx, nvy, nvz), (dx, dy, dz), rho, coefficients)
+
+def cartesianAdvectionCoef(coef, u, rho, typeAp = '', weights = None):
+    """
+    Función vectorizada que suma la parte advectiva a los coeficientes de una
+    malla cartesiana. En cada eje se calcula el flujo F = rho u A en todas las
+    caras a la vez y se reparte como en advectionCoef (UpW o diferencias
+    centradas), así que el costo es lineal en el número de volúmenes.
+
+    @param coef: objeto CartesianCoefficients
+    @param u: componentes de la velocidad en las caras (ver _CartesianAdvection.setU)
+    @param rho: densidad
+    @param typeAp: 'UpW' o diferencias centradas ['' por defecto]
+    @param weights: pesos de interpolación en las caras de cada eje, o nulo si el eje es uniforme [nulo por defecto]
+    """
+    aP = coef.aP()
+    dim = coef.dim()
+    for axis, n in enumerate(coef.volumes()):
+        def cut(a, b):
+            return tuple(slice(a, b) if k == axis else slice(None) for k in range(dim))
+        F = rho * u[axis] * coef.area(axis)
+        FE = F[cut(1, n-1)]
+        FW = F[cut(0, n-2)]
+        if typeAp == 'UpW':
+            CE = np.maximum(-FE, 0)
+            CW = np.maximum(FW, 0)
+        elif weights is None or weights[axis] is None:
+            CE = - FE * 0.5
+            CW =   FW * 0.5
+        else:
+            w = weights[axis].reshape((1,) * axis + (-1,) + (1,) * (dim - axis - 1))
+            CE = - FE * (1 - w[cut(1, n-1)])
+            CW =   FW * w[cut(0, n-2)]
+        aHigh, aLow = coef.neighbors(axis)
+        s = cut(1, n-1)
+        aHigh[s] += CE
+        aLow[s] += CW
+        aP[s] += CE + CW + (FE - FW)
+
+if __name__ == '__main__':
+    
+    nx = 5
+    u = np.sin(np.linspace(0,1,nx))
+#    u = np.ones(nx)
+    print('-' * 20)  
+    print(u)
+    print('-' * 20)  
+
+    af1 = Advection1D(6, 1, 1)
+    af1.alloc(6)
+    af1.setU(u)
+    print(af1.u())
+    print('-' * 20)  
+
+    af1.calcCoef()
+    print(af1.aP(), af1.aE(), af1.aW(), af1.aEE(), af1.aWW(), af1.Su(), sep = '\n')
+    print('-' * 20)
+    
+    af1.calcCoef('QUICK')
+    print(af1.aP(), af1.aE(), af1.aW(), af1.aEE(), af1.aWW(), af1.Su(), sep = '\n')
+    print('-' * 20) 
+
+    af1.bcDirichlet('LEFT_WALL', 2)
+    af1.bcDirichlet('RIGHT_WALL', 1)
+    print(af1.aP(), af1.aE(), af1.aW(), af1.aEE(), af1.aWW(), af1.Su(), sep = '\n')
+    print('-' * 20)
+
+#
+# Comparación con el ciclo original de calcCoef en mallas pequeñas, con
+# todos los esquemas, los dos signos de u, un solo problema y dos a la vez
+# (arreglos (m, nvx)) y cada backend de los kernels
+#
+    def loop(nvx, u, typeAp, phiA, phiB, D, rho = 1.0):
+        aP, aE, aW, aEE, aWW, Su = np.zeros((6, nvx))
+        if typeAp == 'UpW':
+            for i in range(1, nvx-1):
+                CE = max((-u[i], 0))
+                CW = max((u[i-1], 0))
+                aE[i] += CE
                 aW[i] += CW
-                aP[i] += CE + CW + rho * (u[i] - u[i-1]) 
-        elif typeAp == 'UpW2': 
-            for i in range(1,self.__nvx-1):
-                # Upwind 2do Orden
-                CE = max((rho*u[i]*0.5,0))
-                CW = max((rho*u[i-1]*0.5,0))
-                CEn = -max((-rho*u[i]*0.5,0))
-                CWn = -max((-rho*u[i-1]*0.5,0))
+                aP[i] += CE + CW + rho * (u[i] - u[i-1])
+        elif typeAp == 'UpW2':
+            for i in range(1, nvx-1):
+                CE = max((rho*u[i]*0.5, 0))
+                CW = max((rho*u[i-1]*0.5, 0))
+                CEn = -max((-rho*u[i]*0.5, 0))
+                CWn = -max((-rho*u[i-1]*0.5, 0))
                 aE[i] += -3*CEn-CWn
                 aW[i] += CE+3*CW
                 aEE[i] += CEn
@@ -98,23 +382,19 @@ class Advection1D(Coefficients):
                 if i == 2 and u[i] > 0:
                     aW[i] += CW
                     Su[i] += - 2*CW*phiA
-                if i == self.__nvx-3 and u[i] < 0:
+                if i == nvx-3 and u[i] < 0:
                     aE[i] -= CEn
                     Su[i] += 2*CEn*phiB
-            #fronteras:
-            # Primer nodo
             aP[1] += aW[1] + 3*aWW[1]
             Su[1] += (2 * aW[1] + 4 * aWW[1]) * phiA
-            # Último nodo
             aP[-2] += aE[-2] + 3 * aEE[-2]
             Su[-2] += (2 * aE[-2] + 4 * aEE[-2]) * phiB
         elif typeAp == 'QUICK':
-            for i in range(2,self.__nvx-2):
-                # Quick
-                CE = max((rho*u[i]*0.125,0))
-                CW = max((rho*u[i-1]*0.125,0))
-                CEn = -max((-rho*u[i]*0.125,0))
-                CWn = -max((-rho*u[i-1]*0.125,0))
+            for i in range(2, nvx-2):
+                CE = max((rho*u[i]*0.125, 0))
+                CW = max((rho*u[i-1]*0.125, 0))
+                CEn = -max((-rho*u[i]*0.125, 0))
+                CWn = -max((-rho*u[i-1]*0.125, 0))
                 aE[i] += -3*CE - 6*CEn - CWn
                 aW[i] += 6*CW + CE + 3*CWn
                 aEE[i] += CEn
@@ -124,67 +404,87 @@ class Advection1D(Coefficients):
                     aW[i] += CW
                     aP[i] = aW[i] + aE[i] - 2*CW
                     Su[i] += - 2*CW*phiA
-                if i == self.__nvx-3 and u[i] < 0 :
+                if i == nvx-3 and u[i] < 0:
                     aE[i] -= CEn
                     aP[i] = aW[i] + aE[i] + 2*CEn
                     Su[i] += 2*CEn*phiB
-            #fronteras (estos cálculos se ajustan al esquema abordado en el libro Malalasekera):
-            # Primer nodo
-            CE1 = max((rho*u[1]*0.125,0))
-            CW1 = max((rho*u[0]*0.125,0))
-            CEn1 = -max((-rho*u[1]*0.125,0))
-            CWn1 = -max((-rho*u[0]*0.125,0))
+            CE1 = max((rho*u[1]*0.125, 0))
+            CW1 = max((rho*u[0]*0.125, 0))
+            CEn1 = -max((-rho*u[1]*0.125, 0))
+            CWn1 = -max((-rho*u[0]*0.125, 0))
             aE[1] += D/3 - 3*CE1 - 6*CEn1
             aEE[1] += CEn1
             Sp1 = -(8*D/3 + 2*CE1 + 8*CW1 + 8*CWn1)
             aP[1] = aE[1] + aEE[1] -Sp1
             Su[1] += - Sp1 * phiA
-            # Último nodo
-            CEn = max((rho*u[-2]*0.125,0))
-            CWn = max((rho*u[-3]*0.125,0))
-            CEnn = -max((-rho*u[-2]*0.125,0))
-            CWnn = -max((-rho*u[-3]*0.125,0))
+            CEn = max((rho*u[-2]*0.125, 0))
+            CWn = max((rho*u[-3]*0.125, 0))
+            CEnn = -max((-rho*u[-2]*0.125, 0))
+            CWnn = -max((-rho*u[-3]*0.125, 0))
             aW[-2] += D/3 + 6*CWn + 3*CWnn
             aWW[-2] += -CWn
             Spn = -(8*D/3 - 8*CEn - 8*CEnn -2*CWnn)
             aP[-2] = aW[-2] + aWW[-2] -Spn
             Su[-2] += -Spn * phiB
         else:
-            for i in range(1,self.__nvx-1):
-                # Diferencias Centradas
+            for i in range(1, nvx-1):
                 CE = - rho * u[i] * 0.5
                 CW =   rho * u[i-1] * 0.5
-                aE[i] += CE 
+                aE[i] += CE
                 aW[i] += CW
                 aP[i] += CE + CW + rho * (u[i] - u[i-1])
+        return np.array([aP, aE, aW, aEE, aWW, Su])
 
-if __name__ == '__main__':
-    
-    nx = 5
-    u = np.sin(np.linspace(0,1,nx))
-#    u = np.ones(nx)
-    print('-' * 20)  
-    print(u)
-    print('-' * 20)  
-
-    af1 = Advection1D(6, 1, 1)
-    af1.alloc(6)
-    af1.setU(u)
-    print(af1.u())
-    print('-' * 20)  
-
-    af1.calcCoef()
-    print(af1.aP(), af1.aE(), af1.aW(), af1.aEE(), af1.aWW(), af1.Su(), sep = '\n')
+    equal = True
+    for name in Kernels.backends():
+        Kernels.setBackend(name)
+        for typeAp in ('', 'UpW', 'UpW2', 'QUICK'):
+            for nvx in range(4 if typeAp == 'QUICK' else 3, 9):
+                us = np.array([0.5 + np.sin(np.arange(nvx - 1)), -0.5 - np.cos(np.arange(nvx - 1))])
+                ref = np.array([loop(nvx, v, typeAp, 2.0, 1.0, 0.3) for v in us])
+                for v, r in zip(us, ref):
+                    block = np.zeros((6, nvx))
+                    advectionCoef(*block, v, 1.0, typeAp, 2.0, 1.0, 0.3)
+                    equal &= np.allclose(block, r, rtol = 1e-14, atol = 1e-14)
+                block = np.zeros((6, 2, nvx))
+                advectionCoef(*block, us, 1.0, typeAp, 2.0, 1.0, 0.3)
+                equal &= np.allclose(block, ref.transpose(1, 0, 2), rtol = 1e-14, atol = 1e-14)
+    Kernels.setBackend('numpy')
+    print('ciclo original = vectorizado con nvx <= 8, backends {}: {}'.format(Kernels.backends(), equal))
     print('-' * 20)
-    
-    af1.calcCoef('QUICK')
-    print(af1.aP(), af1.aE(), af1.aW(), af1.aEE(), af1.aWW(), af1.Su(), sep = '\n')
-    print('-' * 20) 
-
-    af1.bcDirichlet('LEFT_WALL', 2)
-    af1.bcDirichlet('RIGHT_WALL', 1)
-    print(af1.aP(), af1.aE(), af1.aW(), af1.aEE(), af1.aWW(), af1.Su(), sep = '\n')
-    print('-' * 20)  
-
 
+#
+# Advección-difusión en 2D con v = 0 y flujo cero en las fronteras sur y
+# norte: cada renglón en x debe dar la solución 1D
+#
+    from Coefficients import Coefficients
+    from Diffusion import Diffusion1D, Diffusion2D
+    from Matrix import Matrix
+    nvx, nvy = 12, 5
+    coef = CartesianCoefficients((nvx, nvy), (0.1, 0.2))
+    coef.alloc()
+    Diffusion2D(Gamma = 0.1, coefficients = coef).calcCoef()
+    af2 = Advection2D(rho = 1.0, coefficients = coef)
+    af2.setU(1.0, 0.0)
+    af2.calcCoef('UpW')
+    coef.bcDirichlet('LEFT_WALL', 1)
+    coef.bcDirichlet('RIGHT_WALL', 0)
+    coef.bcNeumman('SOUTH_WALL', 0)
+    coef.bcNeumman('NORTH_WALL', 0)
+    A = Matrix((nvx, nvy), 'csr')
+    A.build(coef)
+    phi2 = A.solve(coef.Su()[coef.interior()].ravel()).reshape(nvx - 2, nvy - 2)
 
+    coef1 = Coefficients(nvx, 0.1, private = True)
+    coef1.alloc(nvx)
+    Diffusion1D(nvx, 0.1, 0.1, coefficients = coef1).calcCoef()
+    af1 = Advection1D(nvx, 1.0, 0.1, coefficients = coef1)
+    af1.setU(1.0)
+    af1.calcCoef('UpW')
+    coef1.bcDirichlet('LEFT_WALL', 1)
+    coef1.bcDirichlet('RIGHT_WALL', 0)
+    B = Matrix(nvx, 'csr')
+    B.build(coef1)
+    phi1 = B.solve(coef1.Su()[1:-1])
+    print(phi1, 'max |2D - 1D| = {:.3e}'.format(np.abs(phi2 - phi1[:, None]).max()), sep = '\n')
+    print('-' * 20)  
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:02:55 2026
+
+Ensamble incremental de los coeficientes: cada término (difusión,
+advección, condiciones de frontera, parte temporal de aP) se registra como
+una etapa, y sólo se recalculan las etapas cuyos parámetros cambiaron.
+
+Las etapas se aplican en el orden en que se registran, igual que en los
+scripts (algunos esquemas, como QUICK, usan los coeficientes que ya
+calcularon los términos anteriores). Después de cada etapa se guarda una
+copia de los coeficientes; si la etapa k cambió se parte de la copia de la
+etapa k-1 y se recalculan sólo las etapas k, k+1, ...
+
+Una etapa cambia cuando cambia la versión del término (setU, setGamma,
+setDeltaT, ...) o cuando cambian sus argumentos (esquema, valores de
+frontera). La parte de Su que depende de la solución anterior no es una
+etapa: se suma al final en cada paso, así que si sólo cambia phi_old el
+paso cuesta una sola operación vectorizada sobre Su. En ese caso sólo se
+restablecen desde la copia los renglones del bloque que se modificaron
+después del último ensamble: Su y, con BDF2 (ver Temporal1D.sourceRows) o
+con PseudoTransient (ver modified), aP; las demás bandas se dejan como están.
+
+Con step se ensambla y se resuelve (TDMA/PDMA) en una sola llamada; con el
+backend 'numba' (ver Kernels) y sin etapas modificadas, uno o varios pasos
+de tiempo completos se hacen dentro de un solo ciclo compilado.
+"""
+
+import numpy as np
+import Kernels
+from LinearSolvers import tdma, pdma
+
+class Assembler():
+    """
+    Clase que ensambla los coeficientes de un problema recalculando sólo las etapas que cambiaron.
+    """
+
+    def __init__(self, coefficients):
+        """
+        Constructor de la clase.
+
+        @param coefficients: objeto Coefficients (ya alojado) donde escriben los términos
+        """
+        self.__coef = coefficients
+        self.__stages = []
+        self.__temporal = None
+        self.__static = None
+        self.__modified = set()
+        self.__penta = False
+        self.__work = None
+        self.__recomputed = 0
+
+    def addTerm(self, term, *args, **kargs):
+        """
+        Método que registra un término; en cada ensamble se llama term.calcCoef(*args, **kargs).
+
+        @param term: término (Diffusion1D, Advection1D, ...)
+        @return: número de la etapa, para usarse con setArgs
+        """
+        return self.__addStage(term, term.calcCoef, args, kargs)
+
+    def addBoundary(self, wall, kind, value):
+        """
+        Método que registra una condición de frontera.
+
+        @param wall: frontera, 'LEFT_WALL' o 'RIGHT_WALL'
+        @param kind: 'Dirichlet' o 'Neumman'
+        @param value: valor de la propiedad (Dirichlet) o del flujo (Neumman) en la frontera
+        @return: número de la etapa, para usarse con setArgs
+        """
+        if kind == 'Dirichlet':
+            f = self.__coef.bcDirichlet
+        elif kind == 'Neumman':
+            f = self.__coef.bcNeumman
+        else:
+            raise ValueError('Tipo de condición de frontera desconocido: {}'.format(kind))
+        return self.__addStage(None, f, (wall, value), {})
+
+    def setTemporal(self, temporal):
+        """
+        Método que registra la parte temporal: su contribución a aP es una etapa
+        (depende de dt) y su contribución a Su se suma en cada ensamble.
+        Con theta < 1 (ver Temporal1D) debe ser la última etapa.
+
+        @param temporal: objeto Temporal1D
+        @return: número de la etapa
+        """
+        self.__temporal = temporal
+        return self.__addStage(temporal, temporal.calcMatrixCoef, (), {})
+
+    def setArgs(self, stage, *args, **kargs):
+        """
+        Método que cambia los argumentos de una etapa; la etapa se marca como
+        modificada sólo si los argumentos son distintos.
+
+        @param stage: número de la etapa (regresado por addTerm o addBoundary)
+        """
+        st = self.__stages[stage]
+        if not (_same(args, st['args']) and _same(kargs, st['kargs'])):
+            st['args'] = args
+            st['kargs'] = kargs
+            st['dirty'] = True
+
+    def touch(self, stage = 0):
+        """
+        Método que marca una etapa (y por lo tanto las siguientes) como modificada.
+
+        @param stage: número de la etapa [0 por defecto: todo el ensamble]
+        """
+        self.__stages[stage]['dirty'] = True
+
+    def modified(self, *rows):
+        """
+        Método que indica que se modificaron renglones del bloque de coeficientes
+        después del ensamble (p. ej. aP y Su en PseudoTransient), para que el
+        siguiente ensamble los restablezca.
+
+        @param rows: números de renglón de Coefficients.block (0: aP, ..., 5: Su)
+        """
+        self.__modified.update(rows)
+
+    def recomputed(self):
+        """
+        Método que regresa el número de etapas recalculadas en el último ensamble.
+
+        @return: número de etapas
+        """
+        return self.__recomputed
+
+    def assemble(self, phi_old = None):
+        """
+        Método que deja en los arreglos de coeficientes el sistema completo.
+
+        @param phi_old: solución anterior, para la parte temporal de Su [nulo por defecto]
+        @return: objeto Coefficients con los coeficientes ensamblados
+        """
+        tem = self.__temporal
+        if tem is not None and tem.theta() != 1 and self.__stages[-1]['term'] is not tem:
+            raise ValueError('Con theta < 1 la parte temporal debe registrarse después de los demás términos y las fronteras')
+        block = self.__coef.block()
+        first = self.__firstDirty()
+        self.__recomputed = 0
+        if first is None:
+            for r in sorted(self.__modified):
+                block[r] = self.__static[r]
+        else:
+            if first == 0:
+                block[:] = 0.0
+            else:
+                block[:] = self.__stages[first - 1]['snapshot']
+            for st in self.__stages[first:]:
+                st['call'](*st['args'], **st['kargs'])
+                st['snapshot'] = block.copy()
+                st['dirty'] = False
+                if st['term'] is not None:
+                    st['version'] = st['term'].version()
+                self.__recomputed += 1
+            self.__static = self.__stages[-1]['snapshot']
+            self.__penta = bool(self.__static[3, 1:-1].any() or self.__static[4, 1:-1].any())
+        self.__modified.clear()
+        if self.__temporal is not None and phi_old is not None:
+            self.__temporal.calcSourceCoef(phi_old)
+            self.__modified.update(self.__temporal.sourceRows())
+        return self.__coef
+
+    def step(self, phi, nsteps = 1):
+        """
+        Método que avanza nsteps pasos de tiempo: en cada uno ensambla con
+        phi_old = phi y resuelve con TDMA (o PDMA si aEE, aWW no son cero),
+        guardando la solución en phi[1:-1].
+
+        @param phi: solución anterior; se sobrescribe con la nueva
+        @param nsteps: número de pasos de tiempo [1 por defecto]
+        @return: phi
+        """
+        k = Kernels.kernel('transient')
+        if k is not None and self.__temporal is not None and self.__temporal.theta() == 1 and self.__temporal.history() is None:
+            self.assemble(phi)
+            dx_dt = np.broadcast_to(np.asarray(self.__temporal.sourceFactor(), dtype = float), phi.shape)
+            k(self.__coef.block(), self.__static, phi, dx_dt, self.__penta, nsteps)
+            return phi
+        for n in range(nsteps):
+            aP, aE, aW, aEE, aWW, Su = self.assemble(phi).block()
+            if self.__work is None:
+                self.__work = np.empty((2,) + aP[1:-1].shape, dtype = aP.dtype)
+            if self.__penta:
+                pdma(aP, aE, aW, aEE, aWW, Su[1:-1], x = phi[1:-1], work = self.__work)
+            else:
+                tdma(aP, aE, aW, Su[1:-1], x = phi[1:-1], work = self.__work[0])
+        return phi
+
+    def __addStage(self, term, call, args, kargs):
+        """
+        Método que agrega una etapa al final de la lista.
+        """
+        self.__stages.append({'term': term, 'call': call, 'args': args, 'kargs': kargs,
+                              'version': None, 'dirty': True, 'snapshot': None})
+        return len(self.__stages) - 1
+
+    def __firstDirty(self):
+        """
+        Método que regresa la primera etapa modificada (o nulo si ninguna cambió).
+        """
+        for k, st in enumerate(self.__stages):
+            if st['dirty'] or (st['term'] is not None and st['term'].version() != st['version']):
+                return k
+        return None
+
+def _same(a, b):
+    """
+    Compara dos tuplas (o diccionarios) de argumentos que pueden contener arreglos.
+    """
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same((a[k],), (b[k],)) for k in a)
+    return len(a) == len(b) and all(np.array_equal(x, y) for x, y in zip(a, b))
+
+if __name__ == '__main__':
+
+    from Coefficients import Coefficients
+    from Diffusion import Diffusion1D
+    from Advection import Advection1D
+    from Temporal import Temporal1D
+
+    nvx = 8
+    dx = 0.25
+    coef = Coefficients(nvx, dx, private = True)
+    coef.alloc(nvx)
+    df1 = Diffusion1D(nvx, 0.1, dx, coefficients = coef)
+    adv1 = Advection1D(nvx, 1.0, dx, coefficients = coef)
+    adv1.setU(0.5)
+    tem = Temporal1D(nvx, 1.0, dx, 0.01, coefficients = coef)
+
+    asm = Assembler(coef)
+    asm.addTerm(df1)
+    sadv = asm.addTerm(adv1, 'UpW')
+    asm.setTemporal(tem)
+    asm.addBoundary('LEFT_WALL', 'Dirichlet', 1.0)
+    asm.addBoundary('RIGHT_WALL', 'Dirichlet', 0.0)
+
+    phi = np.linspace(1, 0, nvx)
+    asm.assemble(phi)
+    print('etapas recalculadas = {}'.format(asm.recomputed()))
+    asm.assemble(phi)
+    print('etapas recalculadas = {} (sólo cambió phi_old)'.format(asm.recomputed()))
+    adv1.setU(0.75)
+    asm.assemble(phi)
+    print('etapas recalculadas = {} (cambió u)'.format(asm.recomputed()))
+    asm.setArgs(sadv, 'UpW')
+    tem.setDeltaT(0.02)
+    asm.assemble(phi)
+    print('etapas recalculadas = {} (cambió dt)'.format(asm.recomputed()))
+    print('-' * 20)
+    coef.printCoefficients()
+    print('-' * 20)
+
+#
+# Se compara con el ensamble completo
+#
+    ref = Coefficients(nvx, dx, private = True)
+    ref.alloc(nvx)
+    Diffusion1D(nvx, 0.1, dx, coefficients = ref).calcCoef()
+    adv2 = Advection1D(nvx, 1.0, dx, coefficients = ref)
+    adv2.setU(0.75)
+    adv2.calcCoef('UpW')
+    Temporal1D(nvx, 1.0, dx, 0.02, coefficients = ref).calcCoef(phi)
+    ref.bcDirichlet('LEFT_WALL', 1.0)
+    ref.bcDirichlet('RIGHT_WALL', 0.0)
+    print('max |diferencia| = {:.3e}'.format(np.abs(ref.block() - coef.block()).max()))
+    print('-' * 20)
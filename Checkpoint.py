@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:51:19 2026
+
+Puntos de control (checkpoints) para reiniciar simulaciones transitorias
+largas desde el último estado guardado en lugar de desde t = 0.
+
+El estado es un diccionario con todo lo que se necesita para continuar:
+Phi, el tiempo y el número de paso, la malla, los parámetros de los
+términos (esquema, valores de frontera, dt, theta, ...), los niveles
+anteriores de BDF2 (Temporal1D.history), el estado del paso adaptativo
+(AdaptiveStepper.state) o de la malla adaptativa (AdaptiveMesh1D.state) y
+el hash de los coeficientes de la factorización (FactorizationCache.key),
+con el que al reiniciar se verifica que el sistema reconstruido es el
+mismo. Como cada paso es determinista, continuar desde el punto de control
+da exactamente (bit a bit) la misma solución que sin interrupción.
+
+La escritura es atómica: se escribe a un archivo temporal en el mismo
+directorio, se fuerza a disco (fsync) y se renombra sobre el archivo
+anterior (os.replace), así que una interrupción a la mitad deja el punto de
+control anterior intacto. Es asíncrona: save copia los arreglos (una copia
+en memoria) y un hilo los escribe mientras la simulación continúa. save
+nunca espera al hilo: hay un solo lugar para el estado pendiente, y si al
+siguiente save la escritura anterior no ha terminado, el estado nuevo
+reemplaza al que esperaba (el hilo siempre escribe el más reciente). Con
+every pequeño se escriben menos puntos de control que los que se piden,
+pero el paso no se detiene; wait y close esperan a que el último quede en
+disco.
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+import numpy as np
+
+class Checkpointer():
+    """
+    Clase que escribe puntos de control de forma atómica y en segundo plano.
+    """
+
+    def __init__(self, filename, every = 100, background = True):
+        """
+        Constructor de la clase.
+
+        @param filename: nombre del archivo del punto de control
+        @param every: número de pasos entre puntos de control [100 por defecto]
+        @param background: si es verdadero se escribe en un hilo [verdadero por defecto]
+        """
+        self.__filename = os.path.abspath(filename)
+        self.__every = every
+        self.__background = background
+        self.__thread = None
+        self.__pending = None
+        self.__lock = threading.Lock()
+        self.__error = None
+        self.__written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def written(self):
+        """
+        Método que regresa el número de puntos de control escritos.
+
+        @return: número de puntos de control
+        """
+        return self.__written
+
+    def due(self, step):
+        """
+        Método que indica si en el paso step toca guardar un punto de control.
+
+        @param step: número de paso
+        @return: verdadero si step es múltiplo de every
+        """
+        return self.__every > 0 and step % self.__every == 0
+
+    def save(self, state):
+        """
+        Método que guarda un punto de control; regresa en cuanto se copió el
+        estado. Si hay una escritura en curso el estado queda pendiente y
+        reemplaza al que estuviera pendiente.
+
+        @param state: diccionario con el estado (arreglos, números, cadenas, tuplas, listas, diccionarios)
+        """
+        self.__raise()
+        state = _copy(state)
+        if not self.__background:
+            self.__write(state)
+            self.__raise()
+            return
+        with self.__lock:
+            self.__pending = state
+            if self.__thread is None:
+                self.__thread = threading.Thread(target = self.__drain)
+                self.__thread.start()
+
+    def wait(self):
+        """
+        Método que espera a que termine la escritura pendiente (y lanza su error, si lo hubo).
+        """
+        with self.__lock:
+            thread = self.__thread
+        if thread is not None:
+            thread.join()
+        self.__raise()
+
+    def close(self):
+        """
+        Método que termina la escritura pendiente.
+        """
+        self.wait()
+
+    @staticmethod
+    def load(filename):
+        """
+        Método que lee un punto de control.
+
+        @param filename: nombre del archivo del punto de control
+        @return: diccionario con el estado
+        """
+        with open(filename, 'rb') as f:
+            data = pickle.load(f)
+        if not isinstance(data, dict) or data.get('version') != 1:
+            raise ValueError('{} no es un punto de control'.format(filename))
+        return data['state']
+
+    @staticmethod
+    def check(state, **params):
+        """
+        Método que verifica que los parámetros del punto de control son los de la simulación.
+
+        @param state: estado leído con load
+        @param params: parámetros de la simulación (nombre = valor)
+        """
+        for k, v in params.items():
+            if k not in state or not np.array_equal(state[k], v):
+                raise ValueError('El punto de control tiene {} = {}, la simulación {}'.format(k, state.get(k), v))
+
+    def __drain(self):
+        """
+        Método del hilo: escribe el estado pendiente hasta que no quede ninguno.
+        """
+        while True:
+            with self.__lock:
+                state, self.__pending = self.__pending, None
+                if state is None:
+                    self.__thread = None
+                    return
+            self.__write(state)
+
+    def __write(self, state):
+        """
+        Método que escribe el estado en un archivo temporal y lo renombra sobre el punto de control.
+        """
+        folder, name = os.path.split(self.__filename)
+        fd, tmp = tempfile.mkstemp(prefix = name + '.', suffix = '.tmp', dir = folder)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({'version': 1, 'state': state}, f, protocol = pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.__filename)
+            self.__written += 1
+        except Exception as e:
+            self.__error = e
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def __raise(self):
+        """
+        Método que lanza el error de la última escritura.
+        """
+        if self.__error is not None:
+            e, self.__error = self.__error, None
+            raise e
+
+def _copy(v):
+    """
+    Regresa una copia de v en la que ningún arreglo comparte memoria con la simulación.
+    """
+    if isinstance(v, np.ndarray):
+        return v.copy()
+    if isinstance(v, dict):
+        return {k: _copy(x) for k, x in v.items()}
+    if isinstance(v, (tuple, list)):
+        return type(v)(_copy(x) for x in v)
+    return v
+
+if __name__ == '__main__':
+
+    import time
+    from Coefficients import Coefficients
+    from Diffusion import Diffusion1D
+    from Advection import Advection1D
+    from Temporal import Temporal1D, BDF2Temporal1D
+    from Assembly import Assembler
+    from TimeStepping import AdaptiveStepper
+
+#
+# Problema de la Tarea-6.1 (CD, N = 350): se interrumpe en el paso 270 y se
+# continúa desde el último punto de control (paso 200); la solución final
+# es la misma que sin interrupción
+#
+    nvx = 351
+    dx = 2.5 / (nvx - 1)
+
+    def problem(bdf2):
+        coef = Coefficients(nvx, dx, private = True)
+        coef.alloc(nvx)
+        adv1 = Advection1D(nvx, 1.0, dx, coefficients = coef)
+        adv1.setU(1.0)
+        if bdf2:
+            tem = BDF2Temporal1D(nvx, 1.0, dx, 0.002, coefficients = coef)
+        else:
+            tem = Temporal1D(nvx, 1.0, dx, 0.002, coefficients = coef)
+        asm = Assembler(coef)
+        asm.addTerm(Diffusion1D(nvx, 0.001, dx, coefficients = coef))
+        asm.addTerm(adv1)
+        asm.addBoundary('LEFT_WALL', 'Dirichlet', 1.0)
+        asm.addBoundary('RIGHT_WALL', 'Dirichlet', 0.0)
+        asm.setTemporal(tem)
+        phi = np.zeros(nvx)
+        phi[0] = 1.0
+        return asm, tem, phi
+
+    def run(name, bdf2, adaptive, start, stop, steps = 500):
+        asm, tem, phi = problem(bdf2)
+        stepper = AdaptiveStepper(asm, tem, rtol = 1e-3, atol = 1e-4) if adaptive else None
+        i, t = 0, 0.0
+        if start:
+            state = Checkpointer.load(name)
+            Checkpointer.check(state, nvx = nvx, dx = dx, bdf2 = bdf2, adaptive = adaptive)
+            i, t = state['step'], state['t']
+            phi[:] = state['phi']
+            tem.setHistory(state['history'])
+            if adaptive:
+                stepper.setState(state['stepper'])
+        with Checkpointer(name, every = 100) as cp:
+            while i < min(stop, steps):
+                if adaptive:
+                    t = stepper.step(phi, t)
+                else:
+                    asm.step(phi)
+                    t += 0.002
+                i += 1
+                if cp.due(i):
+                    cp.save({'step': i, 't': t, 'phi': phi, 'history': tem.history(), 'nvx': nvx, 'dx': dx,
+                             'bdf2': bdf2, 'adaptive': adaptive,
+                             'stepper': stepper.state() if adaptive else None})
+        return phi
+
+    with tempfile.TemporaryDirectory() as tmp:
+        name = os.path.join(tmp, 'run.ckpt')
+        for bdf2, adaptive in ((False, False), (True, False), (True, True)):
+            ref = run(name, bdf2, adaptive, False, 500)
+            run(name, bdf2, adaptive, False, 270)
+            phi = run(name, bdf2, adaptive, True, 500)
+            print('BDF2 = {!s:5}, adaptativo = {!s:5}: reinicio desde el paso {}, igual bit a bit = {}'.format(
+                  bdf2, adaptive, 200, np.array_equal(phi, ref)))
+        print('-' * 20)
+#
+# Costo: guardar cada paso en segundo plano contra no guardar
+#
+        asm, tem, phi = problem(False)
+        t1 = time.time()
+        asm.step(phi, 200)
+        t0 = time.time() - t1
+        asm, tem, phi = problem(False)
+        t1 = time.time()
+        with Checkpointer(name, every = 1) as cp:
+            for i in range(1, 201):
+                asm.step(phi)
+                cp.save({'step': i, 'phi': phi})
+        print('200 pasos: sin puntos de control {:.3f} s, con uno por paso {:.3f} s ({} escritos)'.format(
+              t0, time.time() - t1, cp.written()))
+    print('-' * 20)
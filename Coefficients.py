@@ -9,49 +9,123 @@ Documented by: Daniel Becerra Pedraza
 
 import numpy as np
 
+class _Storage():
+    """
+    Arreglos de coeficientes de un problema. Los seis arreglos son renglones
+    (vistas) de un solo bloque contiguo de tamaño (6, nvx).
+    """
+    def __init__(self):
+        self.block = None
+        self.aP = None
+        self.aE = None
+        self.aW = None
+        self.aEE = None
+        self.aWW = None
+        self.Su = None
+        self.nvx = None
+        self.delta = None
+
+class _storagemethod():
+    """
+    Decorador para los métodos que se pueden llamar desde la clase (usan los
+    arreglos compartidos) o desde un objeto (usan los arreglos del objeto).
+    El método recibe como primer argumento los arreglos que le corresponden.
+    """
+    def __init__(self, f):
+        self.__f = f
+        self.__doc__ = f.__doc__
+
+    def __get__(self, obj, cls):
+        f = self.__f
+        store = Coefficients._storage(obj)
+        return lambda *args, **kargs: f(store, *args, **kargs)
+
 class Coefficients():
     """
     Esta clase define los arreglos principales para los coeficientes del
     metodo de Volumen Finito. Los arreglos son definidos como variables de
     clase para que sean compartidos por todos los objetos de esta clase.
+
+    De forma opcional (private = True) un objeto puede tener sus propios
+    arreglos; los términos (Diffusion1D, Advection1D, Temporal1D) que se
+    construyen con coefficients = ese objeto escriben en ellos. Así se pueden
+    resolver varios problemas a la vez, por ejemplo en distintos hilos.
     """    
-    __aP = None
-    __aE = None
-    __aW = None
-    __aEE = None
-    __aWW = None
-    __Su = None
-    __nvx = None
-    __delta = None
+    __shared = _Storage()
 
-    def __init__(self, nvx = None, delta = None):
+    def __init__(self, nvx = None, delta = None, private = False, coefficients = None):
         """
         Constructor de la clase.
         
         @param nvx: número de volúmenes [nulo por defecto]
         @param delta: valor de los intervalos en la dimensión  [nulo por defecto]
+        @param private: si es verdadero el objeto tiene sus propios arreglos [falso por defecto]
+        @param coefficients: objeto Coefficients cuyos arreglos se usarán [nulo por defecto]
+        """
+        if coefficients is not None:
+            self.__store = coefficients.__store
+        elif private:
+            self.__store = _Storage()
+        else:
+            self.__store = Coefficients.__shared
+        if self.__store is Coefficients.__shared:
+            self.__store.nvx = nvx
+            self.__store.delta = delta
+        else:
+            if nvx is not None:
+                self.__store.nvx = nvx
+            if delta is not None:
+                self.__store.delta = delta
+        self.__version = 0
+
+    def version(self):
         """
-        Coefficients.__nvx = nvx
-        Coefficients.__delta = delta
+        Método que regresa el número de versión de los parámetros del objeto; cambia
+        cada vez que se modifica un parámetro del que dependen sus coeficientes.
+        
+        @return: número de versión
+        """
+        return self.__version
 
+    def touch(self):
+        """
+        Método que indica que los parámetros del objeto cambiaron (incrementa la versión).
+        """
+        self.__version += 1
 
     @staticmethod
-    def alloc(n):
+    def _storage(obj):
+        """
+        Método que regresa los arreglos que usa un objeto (o los compartidos si obj no es un objeto).
+        """
+        if isinstance(obj, Coefficients):
+            return obj.__store
+        return Coefficients.__shared
+
+    def isPrivate(self):
+        """
+        Método que indica si el objeto usa arreglos propios (no compartidos).
+        
+        @return: verdadero si los arreglos no son los compartidos
+        """
+        return self.__store is not Coefficients.__shared
+
+    @_storagemethod
+    def alloc(store, n, dtype = np.float64):
         """
         Método estático para definir el espacio en memoria a ocupar por la instancia de la clase.
+        Los coeficientes se guardan en un solo bloque contiguo de tamaño (6, nvx)
+        en el orden aP, aE, aW, aEE, aWW, Su.
         
         @param n: número de volúmenes.
+        @param dtype: tipo de dato de los coeficientes, p. ej. np.float32 [np.float64 por defecto]
         """
-        if Coefficients.__nvx:
-            nvx = Coefficients.__nvx
+        if store.nvx:
+            nvx = store.nvx
         else:
             nvx = n
-        Coefficients.__aP = np.zeros(nvx)
-        Coefficients.__aE = np.zeros(nvx)
-        Coefficients.__aW = np.zeros(nvx)
-        Coefficients.__aEE = np.zeros(nvx)
-        Coefficients.__aWW = np.zeros(nvx)
-        Coefficients.__Su = np.zeros(nvx)
+        store.block = np.zeros((6, nvx), dtype = dtype)
+        store.aP, store.aE, store.aW, store.aEE, store.aWW, store.Su = store.block
     
     def setVolumes(self, nvx):
         """
@@ -59,7 +133,7 @@ class Coefficients():
         
         @param nvx: valor que se asignará al atributo
         """
-        Coefficients.__nvx = nvx
+        self.__store.nvx = nvx
         
     def setDelta(self, delta):
         """
@@ -67,7 +141,15 @@ class Coefficients():
         
         @param delta: valor que se asignará al atributo
         """
-        Coefficients.__delta = delta
+        self.__store.delta = delta
+
+    def delta(self):
+        """
+        Método que regresa el valor del intervalo (o el arreglo de anchos) de los volúmenes.
+        
+        @return: delta
+        """
+        return self.__store.delta
         
     def aP(self):
         """
@@ -75,7 +157,7 @@ class Coefficients():
         
         @return Coefficients.__aP: contenido del atributo
         """
-        return Coefficients.__aP
+        return self.__store.aP
 
     def aE(self):
         """
@@ -83,7 +165,7 @@ class Coefficients():
         
         @return Coefficients.__aE: contenido del atributo
         """
-        return Coefficients.__aE
+        return self.__store.aE
     
     def aW(self):
         """
@@ -91,7 +173,7 @@ class Coefficients():
         
         @return Coefficients.__aW: contenido del atributo
         """
-        return Coefficients.__aW
+        return self.__store.aW
     
     def aEE(self):
         """
@@ -99,7 +181,7 @@ class Coefficients():
         
         @return Coefficients.__aEE: contenido del atributo
         """
-        return Coefficients.__aEE
+        return self.__store.aEE
     
     def aWW(self):
         """
@@ -107,18 +189,26 @@ class Coefficients():
         
         @return Coefficients.__aWW: contenido del atributo
         """
-        return Coefficients.__aWW
+        return self.__store.aWW
     
+    def block(self):
+        """
+        Método que regresa el bloque contiguo (6, nvx) con todos los coeficientes.
+        
+        @return: bloque con los renglones aP, aE, aW, aEE, aWW y Su
+        """
+        return self.__store.block
+
     def Su(self):
         """
         Método que regresa el valor de los coeficientes Su de los volúmenes.
         
         @return Coefficients.__Su: contenido del atributo
         """
-        return Coefficients.__Su
+        return self.__store.Su
 
-    @staticmethod
-    def bcDirichlet(wall, phi):
+    @_storagemethod
+    def bcDirichlet(store, wall, phi):
         """
         Método estático que ajusta los coeficientes de los volúmenes en las fronteras dados los valores de la propiedad en las mismas.
         Nota: Por ciertas dependencias, para algunos métodos se calcularon estos coeficientes directamente en la clase que modela la parte advectiva.
@@ -126,10 +216,10 @@ class Coefficients():
         @param wall: Frontera a la que es adyacente el volumen
         @param phi: valor de la propiedad en la frontera
         """
-        aP = Coefficients.__aP
-        aE = Coefficients.__aE
-        aW = Coefficients.__aW
-        Su = Coefficients.__Su
+        aP = store.aP
+        aE = store.aE
+        aW = store.aW
+        Su = store.Su
 
         if wall == 'LEFT_WALL':
             aP[1] += aW[1]
@@ -138,24 +228,28 @@ class Coefficients():
             aP[-2] += aE[-2]
             Su[-2] += 2 * aE[-2] * phi       
 
-    @staticmethod
-    def bcNeumman(wall, flux):
+    @_storagemethod
+    def bcNeumman(store, wall, flux):
         """
         Método estático que ajusta los coeficientes de los volúmenes en las fronteras dados los flujos de la propiedad en las mismas.
         
         @param wall: Frontera a la que es adyacente el volumen
         @param flux: valor del flujo de la propiedad en la frontera
         """
-        aP = Coefficients.__aP
-        aE = Coefficients.__aE
-        aW = Coefficients.__aW
-        Su = Coefficients.__Su
-        dx = Coefficients.__delta
+        aP = store.aP
+        aE = store.aE
+        aW = store.aW
+        Su = store.Su
+        dx = store.delta
 
         if wall == 'LEFT_WALL':
+            if np.ndim(dx):
+                dx = dx[1]
             aP[1] -= aW[1]
             Su[1] -= aW[1] * flux * dx
         elif wall == 'RIGHT_WALL':
+            if np.ndim(dx):
+                dx = dx[-2]
             aP[-2] -= aE[-2]
             Su[-2] += aE[-2] * flux * dx  
             
@@ -163,10 +257,10 @@ class Coefficients():
         """
         Método que corrige el valor de los coeficientes de Su para los distintos volúmenes.
         
-        @param q: valor de la fuente/sumidero en los puntos.
+        @param q: valor de la fuente/sumidero en los puntos (escalar o arreglo de tamaño nvx).
         """
-        Su = Coefficients.__Su
-        dx = Coefficients.__delta
+        Su = self.__store.Su
+        dx = self.__store.delta
         Su += q * dx
         
     def setSp(self, Sp):
@@ -175,31 +269,332 @@ class Coefficients():
         
         @param Sp: valor con el que se corregirán los coeficientes aP.
         """
-        aP = Coefficients.__aP
-        dx = Coefficients.__delta
+        aP = self.__store.aP
+        dx = self.__store.delta
         aP -= Sp * dx
+
+    def setSource(self, S, dSdphi, phi):
+        """
+        Método que agrega una fuente que depende de la solución, linealizada con
+        Newton alrededor de phi: S(phi_nuevo) = S(phi) + S'(phi) (phi_nuevo - phi),
+        es decir Su += (S - S' phi) dx y aP -= S' dx. Con S' <= 0 (sumideros)
+        aP sigue siendo dominante. Ver NewtonSolver para resolver el problema no lineal.
+        
+        @param S: función vectorizada S(phi) (fuente por unidad de volumen)
+        @param dSdphi: función vectorizada con la derivada dS/dphi
+        @param phi: solución alrededor de la cual se linealiza (tamaño nvx)
+        """
+        dS = dSdphi(phi)
+        self.setSu(S(phi) - dS * phi)
+        self.setSp(dS)
             
     def printCoefficients(self):
         """
         Método para imprimir el valor de los arreglos que almacenan los coeficientes del objeto.
         """
-        print('aP = {}'.format(self.__aP), 
-              'aE = {}'.format(self.__aE), 
-              'aW = {}'.format(self.__aW),
-              'aEE = {}'.format(self.__aEE), 
-              'aWW = {}'.format(self.__aWW),
-              'Su = {}'.format(self.__Su), sep='\n')
+        print('aP = {}'.format(self.aP()), 
+              'aE = {}'.format(self.aE()), 
+              'aW = {}'.format(self.aW()),
+              'aEE = {}'.format(self.aEE()), 
+              'aWW = {}'.format(self.aWW()),
+              'Su = {}'.format(self.Su()), sep='\n')
 
     def cleanCoefficients(self):
         """
         Método para asignar el valor de cero a todos los coeficientes.
         """
-        Coefficients.__aP[:] = 0.0
-        Coefficients.__aE[:] = 0.0
-        Coefficients.__aW[:] = 0.0
-        Coefficients.__aEE[:] = 0.0
-        Coefficients.__aWW[:] = 0.0
-        Coefficients.__Su[:] = 0.0
+        self.__store.block[:] = 0.0
+
+class CartesianCoefficients():
+    """
+    Coeficientes del metodo de Volumen Finito en una malla cartesiana de 2 o 3
+    dimensiones. Los arreglos tienen la forma de la malla de volúmenes
+    (nvx, nvy) o (nvx, nvy, nvz), incluyendo los volúmenes de frontera, y son
+    renglones (vistas) de un solo bloque contiguo en el orden aP, aE, aW, aN,
+    aS, [aT, aB,] Su; el volumen (i, j, k) es la incógnita si está en el
+    interior [1:-1, 1:-1, 1:-1].
+
+    A diferencia de Coefficients los arreglos no se comparten entre clases:
+    cada objeto tiene los suyos, y los términos (Diffusion2D, Advection2D,
+    ...) que se construyen con coefficients = ese objeto escriben en ellos.
+    """
+    # Frontera: (eje, lado) con lado 0 al inicio del eje y 1 al final
+    walls = {'LEFT_WALL': (0, 0), 'RIGHT_WALL': (0, 1),
+             'SOUTH_WALL': (1, 0), 'NORTH_WALL': (1, 1),
+             'BOTTOM_WALL': (2, 0), 'TOP_WALL': (2, 1)}
+
+    def __init__(self, volumes = None, deltas = None, coefficients = None):
+        """
+        Constructor de la clase.
+
+        @param volumes: número de volúmenes en cada eje, (nvx, nvy) o (nvx, nvy, nvz) [nulo por defecto]
+        @param deltas: tamaño de los volúmenes en cada eje; cada uno es un escalar o el arreglo de anchos (ver Mesh.delta) [nulo por defecto]
+        @param coefficients: objeto CartesianCoefficients cuyos arreglos se usarán [nulo por defecto]
+        """
+        if coefficients is not None:
+            self.__store = coefficients.__store
+        else:
+            if volumes is None or deltas is None or len(volumes) != len(deltas) or len(volumes) not in (2, 3):
+                raise ValueError('Se requieren los volúmenes y los tamaños de 2 o 3 ejes')
+            self.__store = _Storage()
+            self.__store.nvx = tuple(volumes)
+            self.__store.delta = tuple(_widths(n, d) for n, d in zip(volumes, deltas))
+        self.__version = 0
+
+    def version(self):
+        """
+        Método que regresa el número de versión de los parámetros del objeto (ver Coefficients.version).
+
+        @return: número de versión
+        """
+        return self.__version
+
+    def touch(self):
+        """
+        Método que indica que los parámetros del objeto cambiaron (incrementa la versión).
+        """
+        self.__version += 1
+
+    def alloc(self, dtype = np.float64):
+        """
+        Método que aloja el bloque de coeficientes de tamaño (2 dim + 2, nvx, nvy[, nvz]).
+
+        @param dtype: tipo de dato de los coeficientes [np.float64 por defecto]
+        """
+        store = self.__store
+        store.block = np.zeros((2 * len(store.nvx) + 2,) + store.nvx, dtype = dtype)
+
+    def dim(self):
+        """
+        Método que regresa el número de dimensiones.
+
+        @return: 2 o 3
+        """
+        return len(self.__store.nvx)
+
+    def volumes(self):
+        """
+        Método que regresa el número de volúmenes en cada eje.
+
+        @return: tupla (nvx, nvy[, nvz])
+        """
+        return self.__store.nvx
+
+    def widths(self):
+        """
+        Método que regresa los anchos de los volúmenes en cada eje (los de frontera con ancho cero).
+
+        @return: tupla de arreglos
+        """
+        return self.__store.delta
+
+    def interior(self):
+        """
+        Método que regresa los índices de los volúmenes interiores (las incógnitas).
+
+        @return: tupla de slices, para usarse como arreglo[coef.interior()]
+        """
+        return (slice(1, -1),) * self.dim()
+
+    def area(self, axis):
+        """
+        Método que calcula el área de las caras normales a un eje (producto de
+        los anchos en los otros ejes), lista para multiplicarse con los arreglos.
+
+        @param axis: eje (0 para x, 1 para y, 2 para z)
+        @return: arreglo con tamaño 1 en el eje axis
+        """
+        return _outer(self.__store.delta, skip = axis)
+
+    def volume(self):
+        """
+        Método que calcula el volumen de cada volumen (cero en los de frontera).
+
+        @return: arreglo de tamaño (nvx, nvy[, nvz])
+        """
+        return _outer(self.__store.delta)
+
+    def block(self):
+        """
+        Método que regresa el bloque contiguo con todos los coeficientes.
+
+        @return: bloque con los renglones aP, aE, aW, aN, aS, [aT, aB,] Su
+        """
+        return self.__store.block
+
+    def aP(self):
+        """
+        Método que regresa los coeficientes aP de los volúmenes.
+        """
+        return self.__store.block[0]
+
+    def aE(self):
+        """
+        Método que regresa los coeficientes aE (vecino en x + dx).
+        """
+        return self.__store.block[1]
+
+    def aW(self):
+        """
+        Método que regresa los coeficientes aW (vecino en x - dx).
+        """
+        return self.__store.block[2]
+
+    def aN(self):
+        """
+        Método que regresa los coeficientes aN (vecino en y + dy).
+        """
+        return self.__store.block[3]
+
+    def aS(self):
+        """
+        Método que regresa los coeficientes aS (vecino en y - dy).
+        """
+        return self.__store.block[4]
+
+    def aT(self):
+        """
+        Método que regresa los coeficientes aT (vecino en z + dz, sólo en 3D).
+        """
+        if self.dim() < 3:
+            raise ValueError('aT sólo existe en 3D')
+        return self.__store.block[5]
+
+    def aB(self):
+        """
+        Método que regresa los coeficientes aB (vecino en z - dz, sólo en 3D).
+        """
+        if self.dim() < 3:
+            raise ValueError('aB sólo existe en 3D')
+        return self.__store.block[6]
+
+    def Su(self):
+        """
+        Método que regresa los coeficientes Su de los volúmenes.
+        """
+        return self.__store.block[-1]
+
+    def neighbors(self, axis):
+        """
+        Método que regresa los coeficientes de los vecinos en un eje: (aE, aW),
+        (aN, aS) o (aT, aB).
+
+        @param axis: eje (0 para x, 1 para y, 2 para z)
+        @return: tupla (vecino al final del eje, vecino al inicio del eje)
+        """
+        block = self.__store.block
+        return block[1 + 2 * axis], block[2 + 2 * axis]
+
+    def bcDirichlet(self, wall, phi):
+        """
+        Método que ajusta los coeficientes de los volúmenes junto a una frontera
+        dado el valor de la propiedad en ella (igual que Coefficients.bcDirichlet).
+
+        @param wall: frontera, 'LEFT_WALL', 'RIGHT_WALL', 'SOUTH_WALL', 'NORTH_WALL', 'BOTTOM_WALL' o 'TOP_WALL'
+        @param phi: valor de la propiedad en la frontera (escalar o arreglo con los volúmenes de la frontera, p. ej. de tamaño nvy en LEFT_WALL)
+        """
+        axis, side, a = self.__wall(wall)
+        aP = _plane(self.aP(), axis, side)
+        Su = _plane(self.Su(), axis, side)
+        aP += a
+        Su += 2 * a * phi
+
+    def bcNeumman(self, wall, flux):
+        """
+        Método que ajusta los coeficientes de los volúmenes junto a una frontera
+        dado el flujo de la propiedad en ella (igual que Coefficients.bcNeumman).
+
+        @param wall: frontera, 'LEFT_WALL', 'RIGHT_WALL', 'SOUTH_WALL', 'NORTH_WALL', 'BOTTOM_WALL' o 'TOP_WALL'
+        @param flux: valor del flujo en la frontera (escalar o arreglo con los volúmenes de la frontera)
+        """
+        axis, side, a = self.__wall(wall)
+        aP = _plane(self.aP(), axis, side)
+        Su = _plane(self.Su(), axis, side)
+        w = self.__store.delta[axis][-2 if side else 1]
+        aP -= a
+        if side:
+            Su += a * flux * w
+        else:
+            Su -= a * flux * w
+
+    def __wall(self, wall):
+        """
+        Método que regresa el eje, el lado y los coeficientes hacia la frontera
+        de los volúmenes junto a ella.
+        """
+        if wall not in self.walls or self.walls[wall][0] >= self.dim():
+            raise ValueError('Frontera desconocida: {}'.format(wall))
+        axis, side = self.walls[wall]
+        return axis, side, _plane(self.neighbors(axis)[1 - side], axis, side)
+
+    def setSu(self, q):
+        """
+        Método que suma la fuente q (por unidad de volumen) a Su.
+
+        @param q: valor de la fuente (escalar o arreglo de tamaño (nvx, nvy[, nvz]))
+        """
+        Su = self.Su()
+        Su += q * self.volume()
+
+    def setSp(self, Sp):
+        """
+        Método que corrige aP con la parte lineal Sp de la fuente (por unidad de volumen).
+
+        @param Sp: valor con el que se corregirán los coeficientes aP
+        """
+        aP = self.aP()
+        aP -= Sp * self.volume()
+
+    def setSource(self, S, dSdphi, phi):
+        """
+        Método que agrega una fuente que depende de la solución, linealizada con
+        Newton alrededor de phi (ver Coefficients.setSource).
+
+        @param S: función vectorizada S(phi) (fuente por unidad de volumen)
+        @param dSdphi: función vectorizada con la derivada dS/dphi
+        @param phi: solución alrededor de la cual se linealiza (tamaño (nvx, nvy[, nvz]))
+        """
+        dS = dSdphi(phi)
+        self.setSu(S(phi) - dS * phi)
+        self.setSp(dS)
+
+    def cleanCoefficients(self):
+        """
+        Método para asignar el valor de cero a todos los coeficientes.
+        """
+        self.__store.block[:] = 0.0
+
+def _widths(n, delta):
+    """
+    Regresa los anchos de los n volúmenes de un eje (cero en los de frontera)
+    a partir de un escalar o de un arreglo de anchos.
+    """
+    if np.ndim(delta):
+        return np.asarray(delta, dtype = float)
+    w = np.full(n, float(delta))
+    w[0] = w[-1] = 0.0
+    return w
+
+def _outer(widths, skip = None):
+    """
+    Regresa el producto (por broadcasting) de los anchos de todos los ejes
+    menos skip; el resultado tiene tamaño 1 en el eje skip.
+    """
+    dim = len(widths)
+    out = np.ones((1,) * dim)
+    for a, w in enumerate(widths):
+        if a != skip:
+            out = out * w.reshape((1,) * a + (-1,) + (1,) * (dim - a - 1))
+    return out
+
+def _plane(a, axis, side):
+    """
+    Regresa la vista de los volúmenes junto a una frontera: índice 1 (side = 0)
+    o -2 (side = 1) en el eje axis.
+    """
+    index = [slice(None)] * a.ndim
+    index[axis] = -2 if side else 1
+    return a[tuple(index)]
 
 if __name__ == '__main__':
     
@@ -233,3 +628,26 @@ if __name__ == '__main__':
     print(coef1.aP(), coef1.aE(), coef1.aW(), coef1.aEE(), coef1.aWW(), coef1.Su(), sep = '\n')
     print('-' * 20)  
 
+#
+# Dos problemas con arreglos propios resueltos en hilos distintos
+#
+    from concurrent.futures import ThreadPoolExecutor
+    from Diffusion import Diffusion1D
+    from Matrix import Matrix
+
+    def solveRod(TB):
+        nvx = 7
+        coef = Coefficients(nvx, 0.1, private = True)
+        coef.alloc(nvx)
+        df1 = Diffusion1D(nvx, 1000, 0.1, coefficients = coef)
+        df1.calcCoef()
+        df1.bcDirichlet('LEFT_WALL', 100)
+        df1.bcDirichlet('RIGHT_WALL', TB)
+        A = Matrix(nvx, 'banded')
+        A.build(coef)
+        return A.solve(coef.Su()[1:-1])
+
+    with ThreadPoolExecutor(max_workers = 2) as pool:
+        for T in pool.map(solveRod, (500, 300)):
+            print(T)
+    print('-' * 20)  
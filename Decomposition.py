@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:05:42 2026
+
+Descomposición de dominio en una dimensión para mallas muy grandes.
+
+Los volúmenes interiores se reparten en p subdominios contiguos; cada uno
+lo atiende un proceso que ensambla sus coeficientes de forma local (con un
+volumen fantasma, el halo, a cada lado) y resuelve su parte del sistema
+tridiagonal. El sistema global se resuelve con el complemento de Schur:
+
+    1. Cada subdominio k resuelve, en una sola pasada, tres cargas:
+       A_k y = b_k, A_k g = aW e_primero y A_k h = aE e_último, de modo que
+       x_k = y + g x_(último de k-1) + h x_(primero de k+1).
+    2. Con el primer y el último renglón de y, g, h de todos los
+       subdominios se arma el sistema reducido (tamaño 2p) para el primer y
+       el último valor de cada subdominio, y se resuelve.
+    3. Cada subdominio calcula su solución con los valores de sus vecinos.
+
+El resultado es el mismo que el de resolver el sistema completo (salvo
+redondeo), y el trabajo de los pasos 1 y 3 es O(N/p) por proceso.
+
+La comunicación es por memoria compartida (multiprocessing.shared_memory):
+el bloque de coeficientes, la solución y los renglones del paso 2 viven en
+memoria compartida y por los Pipes sólo pasan las órdenes. Si mpi4py está
+instalado y el programa corre con mpiexec, mpiSolve hace lo mismo con un
+subdominio por proceso de MPI y un solo allgather por solución.
+
+Sólo se admiten sistemas tridiagonales (diferencias centradas o UpW).
+"""
+
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from scipy.linalg import lapack
+from Coefficients import Coefficients
+from LinearSolvers import tdma
+
+try:
+    from mpi4py import MPI
+except ImportError:
+    MPI = None
+
+class Decomposition1D():
+    """
+    Clase que reparte un problema 1D entre varios procesos y resuelve el
+    sistema global con el complemento de Schur.
+
+    El ensamble local se hace con una función builder(coef, phi, lo, hi, *args)
+    definida a nivel de módulo (para poder enviarse a los procesos): recibe un
+    objeto Coefficients propio de tamaño hi - lo + 2 cuyo volumen local i es
+    el volumen global lo - 1 + i, y phi, la vista de la solución actual con
+    el mismo índice (los extremos son el halo, que pertenece a los vecinos).
+    El subdominio con lo == 1 tiene la frontera izquierda y el que tiene
+    hi == nvx - 1 la derecha.
+    """
+
+    def __init__(self, nvx, parts = None):
+        """
+        Constructor de la clase: aloja la memoria compartida y arranca los procesos.
+
+        @param nvx: número de volúmenes (incluyendo los de frontera)
+        @param parts: número de subdominios [número de núcleos por defecto]
+        """
+        if parts is None:
+            parts = os.cpu_count() or 1
+        N = nvx - 2
+        parts = max(1, min(parts, N // 2))
+        cuts = np.linspace(0, N, parts + 1).astype(int) + 1
+        self.__nvx = nvx
+        self.__bounds = [(int(lo), int(hi)) for lo, hi in zip(cuts[:-1], cuts[1:])]
+        sizes = {'block': 6 * nvx, 'phi': nvx, 'ends': 6 * parts, 'iface': 2 * parts}
+        self.__shm = {k: shared_memory.SharedMemory(create = True, size = 8 * n) for k, n in sizes.items()}
+        self.__block, self.__phi, self.__ends, self.__iface = _views(self.__shm, nvx, parts)
+        self.__block[:] = 0.0
+        self.__phi[:] = 0.0
+        names = {k: shm.name for k, shm in self.__shm.items()}
+        self.__pipes = []
+        self.__procs = []
+        for k in range(parts):
+            here, there = mp.Pipe()
+            p = mp.Process(target = _worker, args = (there, names, nvx, parts, k, self.__bounds[k]), daemon = True)
+            p.start()
+            self.__pipes.append(here)
+            self.__procs.append(p)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def parts(self):
+        """
+        Método que regresa el número de subdominios.
+        """
+        return len(self.__bounds)
+
+    def bounds(self):
+        """
+        Método que regresa los volúmenes que le tocan a cada subdominio.
+
+        @return: lista de parejas (lo, hi); el subdominio tiene los volúmenes lo, ..., hi - 1
+        """
+        return self.__bounds
+
+    def block(self):
+        """
+        Método que regresa el bloque global de coeficientes (6, nvx), en memoria compartida.
+        """
+        return self.__block
+
+    def phi(self):
+        """
+        Método que regresa la solución global (tamaño nvx), en memoria compartida;
+        los valores de frontera phi[0] y phi[-1] los pone el usuario.
+        """
+        return self.__phi
+
+    def assemble(self, builder, *args):
+        """
+        Método que ensambla los coeficientes de forma local en cada subdominio
+        y los copia al bloque global.
+
+        @param builder: función builder(coef, phi, lo, hi, *args) a nivel de módulo
+        """
+        self.__send(('assemble', builder, args))
+
+    def solve(self, builder = None, *args):
+        """
+        Método que resuelve el sistema global con el complemento de Schur y deja
+        la solución en phi()[1:-1]. Si se da builder, cada subdominio ensambla
+        antes sus coeficientes (en la misma orden, ver assemble).
+
+        @param builder: función de ensamble [nulo por defecto: se usa el bloque actual]
+        @return: phi
+        """
+        self.__send(('spikes', builder, args))
+        self.__iface[:] = _interfaces(self.__ends)
+        self.__send(('finish',))
+        return self.__phi
+
+    def close(self):
+        """
+        Método que detiene los procesos y libera la memoria compartida.
+        """
+        if not self.__procs:
+            return
+        for pipe in self.__pipes:
+            pipe.send(('stop',))
+        for p in self.__procs:
+            p.join()
+        self.__procs = []
+        self.__block = self.__phi = self.__ends = self.__iface = None
+        for shm in self.__shm.values():
+            shm.close()
+            shm.unlink()
+
+    def __send(self, msg):
+        """
+        Método que envía una orden a todos los procesos y espera a que terminen.
+        """
+        for pipe in self.__pipes:
+            pipe.send(msg)
+        errors = [m for m in (pipe.recv() for pipe in self.__pipes) if m is not None]
+        if errors:
+            raise ValueError(errors[0])
+
+def mpiSolve(aP, aE, aW, b, comm = None):
+    """
+    Función que resuelve un sistema tridiagonal repartido entre los procesos
+    de MPI con el complemento de Schur: cada proceso da sus renglones y
+    recibe su parte de la solución.
+
+    Los arreglos tienen la convención de Coefficients sobre los renglones
+    locales más un volumen a cada lado: aP, aE, aW de tamaño n + 2 y b de
+    tamaño n; aW[1] acopla con el último valor del proceso anterior y
+    aE[-2] con el primero del siguiente.
+
+    @param aP, aE, aW: coeficientes locales (con halo)
+    @param b: lado derecho local
+    @param comm: comunicador de mpi4py [MPI.COMM_WORLD por defecto]
+    @return: solución local (tamaño n)
+    """
+    if comm is None:
+        if MPI is None:
+            raise ValueError('mpiSolve requiere mpi4py')
+        comm = MPI.COMM_WORLD
+    k = comm.Get_rank()
+    p = comm.Get_size()
+    Y = _spikes(aP, aE, aW, b, k == 0, k == p - 1)
+    ends = np.array(comm.allgather(np.concatenate((Y[0], Y[-1]))))
+    xL, xR = _interfaces(ends)[k]
+    return Y[:, 0] + Y[:, 1] * xL + Y[:, 2] * xR
+
+def _views(shm, nvx, parts):
+    """
+    Regresa los arreglos de numpy sobre la memoria compartida.
+    """
+    return (np.ndarray((6, nvx), buffer = shm['block'].buf),
+            np.ndarray(nvx, buffer = shm['phi'].buf),
+            np.ndarray((parts, 6), buffer = shm['ends'].buf),
+            np.ndarray((parts, 2), buffer = shm['iface'].buf))
+
+def _spikes(aP, aE, aW, b, first, last):
+    """
+    Resuelve A_k [y g h] = [b, aW e_primero, aE e_último] con la eliminación
+    tridiagonal de LAPACK (gtsv, una sola pasada para las tres cargas); el
+    subdominio con la frontera izquierda (first) no tiene g y el de la
+    derecha (last) no tiene h.
+    """
+    rhs = np.zeros((b.shape[0], 3))
+    rhs[:, 0] = b
+    if not first:
+        rhs[0, 1] = aW[1]
+    if not last:
+        rhs[-1, 2] = aE[-2]
+    Y, info = lapack.dgtsv(-aW[2:-1], aP[1:-1], -aE[1:-2], rhs, overwrite_dl = True,
+                           overwrite_du = True, overwrite_b = True)[3:]
+    if info != 0:
+        raise ValueError('El sistema del subdominio es singular')
+    return Y
+
+def _interfaces(ends):
+    """
+    Arma y resuelve el sistema reducido para el primer (f) y el último (l)
+    valor de cada subdominio,
+
+        f_k = y0_k + g0_k l_(k-1) + h0_k f_(k+1)
+        l_k = yl_k + gl_k l_(k-1) + hl_k f_(k+1),
+
+    con ends[k] = (y0, g0, h0, yl, gl, hl).
+
+    @return: arreglo (p, 2) con (l_(k-1), f_(k+1)) de cada subdominio (cero en las fronteras)
+    """
+    p = ends.shape[0]
+    M = np.eye(2 * p)
+    for k in range(p):
+        for r, (y, g, h) in enumerate((ends[k, :3], ends[k, 3:])):
+            if k > 0:
+                M[2 * k + r, 2 * k - 1] = -g
+            if k < p - 1:
+                M[2 * k + r, 2 * k + 2] = -h
+    z = np.linalg.solve(M, np.concatenate((ends[:, [0]], ends[:, [3]]), axis = 1).ravel())
+    out = np.zeros((p, 2))
+    out[1:, 0] = z[1:-2:2]
+    out[:-1, 1] = z[2::2]
+    return out
+
+def _worker(pipe, names, nvx, parts, k, bounds):
+    """
+    Ciclo de un proceso: atiende las órdenes 'assemble', 'spikes', 'finish' y 'stop'.
+    """
+    shm = {key: shared_memory.SharedMemory(name = name) for key, name in names.items()}
+    block, phi, ends, iface = _views(shm, nvx, parts)
+    lo, hi = bounds
+    first = k == 0
+    last = k == parts - 1
+    local = Coefficients(hi - lo + 2, private = True)
+    local.alloc(hi - lo + 2)
+    Y = None
+    while True:
+        msg = pipe.recv()
+        if msg[0] == 'stop':
+            break
+        try:
+            if msg[0] in ('assemble', 'spikes') and msg[1] is not None:
+                local.cleanCoefficients()
+                msg[1](local, phi[lo-1:hi+1], lo, hi, *msg[2])
+                block[:, lo:hi] = local.block()[:, 1:-1]
+            if msg[0] == 'spikes':
+                aP, aE, aW, aEE, aWW, Su = block[:, lo-1:hi+1]
+                if aEE[1:-1].any() or aWW[1:-1].any():
+                    raise ValueError('La descomposición sólo admite sistemas tridiagonales (CD o UpW)')
+                Y = _spikes(aP, aE, aW, Su[1:-1], first, last)
+                ends[k, :3] = Y[0]
+                ends[k, 3:] = Y[-1]
+            elif msg[0] == 'finish':
+                xL, xR = iface[k]
+                phi[lo:hi] = Y[:, 0] + Y[:, 1] * xL + Y[:, 2] * xR
+            pipe.send(None)
+        except Exception as e:
+            pipe.send('Subdominio {}: {}'.format(k, e))
+    block = phi = ends = iface = None
+    for s in shm.values():
+        s.close()
+
+def _rod(coef, phi, lo, hi, nvx, Gamma, u, dx, dt):
+    """
+    Ensamble local del problema de la Tarea-6.1 (CD) para el ejemplo.
+    """
+    from Diffusion import Diffusion1D
+    from Advection import Advection1D
+    from Temporal import Temporal1D
+    n = hi - lo + 2
+    Diffusion1D(n, Gamma, dx, coefficients = coef).calcCoef()
+    adv = Advection1D(n, 1.0, dx, coefficients = coef)
+    adv.setU(u)
+    adv.calcCoef()
+    Temporal1D(n, 1.0, dx, dt, coefficients = coef).calcCoef(phi)
+    if lo == 1:
+        coef.bcDirichlet('LEFT_WALL', 1.0)
+    if hi == nvx - 1:
+        coef.bcDirichlet('RIGHT_WALL', 0.0)
+
+if __name__ == '__main__':
+
+    import time
+
+    nvx = 200002
+    dx = 2.5 / (nvx - 2)
+    args = (nvx, 0.001, 1.0, dx, 0.002)
+
+#
+# Solución de referencia con un solo proceso (ensamble y TDMA globales)
+#
+    coef = Coefficients(nvx, private = True)
+    coef.alloc(nvx)
+    ref = np.zeros(nvx)
+    ref[0] = 1.0
+    t1 = time.time()
+    for step in range(5):
+        coef.cleanCoefficients()
+        _rod(coef, ref, 1, nvx - 1, *args)
+        tdma(coef.aP(), coef.aE(), coef.aW(), coef.Su()[1:-1], x = ref[1:-1])
+    print('{:>14s}: {:.3f} s'.format('serial (TDMA)', time.time() - t1))
+
+    for parts in sorted({1, 2, os.cpu_count() or 1}):
+        with Decomposition1D(nvx, parts) as dd:
+            phi = dd.phi()
+            phi[0] = 1.0
+            t1 = time.time()
+            for step in range(5):
+                dd.solve(_rod, *args)
+            t2 = time.time()
+            print('{:>2d} subdominios: {:.3f} s, max |diferencia| = {:.3e}'.format(dd.parts(), t2 - t1, np.abs(phi - ref).max()))
+    print('-' * 20)
@@ -7,25 +7,32 @@ Created on Tue Mar  6 17:07:27 2018
 Documented by: Daniel Becerra Pedraza
 """
 
-from Coefficients import Coefficients
+import numpy as np
+from Coefficients import Coefficients, CartesianCoefficients
+from Mesh import faceDistances
 
 class Diffusion1D(Coefficients):
     """
     Clase que modela la parte Difusiva, hereda atributos y métodos de Coefficients.
     """
     
-    def __init__(self, nvx = None, Gamma = None, dx = None):
+    def __init__(self, nvx = None, Gamma = None, dx = None, coefficients = None):
         """
         Constructor de la clase.
         
         @param nvx: número de volúmenes [nulo por defecto]
         @param Gamma: coeficiente Gamma de la función a resolver [nulo por defecto]
-        @param dx: valor de los intervalos en x  [nulo por defecto]
+        @param dx: valor de los intervalos en x, o arreglo de anchos (tamaño nvx, ver Mesh.delta) en una malla no uniforme [nulo por defecto]
+        @param coefficients: objeto Coefficients (private = True) en cuyos arreglos se escribirán los coeficientes [nulo por defecto]
         """
-        super().__init__(nvx, dx)
+        super().__init__(nvx, dx, coefficients = coefficients)
         self.__nvx = nvx
         self.__Gamma = Gamma
         self.__dx = dx
+        if np.ndim(dx):
+            self.__dxE, self.__dxW = _distances(dx)
+        else:
+            self.__dxE = self.__dxW = dx
 
     def __del__(self):
         """
@@ -34,6 +41,24 @@ class Diffusion1D(Coefficients):
         del(self.__Gamma)
         del(self.__dx)
     
+    def Gamma(self):
+        """
+        Método que regresa el valor de Gamma.
+        
+        @return Gamma
+        """
+        return self.__Gamma
+
+    def setGamma(self, Gamma):
+        """
+        Método para asignar un valor al coeficiente Gamma.
+        
+        @param Gamma: valor que se asignará a Gamma.
+        """
+        if not np.array_equal(Gamma, self.__Gamma):
+            self.__Gamma = Gamma
+            self.touch()
+
     def calcCoef(self):
         """
         Método que calcula la parte difusiva de los coeficientes que aparecerán en la matriz que se resolverá.
@@ -47,8 +72,8 @@ class Diffusion1D(Coefficients):
         aP = self.aP()
         Su = self.Su()
         
-        aE += self.__Gamma / self.__dx
-        aW += self.__Gamma / self.__dx
+        aE += self.__Gamma / self.__dxE
+        aW += self.__Gamma / self.__dxW
         aP += aE + aW
 #        if typeAp == 'QUICK':
 #            #prueba de ajustes a los coeficientes de difusión de acuerdo al problema 5.3
@@ -60,6 +85,111 @@ class Diffusion1D(Coefficients):
 #            aW[i] += self.__Gamma / self.__dx
 #            aP[i] += aE[i] + aW[i]
 
+class _CartesianDiffusion(CartesianCoefficients):
+    """
+    Parte Difusiva en una malla cartesiana; base de Diffusion2D y Diffusion3D.
+    """
+
+    def __init__(self, volumes, deltas, Gamma, coefficients):
+        super().__init__(volumes, deltas, coefficients = coefficients)
+        self.__Gamma = Gamma
+
+    def Gamma(self):
+        """
+        Método que regresa el valor de Gamma.
+
+        @return Gamma
+        """
+        return self.__Gamma
+
+    def setGamma(self, Gamma):
+        """
+        Método para asignar un valor al coeficiente Gamma.
+
+        @param Gamma: valor que se asignará a Gamma.
+        """
+        if not np.array_equal(Gamma, self.__Gamma):
+            self.__Gamma = Gamma
+            self.touch()
+
+    def calcCoef(self):
+        """
+        Método que calcula la parte difusiva de los coeficientes (ver diffusionCoef).
+        """
+        diffusionCoef(self, self.__Gamma)
+
+class Diffusion2D(_CartesianDiffusion):
+    """
+    Clase que modela la parte Difusiva en una malla cartesiana de 2 dimensiones,
+    hereda atributos y métodos de CartesianCoefficients.
+    """
+
+    def __init__(self, nvx = None, nvy = None, Gamma = None, dx = None, dy = None, coefficients = None):
+        """
+        Constructor de la clase.
+
+        @param nvx: número de volúmenes en x [nulo por defecto]
+        @param nvy: número de volúmenes en y [nulo por defecto]
+        @param Gamma: coeficiente Gamma (escalar o arreglo de tamaño (nvx, nvy)) [nulo por defecto]
+        @param dx: valor de los intervalos en x o arreglo de anchos [nulo por defecto]
+        @param dy: valor de los intervalos en y o arreglo de anchos [nulo por defecto]
+        @param coefficients: objeto CartesianCoefficients en cuyos arreglos se escribirán los coeficientes [nulo por defecto]
+        """
+        super().__init__((nvx, nvy), (dx, dy), Gamma, coefficients)
+
+class Diffusion3D(_CartesianDiffusion):
+    """
+    Clase que modela la parte Difusiva en una malla cartesiana de 3 dimensiones,
+    hereda atributos y métodos de CartesianCoefficients.
+    """
+
+    def __init__(self, nvx = None, nvy = None, nvz = None, Gamma = None, dx = None, dy = None, dz = None, coefficients = None):
+        """
+        Constructor de la clase.
+
+        @param nvx, nvy, nvz: número de volúmenes en x, y, z [nulo por defecto]
+        @param Gamma: coeficiente Gamma (escalar o arreglo de tamaño (nvx, nvy, nvz)) [nulo por defecto]
+        @param dx, dy, dz: valor de los intervalos en x, y, z o arreglos de anchos [nulo por defecto]
+        @param coefficients: objeto CartesianCoefficients en cuyos arreglos se escribirán los coeficientes [nulo por defecto]
+        """
+        super().__init__((nvx, nvy, nvz), (dx, dy, dz), Gamma, coefficients)
+
+def diffusionCoef(coef, Gamma):
+    """
+    Función que suma la parte difusiva a los coeficientes de una malla
+    cartesiana. En cada eje el coeficiente es el de Diffusion1D (Gamma entre la
+    distancia entre centros) por el área de la cara, que es el producto de los
+    anchos en los otros ejes: el arreglo es un producto exterior de arreglos
+    1D, así que el costo es lineal en el número de volúmenes.
+
+    @param coef: objeto CartesianCoefficients
+    @param Gamma: coeficiente Gamma (escalar o arreglo del tamaño de la malla)
+    """
+    aP = coef.aP()
+    dim = coef.dim()
+    for axis, w in enumerate(coef.widths()):
+        dE, dW = _distances(w)
+        shape = (1,) * axis + (-1,) + (1,) * (dim - axis - 1)
+        area = Gamma * coef.area(axis)
+        aHigh, aLow = coef.neighbors(axis)
+        cE = area / dE.reshape(shape)
+        cW = area / dW.reshape(shape)
+        aHigh += cE
+        aLow += cW
+        aP += cE + cW
+
+def _distances(dx):
+    """
+    Regresa las distancias entre centros vistas desde cada volumen hacia el
+    este y hacia el oeste (tamaño nvx) a partir de los anchos. En las
+    fronteras se usa el doble de la distancia a la pared (el ancho del
+    volumen), porque bcDirichlet duplica aW[1] y aE[-2].
+    """
+    d = faceDistances(dx)
+    d[0] *= 2
+    d[-1] *= 2
+    return np.append(d, d[-1]), np.insert(d, 0, d[0])
+
 if __name__ == '__main__':
     
     df1 = Diffusion1D(5, 5, 1)
@@ -74,4 +204,29 @@ if __name__ == '__main__':
     df1.bcDirichlet('LEFT_WALL', 2)
     df1.bcDirichlet('RIGHT_WALL', 1)
     print(df1.aP(), df1.aE(), df1.aW(), df1.Su(), sep = '\n')
+    print('-' * 20)
+
+#
+# Conducción en 2D: T = sin(pi x) sinh(pi y) / sinh(pi) con T = sin(pi x) en
+# la frontera norte y T = 0 en las demás
+#
+    from Mesh import CartesianMesh
+    from Matrix import Matrix
+    for N in (20, 40, 80):
+        malla = CartesianMesh(volumes = (N + 2, N + 2), length = (1.0, 1.0))
+        nvx, nvy = malla.volumes()
+        dx, dy = malla.delta()
+        x, y = malla.createMesh()
+        df2 = Diffusion2D(nvx, nvy, 1.0, dx, dy)
+        df2.alloc()
+        df2.calcCoef()
+        for wall in ('LEFT_WALL', 'RIGHT_WALL', 'SOUTH_WALL'):
+            df2.bcDirichlet(wall, 0.0)
+        df2.bcDirichlet('NORTH_WALL', np.sin(np.pi * x))
+        A = Matrix(malla.volumes(), 'csr')
+        A.build(df2)
+        T = A.solve(df2.Su()[df2.interior()].ravel()).reshape(nvx - 2, nvy - 2)
+        X, Y = np.meshgrid(x[1:-1], y[1:-1], indexing = 'ij')
+        error = np.abs(T - np.sin(np.pi * X) * np.sinh(np.pi * Y) / np.sinh(np.pi)).max()
+        print('N = {:3d} x {:3d}, error = {:.3e}'.format(N, N, error))
     print('-' * 20)  
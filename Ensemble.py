@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:21:09 2026
+
+Modo de ensamble: muchos problemas 1D independientes (mismo número de
+volúmenes, distintos u, Gamma, valores de frontera o esquema) que avanzan
+juntos. Los coeficientes se guardan en arreglos de tamaño (n, nvx), se
+calculan con NumPy vectorizado para todos los miembros y se resuelven en un
+solo barrido tridiagonal/pentadiagonal por paso de tiempo, de modo que el
+costo en Python se paga una vez por ensamble y no una vez por problema.
+"""
+
+import numpy as np
+from Advection import advectionCoef
+from LinearSolvers import tdma, pdma
+
+class Ensemble1D():
+    """
+    Clase que guarda y calcula los coeficientes de n problemas de volumen finito a la vez.
+    """
+
+    def __init__(self, nproblems, nvx):
+        """
+        Constructor de la clase.
+
+        @param nproblems: número de problemas del ensamble
+        @param nvx: número de volúmenes de cada problema
+        """
+        self.__n = nproblems
+        self.__nvx = nvx
+        self.__block = np.zeros((6, nproblems, nvx))
+        self.__work = np.empty((2, nvx - 2, nproblems))
+        self.__x = np.empty((nvx - 2, nproblems))
+
+    def problems(self):
+        """
+        Método que regresa el número de problemas del ensamble.
+
+        @return: número de problemas
+        """
+        return self.__n
+
+    def aP(self):
+        """
+        Método que regresa los coeficientes aP de todos los problemas, de tamaño (n, nvx).
+        """
+        return self.__block[0]
+
+    def aE(self):
+        """
+        Método que regresa los coeficientes aE de todos los problemas, de tamaño (n, nvx).
+        """
+        return self.__block[1]
+
+    def aW(self):
+        """
+        Método que regresa los coeficientes aW de todos los problemas, de tamaño (n, nvx).
+        """
+        return self.__block[2]
+
+    def aEE(self):
+        """
+        Método que regresa los coeficientes aEE de todos los problemas, de tamaño (n, nvx).
+        """
+        return self.__block[3]
+
+    def aWW(self):
+        """
+        Método que regresa los coeficientes aWW de todos los problemas, de tamaño (n, nvx).
+        """
+        return self.__block[4]
+
+    def Su(self):
+        """
+        Método que regresa los coeficientes Su de todos los problemas, de tamaño (n, nvx).
+        """
+        return self.__block[5]
+
+    def cleanCoefficients(self):
+        """
+        Método para asignar el valor de cero a todos los coeficientes.
+        """
+        self.__block[:] = 0.0
+
+    def calcDiffusion(self, Gamma, dx):
+        """
+        Método que calcula la parte difusiva de los coeficientes (ver Diffusion1D.calcCoef).
+
+        @param Gamma: coeficiente Gamma, escalar o de tamaño (n,)
+        @param dx: valor de los intervalos en x, escalar o de tamaño (n,)
+        """
+        D = _column(Gamma) / _column(dx)
+        aE = self.aE()
+        aW = self.aW()
+        aE += D
+        aW += D
+        self.aP()[:] += aE + aW
+
+    def calcAdvection(self, u, rho, typeAp = '', phiA = 0, phiB = 0, D = 0):
+        """
+        Método que calcula la parte advectiva de los coeficientes (ver Advection1D.calcCoef).
+        Si typeAp es una lista (un esquema por problema) los problemas se agrupan por esquema.
+
+        @param u: velocidad, escalar, de tamaño (n,) o de tamaño (n, nvx-1)
+        @param rho: densidad, escalar o de tamaño (n,)
+        @param typeAp: esquema ('UpW', 'UpW2', 'QUICK' o diferencias centradas) o lista de esquemas
+        @param phiA: valor de la propiedad en la frontera izquierda, escalar o de tamaño (n,)
+        @param phiB: valor de la propiedad en la frontera derecha, escalar o de tamaño (n,)
+        @param D: valor definido por gamma entre delta x, escalar o de tamaño (n,)
+        """
+        n = self.__n
+        u = np.asarray(u, dtype = float)
+        if u.ndim < 2:
+            u = np.broadcast_to(_column(u), (n, self.__nvx - 1))
+        if isinstance(typeAp, str):
+            advectionCoef(*self.__block, u, rho, typeAp, phiA, phiB, D)
+            return
+        typeAp = np.asarray(typeAp)
+        rho, phiA, phiB, D = (np.broadcast_to(np.asarray(v, dtype = float), (n,)) for v in (rho, phiA, phiB, D))
+        for scheme in np.unique(typeAp):
+            idx = np.nonzero(typeAp == scheme)[0]
+            sub = self.__block[:, idx]
+            advectionCoef(*sub, u[idx], rho[idx], scheme, phiA[idx], phiB[idx], D[idx])
+            self.__block[:, idx] = sub
+
+    def calcTemporal(self, phi_old, rho, dx, dt):
+        """
+        Método que calcula la parte temporal de los coeficientes (ver Temporal1D.calcCoef).
+
+        @param phi_old: solución anterior de todos los problemas, de tamaño (n, nvx)
+        @param rho: densidad, escalar o de tamaño (n,)
+        @param dx: valor de los intervalos en x, escalar o de tamaño (n,)
+        @param dt: valor del intervalo de tiempo, escalar o de tamaño (n,)
+        """
+        dx_dt = _column(dx) / _column(dt)
+        self.aP()[:, 1:-1] += _column(rho) * dx_dt
+        self.Su()[:, 1:-1] += phi_old[:, 1:-1] * dx_dt
+
+    def bcDirichlet(self, wall, phi, mask = None):
+        """
+        Método que ajusta los coeficientes de los volúmenes en las fronteras (ver Coefficients.bcDirichlet).
+
+        @param wall: frontera, 'LEFT_WALL' o 'RIGHT_WALL'
+        @param phi: valor de la propiedad en la frontera, escalar o de tamaño (n,)
+        @param mask: arreglo booleano de tamaño (n,) con los problemas a los que se aplica [todos por defecto]
+        """
+        aP = self.aP()
+        Su = self.Su()
+        if wall == 'LEFT_WALL':
+            a = self.aW()[:, 1]
+            k = 1
+        elif wall == 'RIGHT_WALL':
+            a = self.aE()[:, -2]
+            k = -2
+        else:
+            return
+        if mask is None:
+            mask = True
+        aP[:, k] = np.where(mask, aP[:, k] + a, aP[:, k])
+        Su[:, k] = np.where(mask, Su[:, k] + 2 * a * phi, Su[:, k])
+
+    def solve(self):
+        """
+        Método que resuelve los n sistemas en un solo barrido (TDMA si aEE y aWW
+        son cero en todos los problemas, PDMA en otro caso).
+
+        @return: solución en los volúmenes interiores, de tamaño (n, nvx-2)
+        """
+        aP, aE, aW, aEE, aWW, Su = (a.T for a in self.__block)
+        if aEE[1:-1].any() or aWW[1:-1].any():
+            pdma(aP, aE, aW, aEE, aWW, Su[1:-1], x = self.__x, work = self.__work)
+        else:
+            tdma(aP, aE, aW, Su[1:-1], x = self.__x, work = self.__work[0])
+        return self.__x.T
+
+def _column(v):
+    """
+    Regresa v como escalar o como columna de tamaño (n, 1) para difundirse sobre los volúmenes.
+    """
+    v = np.asarray(v, dtype = float)
+    return v[:, None] if v.ndim else v
+
+if __name__ == '__main__':
+
+    import time
+    from Coefficients import Coefficients
+    from Diffusion import Diffusion1D
+    from Advection import Advection1D
+    from Temporal import Temporal1D
+    from Matrix import Matrix
+
+#
+# Problema de la Tarea-6.1 con distintas velocidades y esquemas
+#
+    nvx = 102
+    dx = 2.5 / (nvx - 2)
+    dt = 0.002
+    gamma = 0.001
+    us = np.array([0.5, 1.0, 1.5, 1.0])
+    schemes = ['', 'UpW', 'UpW2', 'QUICK']
+    n = len(us)
+    Phi = np.zeros((n, nvx))
+    Phi[:, 0] = 1.0
+    ens = Ensemble1D(n, nvx)
+    linear = np.array([s not in ('UpW2', 'QUICK') for s in schemes])
+    t1 = time.time()
+    for step in range(100):
+        ens.cleanCoefficients()
+        ens.calcDiffusion(gamma, dx)
+        ens.calcAdvection(us, 1.0, schemes, 1.0, 0.0, gamma / dx)
+        ens.calcTemporal(Phi, 1.0, dx, dt)
+        ens.bcDirichlet('LEFT_WALL', 1.0, linear)
+        ens.bcDirichlet('RIGHT_WALL', 0.0, linear)
+        Phi[:, 1:-1] = ens.solve()
+    t2 = time.time()
+    print('Ensamble de {} problemas: {:.3f} s'.format(n, t2 - t1))
+
+#
+# Se compara con cada problema resuelto por separado
+#
+    for k in range(n):
+        phi = np.zeros(nvx)
+        phi[0] = 1.0
+        coef = Coefficients()
+        coef.alloc(nvx)
+        df1 = Diffusion1D(nvx, gamma, dx)
+        adv1 = Advection1D(nvx, 1.0, dx)
+        adv1.setU(float(us[k]))
+        tem = Temporal1D(nvx, 1.0, dx, dt)
+        A = Matrix(nvx, 'banded')
+        for step in range(100):
+            coef.cleanCoefficients()
+            df1.calcCoef()
+            adv1.calcCoef(schemes[k], 1.0, 0.0, gamma / dx)
+            tem.calcCoef(phi)
+            if linear[k]:
+                coef.bcDirichlet('LEFT_WALL', 1.0)
+                coef.bcDirichlet('RIGHT_WALL', 0.0)
+            A.build(coef)
+            phi[1:-1] = A.solve(coef.Su()[1:-1])
+        print('{:>6s}: max |phi - phi_ensamble| = {:.3e}'.format(schemes[k] or 'CD', np.abs(phi - Phi[k]).max()))
+    print('-' * 20)
@@ -8,12 +8,24 @@ Documented by: Daniel Becerra Pedraza
 """
 import numpy as np
 from pandas import DataFrame
-from Mesh import Mesh
-from Coefficients import Coefficients
-from Diffusion import Diffusion1D
-from Advection import Advection1D
-from Temporal import Temporal1D
+from Mesh import Mesh, CartesianMesh
+from Coefficients import Coefficients, CartesianCoefficients
+from Diffusion import Diffusion1D, Diffusion2D, Diffusion3D
+from Advection import Advection1D, Advection2D, Advection3D
+from Temporal import Temporal1D, BDF2Temporal1D
 from Matrix import Matrix
+from LinearSolvers import tdma, pdma, FactorizationCache
+from IterativeSolvers import KrylovSolver
+from Multigrid import Multigrid
+from Ensemble import Ensemble1D
+from Assembly import Assembler
+from Refinement import AdaptiveMesh1D
+from Decomposition import Decomposition1D
+from TimeStepping import AdaptiveStepper, ExplicitStepper, PseudoTransient, stableDeltaT
+from Nonlinear import NewtonSolver
+from Snapshots import SnapshotStore
+from Checkpoint import Checkpointer
+from Kernels import setBackend, backend, backends
 import time
 
 def crono(f):
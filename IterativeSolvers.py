@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:40:02 2026
+
+Solvers iterativos de Krylov (scipy.sparse.linalg) para los sistemas del
+método de Volumen Finito:
+
+    'bicgstab', 'gmres' : sistemas no simétricos (advección-difusión)
+    'cg'                : sistemas simétricos positivos definidos (difusión)
+
+con precondicionadores:
+
+    'jacobi' : inverso de la diagonal
+    'ilu0'   : factorización LU incompleta sin relleno (ILU(0): L y U con el
+               patrón de A; en los operadores 1D el patrón es la banda completa
+               y es la factorización LU en banda, ?gbtrf)
+    'banded' : factorización LU de la parte tridiagonal de la matriz
+    'mg'     : un ciclo V de multimalla (ver Multigrid)
+
+La solución del paso de tiempo anterior se puede usar como valor inicial
+(x0) para que cada sistema converja en pocas iteraciones, y el
+precondicionador se reutiliza mientras la matriz no cambie (se compara un
+hash de sus valores, como en FactorizationCache).
+
+Al terminar se verifica el residuo verdadero b - A x; si el residuo
+recursivo del método se alejó de él (o BiCGSTAB sufrió una ruptura) se
+reinicia desde la última aproximación.
+"""
+
+import hashlib
+import numpy as np
+from scipy.sparse import isspmatrix_csr, csr_matrix
+from scipy.sparse.linalg import LinearOperator, bicgstab, gmres, cg, spsolve_triangular
+from scipy.linalg import lapack
+from Multigrid import Multigrid
+
+class KrylovSolver():
+    """
+    Clase que resuelve A x = b con un método de Krylov precondicionado.
+    """
+
+    def __init__(self, method = 'bicgstab', precond = 'jacobi', rtol = 1e-8, atol = 0.0, maxiter = None, restart = 20, retries = 3):
+        """
+        Constructor de la clase.
+
+        @param method: 'bicgstab', 'gmres' o 'cg' ['bicgstab' por defecto]
+        @param precond: 'jacobi', 'ilu0', 'banded', 'mg' o None ['jacobi' por defecto]
+        @param rtol: tolerancia relativa del residuo [1e-8 por defecto]
+        @param atol: tolerancia absoluta del residuo [0 por defecto]
+        @param maxiter: número máximo de iteraciones [nulo por defecto]
+        @param restart: número de iteraciones antes de reiniciar GMRES [20 por defecto]
+        @param retries: número de reinicios si el residuo verdadero no cumple la tolerancia [3 por defecto]
+        """
+        if method not in _methods:
+            raise ValueError('Método de Krylov desconocido: {}'.format(method))
+        if precond not in _preconditioners:
+            raise ValueError('Precondicionador desconocido: {}'.format(precond))
+        self.__method = method
+        self.__precond = precond
+        self.__rtol = rtol
+        self.__atol = atol
+        self.__maxiter = maxiter
+        self.__restart = restart
+        self.__retries = retries
+        self.__iterations = 0
+        self.__info = 0
+        self.__key = None
+        self.__M = None
+        self.__setups = 0
+
+    def setTolerance(self, rtol = None, atol = None):
+        """
+        Método para cambiar las tolerancias del solver.
+
+        @param rtol: tolerancia relativa del residuo [sin cambio por defecto]
+        @param atol: tolerancia absoluta del residuo [sin cambio por defecto]
+        """
+        if rtol is not None:
+            self.__rtol = rtol
+        if atol is not None:
+            self.__atol = atol
+
+    def iterations(self):
+        """
+        Método que regresa el número de iteraciones de la última solución.
+
+        @return: número de iteraciones
+        """
+        return self.__iterations
+
+    def info(self):
+        """
+        Método que regresa el código de salida de la última solución
+        (0: convergió, > 0: no convergió en maxiter iteraciones).
+
+        @return: código de salida
+        """
+        return self.__info
+
+    def setups(self):
+        """
+        Método que regresa el número de veces que se construyó el precondicionador.
+
+        @return: número de construcciones
+        """
+        return self.__setups
+
+    def solve(self, A, b, x0 = None, M = None):
+        """
+        Método que resuelve el sistema A x = b.
+
+        @param A: objeto Matrix con almacenamiento 'csr' o matriz de scipy.sparse
+        @param b: lado derecho (normalmente Su[1:-1])
+        @param x0: valor inicial, p. ej. la solución del paso de tiempo anterior [nulo por defecto]
+        @param M: precondicionador ya construido; si es nulo se usa el de precond, que sólo se construye si A cambió [nulo por defecto]
+        @return: solución x
+        """
+        A = operator(A)
+        if M is None:
+            key = _key(A)
+            if key != self.__key:
+                self.__M = preconditioner(A, self.__precond)
+                self.__key = key
+                self.__setups += 1
+            M = self.__M
+        self.__iterations = 0
+        def count(xk):
+            self.__iterations += 1
+        kargs = dict(rtol = self.__rtol, atol = self.__atol,
+                     maxiter = self.__maxiter, M = M, callback = count)
+        if self.__method == 'gmres':
+            kargs['restart'] = self.__restart
+            kargs['callback_type'] = 'pr_norm'
+        tol = max(self.__rtol * np.linalg.norm(b), self.__atol)
+        for attempt in range(self.__retries + 1):
+            x, self.__info = _methods[self.__method](A, b, x0 = x0, **kargs)
+            if np.linalg.norm(b - A @ x) <= tol:
+                self.__info = 0
+                break
+            x0 = x
+        return x
+
+def operator(A):
+    """
+    Función que regresa la matriz dispersa de un objeto Matrix.
+
+    @param A: objeto Matrix con almacenamiento 'csr' o matriz de scipy.sparse
+    @return: matriz CSR
+    """
+    if hasattr(A, 'storage'):
+        if A.storage() != 'csr':
+            raise ValueError("Los solvers de Krylov requieren una Matrix con almacenamiento 'csr'")
+        A = A.mat()
+    if not isspmatrix_csr(A):
+        A = csr_matrix(A)
+    return A
+
+def preconditioner(A, kind):
+    """
+    Función que construye un precondicionador como LinearOperator.
+
+    @param A: matriz CSR del sistema
+    @param kind: 'jacobi', 'ilu0', 'banded', 'mg' o None
+    @return: LinearOperator que aproxima A^{-1} (o None)
+    """
+    return _preconditioners[kind](A)
+
+def _jacobi(A):
+    """
+    Precondicionador de Jacobi: inverso de la diagonal de A.
+    """
+    dinv = 1.0 / A.diagonal()
+    return LinearOperator(A.shape, matvec = lambda r: dinv * r, dtype = A.dtype)
+
+def _ilu0(A):
+    """
+    Precondicionador ILU(0): factorización incompleta sin pivoteo en la que L y
+    U conservan el patrón de A. Si el patrón es una banda completa (los
+    operadores 1D: tres o cinco diagonales) no hay relleno fuera de ella y
+    ILU(0) es la factorización LU en banda, que se calcula con LAPACK
+    (?gbtrf); si no, se hace la eliminación renglón por renglón (IKJ)
+    descartando las entradas fuera del patrón.
+    """
+    A = A.sorted_indices()
+    n = A.shape[0]
+    rows = np.repeat(np.arange(n), np.diff(A.indptr))
+    offsets = A.indices - rows
+    l, u = max(0, -offsets.min()), max(0, offsets.max())
+    if A.nnz == sum(n - abs(k) for k in range(-l, u + 1)):
+        lab = np.zeros((2 * l + u + 1, n))
+        lab[l + u - offsets, A.indices] = A.data
+        lu, piv, info = lapack.dgbtrf(lab, l, u, overwrite_ab = True)
+        if info > 0:
+            raise np.linalg.LinAlgError('La matriz del sistema es singular')
+        def apply(r):
+            x, info = lapack.dgbtrs(lu, l, u, r, piv)
+            return x
+        return LinearOperator(A.shape, matvec = apply, dtype = A.dtype)
+    LU = A.astype(float)
+    ptr, col, val = LU.indptr, LU.indices, LU.data
+    diag = np.array([ptr[i] + np.searchsorted(col[ptr[i]:ptr[i+1]], i) for i in range(n)])
+    for i in range(1, n):
+        where = dict(zip(col[ptr[i]:ptr[i+1]], range(ptr[i], ptr[i+1])))
+        for p in range(ptr[i], diag[i]):
+            k = col[p]
+            val[p] /= val[diag[k]]
+            for q in range(diag[k] + 1, ptr[k+1]):
+                j = where.get(col[q])
+                if j is not None:
+                    val[j] -= val[p] * val[q]
+    L = csr_matrix((np.where(col < rows, val, 0.0), col, ptr), shape = A.shape)
+    L.setdiag(1.0)
+    U = csr_matrix((np.where(col >= rows, val, 0.0), col, ptr), shape = A.shape)
+    def apply(r):
+        y = spsolve_triangular(L, r, lower = True, unit_diagonal = True)
+        return spsolve_triangular(U, y, lower = False)
+    return LinearOperator(A.shape, matvec = apply, dtype = A.dtype)
+
+def _banded(A):
+    """
+    Precondicionador LU en banda: factoriza (una sola vez) la parte
+    tridiagonal de A con LAPACK (?gttrf) y la aplica con ?gttrs.
+    """
+    dl, d, du, du2, ipiv, info = lapack.dgttrf(A.diagonal(-1), A.diagonal(0), A.diagonal(1))
+    if info != 0:
+        raise np.linalg.LinAlgError('La parte tridiagonal de la matriz es singular')
+    def apply(r):
+        x, info = lapack.dgttrs(dl, d, du, du2, ipiv, r)
+        return x
+    return LinearOperator(A.shape, matvec = apply, dtype = A.dtype)
+
+def _multigrid(A):
+    """
+    Precondicionador de multimalla: un ciclo V con Gauss-Seidel por colores.
+    """
+    return Multigrid(A, smoother = 'gs').aspreconditioner()
+
+def _key(A):
+    """
+    Hash de los valores y el patrón de una matriz CSR.
+    """
+    h = hashlib.blake2b(digest_size = 16)
+    for a in (A.indptr, A.indices, A.data):
+        h.update(np.ascontiguousarray(a).data)
+    return h.hexdigest()
+
+_methods = {'bicgstab': bicgstab, 'gmres': gmres, 'cg': cg}
+_preconditioners = {'jacobi': _jacobi, 'ilu0': _ilu0, 'banded': _banded, 'mg': _multigrid, None: lambda A: None}
+
+if __name__ == '__main__':
+
+    from Coefficients import Coefficients
+    from Diffusion import Diffusion1D
+    from Advection import Advection1D
+    from Matrix import Matrix
+
+    nvx = 202
+    coef = Coefficients()
+    coef.alloc(nvx)
+    df1 = Diffusion1D(nvx, 0.01, 0.01)
+    df1.calcCoef()
+    adv1 = Advection1D(nvx, 1.0, 0.01)
+    adv1.setU(0.5)
+    adv1.calcCoef('QUICK', 1, 0, 1)
+    A = Matrix(nvx, 'csr')
+    A.build(coef)
+    b = coef.Su()[1:-1]
+    xd = A.solve(b)
+    for method in ('bicgstab', 'gmres'):
+        for precond in ('jacobi', 'ilu0', 'banded'):
+            ks = KrylovSolver(method, precond, rtol = 1e-10)
+            x = ks.solve(A, b)
+            print('{:>8s} {:>6s} : iter = {:3d}, error = {:10.3e}'.format(method, precond, ks.iterations(), np.abs(x - xd).max()))
+    print('-' * 20)
+#
+# ILU(0) de la matriz pentadiagonal de QUICK: como el patrón es la banda
+# completa es la LU exacta; al resolver otra vez con la misma matriz (como en
+# cada paso de tiempo) el precondicionador no se vuelve a construir
+#
+    M = preconditioner(operator(A), 'ilu0')
+    E = M.matmat(A.mat().toarray()) - np.eye(nvx - 2)
+    print('ilu0: |M^-1 A - I| = {:.3e}'.format(np.abs(E).max()))
+    ks = KrylovSolver('bicgstab', 'ilu0', rtol = 1e-10)
+    for k in range(5):
+        A.build(coef)
+        x = ks.solve(A, b, x0 = x)
+    print('5 soluciones: precondicionadores construidos = {}'.format(ks.setups()))
+    print('-' * 20)
+
+    coef.cleanCoefficients()
+    df1.calcCoef()
+    coef.bcDirichlet('LEFT_WALL', 1)
+    coef.setDelta(0.01)
+    coef.setSu(1)
+    A.build(coef)
+    xd = A.solve(b)
+    ks = KrylovSolver('cg', 'jacobi', rtol = 1e-10)
+    x = ks.solve(A, b)
+    print('cg jacobi : iter = {}, error = {:10.3e}'.format(ks.iterations(), np.abs(x - xd).max()))
+    ks = KrylovSolver('cg', 'mg', rtol = 1e-10)
+    x = ks.solve(A, b)
+    print('cg mg : iter = {}, error = {:10.3e}'.format(ks.iterations(), np.abs(x - xd).max()))
+    x = ks.solve(A, b, x0 = xd + 1e-6)
+    print('cg mg (x0) : iter = {}, error = {:10.3e}'.format(ks.iterations(), np.abs(x - xd).max()))
+    print('-' * 20)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:48:20 2026
+
+Backend de los kernels más usados (coeficientes de advección, construcción
+de la matriz, TDMA/PDMA y el paso transitorio ensamblar + resolver).
+
+    'numpy' : implementación con NumPy de cada módulo (por defecto)
+    'numba' : los mismos ciclos compilados con Numba, si está instalado
+
+El backend se elige en tiempo de ejecución con setBackend (o con la
+variable de ambiente FVM_BACKEND). Si Numba no está instalado o no puede
+compilar los kernels se emite un aviso y se sigue usando NumPy. Los kernels
+compilados hacen las mismas operaciones, en el mismo orden, que la versión
+de NumPy, así que los resultados son idénticos.
+
+Los módulos piden un kernel con kernel(nombre); si regresa nulo usan su
+propia implementación con NumPy.
+"""
+
+import os
+import warnings
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+_kernels = {}
+_backend = 'numpy'
+
+# Número de cada esquema de Advection1D.calcCoef dentro de los kernels
+schemes = {'UpW': 1, 'UpW2': 2, 'QUICK': 3}
+
+def backends():
+    """
+    Función que regresa los backends disponibles en esta instalación.
+
+    @return: lista de nombres
+    """
+    return ['numpy'] + (['numba'] if numba is not None else [])
+
+def backend():
+    """
+    Función que regresa el nombre del backend activo.
+
+    @return: 'numpy' o 'numba'
+    """
+    return _backend
+
+def setBackend(name = 'numpy'):
+    """
+    Función que cambia el backend de los kernels. Con 'numba' los kernels se
+    compilan en ese momento; si falla la compilación se regresa a 'numpy'.
+
+    @param name: 'numpy', 'numba' o 'auto' (numba si está instalado) ['numpy' por defecto]
+    @return: nombre del backend que quedó activo
+    """
+    global _backend, _kernels
+    if name == 'auto':
+        name = 'numba' if numba is not None else 'numpy'
+    if name == 'numpy':
+        _backend, _kernels = 'numpy', {}
+    elif name == 'numba':
+        if numba is None:
+            warnings.warn('Numba no está instalado, se usará el backend de NumPy')
+            _backend, _kernels = 'numpy', {}
+        else:
+            try:
+                compiled = _compile()
+            except Exception as e:
+                warnings.warn('No se pudieron compilar los kernels ({}), se usará el backend de NumPy'.format(e))
+                _backend, _kernels = 'numpy', {}
+            else:
+                _backend, _kernels = 'numba', compiled
+    else:
+        raise ValueError('Backend desconocido: {}'.format(name))
+    return _backend
+
+def kernel(name):
+    """
+    Función que regresa el kernel compilado del backend activo.
+
+    @param name: 'advection', 'dense', 'bands', 'tdma', 'pdma' o 'transient'
+    @return: función compilada, o nulo si se debe usar la versión de NumPy
+    """
+    return _kernels.get(name)
+
+def _compile():
+    """
+    Función que compila los kernels con Numba probándolos con un problema pequeño.
+
+    @return: diccionario nombre -> kernel compilado
+    """
+    compiled = {'advection': _advection, 'dense': _dense, 'bands': _bands,
+                'tdma': _tdma, 'pdma': _pdma, 'transient': _transient}
+    nvx = 8
+    block = np.zeros((6, nvx))
+    u = np.ones(nvx - 1)
+    for s in range(4):
+        _advection(*block, u, 1.0, s, 1.0, 0.0, 0.1)
+    block[:] = 0.0
+    block[0] = 4.0
+    block[1:3] = 1.0
+    _dense(np.eye(nvx - 2), *block[:5])
+    _bands(np.zeros((5, nvx - 2)), *(b[1:-1] for b in block[:5]), 2)
+    x = np.empty((nvx - 2, 1))
+    work = np.empty((nvx - 2, 1))
+    _tdma(*(b[1:-1, None] for b in (block[0], block[1], block[2], block[5])), x, work)
+    _pdma(*(b[1:-1, None] for b in block), x, work, work.copy())
+    _transient(block, block.copy(), np.zeros(nvx), np.ones(nvx), True, 1)
+    return compiled
+
+def _jit(f):
+    """
+    Decorador de los kernels: los compila con Numba (de forma perezosa, en la
+    primera llamada) si está instalado. El código compilado se guarda en
+    __pycache__ para no recompilar en cada ejecución.
+    """
+    return numba.njit(f, cache = True) if numba is not None else f
+
+#
+# Kernels escritos como ciclos sobre los volúmenes. Se compilan con Numba; las
+# operaciones siguen el mismo orden que las versiones de NumPy.
+#
+@_jit
+def _pos(a):
+    """
+    max(a, 0) como lo calcula np.maximum.
+    """
+    return a if a >= 0.0 else 0.0
+
+@_jit
+def _advection(aP, aE, aW, aEE, aWW, Su, u, r, scheme, phiA, phiB, D):
+    """
+    Kernel de advectionCoef (ver Advection.py) para un solo problema.
+    """
+    nvx = aP.shape[0]
+    if scheme == 3:
+        start, end, f = 2, nvx-2, 0.125
+    else:
+        start, end, f = 1, nvx-1, 0.5
+    for k in range(start, end):
+        uE = u[k]
+        uW = u[k-1]
+        if scheme == 1:
+            CE = _pos(-uE)
+            CW = _pos(uW)
+            aE[k] += CE
+            aW[k] += CW
+            aP[k] += CE + CW + r * (uE - uW)
+        elif scheme == 2 or scheme == 3:
+            CE = _pos(r*uE*f)
+            CW = _pos(r*uW*f)
+            CEn = -_pos(-r*uE*f)
+            CWn = -_pos(-r*uW*f)
+            if scheme == 2:
+                aE[k] += -3*CEn-CWn
+                aW[k] += CE+3*CW
+                aEE[k] += CEn
+                aWW[k] += -CW
+                aP[k] += CE + 2*CW -2*CEn - CWn + r * (uE - uW)
+            else:
+                aE[k] += -3*CE - 6*CEn - CWn
+                aW[k] += 6*CW + CE + 3*CWn
+                aEE[k] += CEn
+                aWW[k] += -CW
+                aP[k] += - 2*CE + 5*CW - 5*CEn + 2*CWn + r * (uE - uW)
+        else:
+            CE = - r * uE * 0.5
+            CW =   r * uW * 0.5
+            aE[k] += CE
+            aW[k] += CW
+            aP[k] += CE + CW + r * (uE - uW)
+    if scheme != 2 and scheme != 3:
+        return
+    if 2 < end and u[2] > 0:
+        CW2 = _pos(r*u[1]*f)
+        aW2 = aW[2] + CW2
+        aW[2] = aW2
+        if scheme == 3:
+            aP[2] = aW2 + aE[2] - 2*CW2
+        Su[2] = Su[2] + - 2*CW2*phiA
+    if nvx-3 >= start and u[nvx-3] < 0:
+        CEn3 = -_pos(-r*u[nvx-3]*f)
+        aE3 = aE[nvx-3] - CEn3
+        aE[nvx-3] = aE3
+        if scheme == 3:
+            aP[nvx-3] = aW[nvx-3] + aE3 + 2*CEn3
+        Su[nvx-3] = Su[nvx-3] + 2*CEn3*phiB
+    if scheme == 2:
+        aP[1] += aW[1] + 3*aWW[1]
+        Su[1] += (2 * aW[1] + 4 * aWW[1]) * phiA
+        aP[nvx-2] += aE[nvx-2] + 3 * aEE[nvx-2]
+        Su[nvx-2] += (2 * aE[nvx-2] + 4 * aEE[nvx-2]) * phiB
+    else:
+        CE1 = _pos(r*u[1]*0.125)
+        CW1 = _pos(r*u[0]*0.125)
+        CEn1 = -_pos(-r*u[1]*0.125)
+        CWn1 = -_pos(-r*u[0]*0.125)
+        aE[1] += D/3 - 3*CE1 - 6*CEn1
+        aEE[1] += CEn1
+        Sp1 = -(8*D/3 + 2*CE1 + 8*CW1 + 8*CWn1)
+        aP[1] = aE[1] + aEE[1] -Sp1
+        Su[1] += - Sp1 * phiA
+        CEn = _pos(r*u[nvx-3]*0.125)
+        CWn = _pos(r*u[nvx-4]*0.125)
+        CEnn = -_pos(-r*u[nvx-3]*0.125)
+        CWnn = -_pos(-r*u[nvx-4]*0.125)
+        aW[nvx-2] += D/3 + 6*CWn + 3*CWnn
+        aWW[nvx-2] += -CWn
+        Spn = -(8*D/3 - 8*CEn - 8*CEnn -2*CWnn)
+        aP[nvx-2] = aW[nvx-2] + aWW[nvx-2] -Spn
+        Su[nvx-2] += -Spn * phiB
+
+@_jit
+def _dense(A, aP, aE, aW, aEE, aWW):
+    """
+    Kernel de Matrix.build con almacenamiento 'dense'.
+    """
+    N = A.shape[0]
+    A[0, 0] = aP[1]
+    A[0, 1] = -aE[1]
+    A[0, 2] = -aEE[1]
+    for i in range(1, N-1):
+        A[i, i] = aP[i+1]
+        A[i, i+1] = -aE[i+1]
+        A[i, i-1] = -aW[i+1]
+        if i > 1:
+            A[i, i-2] = -aWW[i+1]
+        if i < N-2:
+            A[i, i+2] = -aEE[i+1]
+    A[N-1, N-1] = aP[N]
+    A[N-1, N-2] = -aW[N]
+    A[N-1, N-3] = -aWW[N]
+
+@_jit
+def _bands(ab, WW, W, P, E, EE, l):
+    """
+    Kernel de Matrix.mat con almacenamiento 'banded': llena el arreglo de
+    diagonales de LAPACK (ab[u + i - j, j] = A[i, j]) en una sola pasada.
+    """
+    N = P.shape[0]
+    u = l
+    for j in range(N):
+        for r in range(2*l + 1):
+            ab[r, j] = 0.0
+        ab[u, j] = P[j]
+        if j >= 1:
+            ab[u-1, j] = -E[j-1]
+        if j < N-1:
+            ab[u+1, j] = -W[j+1]
+        if l == 2:
+            if j >= 2:
+                ab[0, j] = -EE[j-2]
+            if j < N-2:
+                ab[4, j] = -WW[j+2]
+
+@_jit
+def _tdma1(P, E, W, b, x, cp):
+    """
+    Algoritmo de Thomas para un solo sistema (ver LinearSolvers.tdma).
+    """
+    N = P.shape[0]
+    cp[0] = -E[0] / P[0]
+    x[0] = b[0] / P[0]
+    for i in range(1, N):
+        m = P[i] + W[i] * cp[i-1]
+        cp[i] = -E[i] / m
+        x[i] = (b[i] + W[i] * x[i-1]) / m
+    for i in range(N-2, -1, -1):
+        x[i] -= cp[i] * x[i+1]
+
+@_jit
+def _pdma1(P, E, W, EE, WW, b, x, al, be):
+    """
+    PDMA para un solo sistema (ver LinearSolvers.pdma).
+    """
+    N = P.shape[0]
+    mu = P[0]
+    al[0] = -E[0] / mu
+    be[0] = -EE[0] / mu
+    x[0] = b[0] / mu
+    if N > 1:
+        ga = -W[1]
+        mu = P[1] - al[0] * ga
+        al[1] = (-E[1] - be[0] * ga) / mu
+        be[1] = -EE[1] / mu
+        x[1] = (b[1] - x[0] * ga) / mu
+    for i in range(2, N):
+        e = -WW[i]
+        ga = -W[i] - al[i-2] * e
+        mu = P[i] - be[i-2] * e - al[i-1] * ga
+        al[i] = (-E[i] - be[i-1] * ga) / mu
+        be[i] = -EE[i] / mu
+        x[i] = (b[i] - x[i-2] * e - x[i-1] * ga) / mu
+    if N > 1:
+        x[N-2] -= al[N-2] * x[N-1]
+    for i in range(N-3, -1, -1):
+        x[i] -= al[i] * x[i+1] + be[i] * x[i+2]
+
+@_jit
+def _tdma(P, E, W, b, x, cp):
+    """
+    Kernel de LinearSolvers.tdma. Todos los arreglos son de tamaño (N, k); los
+    coeficientes y cp pueden tener una sola columna (mismos coeficientes para
+    las k cargas).
+    """
+    for j in range(b.shape[1]):
+        c = j if P.shape[1] > 1 else 0
+        _tdma1(P[:, c], E[:, c], W[:, c], b[:, j], x[:, j], cp[:, c])
+
+@_jit
+def _pdma(P, E, W, EE, WW, b, x, al, be):
+    """
+    Kernel de LinearSolvers.pdma (ver _tdma).
+    """
+    for j in range(b.shape[1]):
+        c = j if P.shape[1] > 1 else 0
+        _pdma1(P[:, c], E[:, c], W[:, c], EE[:, c], WW[:, c], b[:, j], x[:, j], al[:, c], be[:, c])
+
+@_jit
+def _transient(block, static, phi, dx_dt, penta, nsteps):
+    """
+    Kernel de Assembler.step: nsteps pasos de tiempo con los coeficientes
+    fijos (static), cada uno Su = Su_static + phi dx/dt seguido de TDMA/PDMA
+    (dx_dt es un arreglo de tamaño nvx). Las bandas ya son las de static
+    (Assembler.assemble), así que sólo se restablece Su.
+    """
+    nvx = phi.shape[0]
+    N = nvx - 2
+    al = np.empty(N, dtype = block.dtype)
+    be = np.empty(N, dtype = block.dtype)
+    x = np.empty(N)
+    for step in range(nsteps):
+        for k in range(nvx):
+            block[5, k] = static[5, k]
+        for k in range(1, nvx-1):
+            block[5, k] += phi[k] * dx_dt[k]
+        P = block[0, 1:nvx-1]
+        E = block[1, 1:nvx-1]
+        W = block[2, 1:nvx-1]
+        b = block[5, 1:nvx-1]
+        if penta:
+            _pdma1(P, E, W, block[3, 1:nvx-1], block[4, 1:nvx-1], b, x, al, be)
+        else:
+            _tdma1(P, E, W, b, x, al)
+        for k in range(N):
+            phi[k+1] = x[k]
+
+setBackend(os.environ.get('FVM_BACKEND', 'numpy'))
+
+if __name__ == '__main__':
+
+    import time
+    from Coefficients import Coefficients
+    from Diffusion import Diffusion1D
+    from Advection import Advection1D
+    from Temporal import Temporal1D
+    from Assembly import Assembler
+#
+# Los demás módulos usan el módulo Kernels importado, no __main__
+#
+    import Kernels
+
+    print('Backends disponibles: {}'.format(Kernels.backends()))
+#
+# Problema de la Tarea-6.1 con cada backend y cada esquema
+#
+    nvx = 352
+    dx = 2.5 / (nvx - 2)
+    gamma = 0.001
+    for scheme in ('', 'UpW', 'UpW2', 'QUICK'):
+        results = {}
+        for name in Kernels.backends():
+            Kernels.setBackend(name)
+            coef = Coefficients(nvx, dx, private = True)
+            coef.alloc(nvx)
+            df1 = Diffusion1D(nvx, gamma, dx, coefficients = coef)
+            adv1 = Advection1D(nvx, 1.0, dx, coefficients = coef)
+            adv1.setU(1.0)
+            tem = Temporal1D(nvx, 1.0, dx, 0.002, coefficients = coef)
+            asm = Assembler(coef)
+            asm.addTerm(df1)
+            asm.addTerm(adv1, scheme, 1.0, 0.0, gamma / dx)
+            asm.setTemporal(tem)
+            if scheme not in ('UpW2', 'QUICK'):
+                asm.addBoundary('LEFT_WALL', 'Dirichlet', 1.0)
+                asm.addBoundary('RIGHT_WALL', 'Dirichlet', 0.0)
+            phi = np.zeros(nvx)
+            phi[0] = 1.0
+            asm.step(phi)
+            t1 = time.time()
+            asm.step(phi, 499)
+            t2 = time.time()
+            results[name] = phi
+            print('{:>6s} {:>6s}: 500 pasos en {:.4f} s'.format(scheme or 'CD', name, t2 - t1))
+        if 'numba' in results:
+            print('max |numba - numpy| = {:.3e}'.format(np.abs(results['numba'] - results['numpy']).max()))
+    Kernels.setBackend('numpy')
+    print('-' * 20)
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:12:31 2026
+
+Solvers directos para los sistemas en banda que produce el método de
+Volumen Finito en una dimensión.
+
+Ambos algoritmos trabajan directamente con los arreglos de coeficientes
+(aP, aE, aW, aEE, aWW) de la clase Coefficients, con la convención
+
+    aP[i] phi[i] = aE[i] phi[i+1] + aW[i] phi[i-1] + aEE[i] phi[i+2] + aWW[i] phi[i-2] + Su[i]
+
+y con el lado derecho Su[1:-1]. El costo es O(N). El lado derecho puede ser
+un arreglo de tamaño (N,) o un bloque (N, k) con k cargas distintas que se
+resuelven en una sola pasada. Si los coeficientes tienen tamaño (nvx, m), se
+resuelven m sistemas distintos a la vez con b de tamaño (N, m). Los arreglos
+de trabajo pueden darse desde fuera para no alojar memoria dentro de un ciclo
+temporal.
+"""
+
+import hashlib
+import numpy as np
+from scipy.linalg import lapack
+from Matrix import Matrix
+import Kernels
+
+def tdma(aP, aE, aW, b, x = None, work = None):
+    """
+    Algoritmo de Thomas (TDMA) para sistemas tridiagonales.
+
+    @param aP: coeficientes aP de los volúmenes (tamaño nvx)
+    @param aE: coeficientes aE de los volúmenes (tamaño nvx)
+    @param aW: coeficientes aW de los volúmenes (tamaño nvx)
+    @param b: lado derecho, Su[1:-1], de tamaño (N,) o (N, k)
+    @param x: arreglo donde se guarda la solución, del tamaño de b; puede ser b mismo [nulo por defecto]
+    @param work: arreglo de trabajo del tamaño de aP[1:-1] [nulo por defecto]
+    @return: solución x
+    """
+    P = aP[1:-1]
+    E = aE[1:-1]
+    W = aW[1:-1]
+    N = P.shape[0]
+    if x is None:
+        x = np.empty(np.shape(b), dtype = np.result_type(b, P))
+    if work is None:
+        work = np.empty_like(P)
+    k = Kernels.kernel('tdma')
+    if k is not None:
+        k(*_columns(P, E, W, b, x, work))
+        return x
+    cp = work
+#
+# Eliminación hacia adelante: cp guarda el superdiagonal normalizado
+# y x guarda el lado derecho modificado.
+#
+    cp[0] = -E[0] / P[0]
+    x[0] = b[0] / P[0]
+    for i in range(1, N):
+        m = P[i] + W[i] * cp[i-1]
+        cp[i] = -E[i] / m
+        x[i] = (b[i] + W[i] * x[i-1]) / m
+#
+# Sustitución hacia atrás
+#
+    for i in range(N-2, -1, -1):
+        x[i] -= cp[i] * x[i+1]
+    return x
+
+def pdma(aP, aE, aW, aEE, aWW, b, x = None, work = None):
+    """
+    Eliminación gaussiana sin pivoteo para sistemas pentadiagonales (PDMA).
+
+    @param aP: coeficientes aP de los volúmenes (tamaño nvx)
+    @param aE: coeficientes aE de los volúmenes (tamaño nvx)
+    @param aW: coeficientes aW de los volúmenes (tamaño nvx)
+    @param aEE: coeficientes aEE de los volúmenes (tamaño nvx)
+    @param aWW: coeficientes aWW de los volúmenes (tamaño nvx)
+    @param b: lado derecho, Su[1:-1], de tamaño (N,) o (N, k)
+    @param x: arreglo donde se guarda la solución, del tamaño de b; puede ser b mismo [nulo por defecto]
+    @param work: arreglo de trabajo de tamaño (2,) + aP[1:-1].shape [nulo por defecto]
+    @return: solución x
+    """
+    P = aP[1:-1]
+    E = aE[1:-1]
+    W = aW[1:-1]
+    EE = aEE[1:-1]
+    WW = aWW[1:-1]
+    N = P.shape[0]
+    if x is None:
+        x = np.empty(np.shape(b), dtype = np.result_type(b, P))
+    if work is None:
+        work = np.empty((2,) + P.shape)
+    k = Kernels.kernel('pdma')
+    if k is not None:
+        k(*_columns(P, E, W, EE, WW, b, x, work[0], work[1]))
+        return x
+    al = work[0]
+    be = work[1]
+#
+# Renglón i: -aWW x[i-2] - aW x[i-1] + aP x[i] - aE x[i+1] - aEE x[i+2] = b[i]
+# Se factoriza como L U con U bidiagonal superior unitaria (al, be).
+#
+    mu = P[0]
+    al[0] = -E[0] / mu
+    be[0] = -EE[0] / mu
+    x[0] = b[0] / mu
+    if N > 1:
+        ga = -W[1]
+        mu = P[1] - al[0] * ga
+        al[1] = (-E[1] - be[0] * ga) / mu
+        be[1] = -EE[1] / mu
+        x[1] = (b[1] - x[0] * ga) / mu
+    for i in range(2, N):
+        e = -WW[i]
+        ga = -W[i] - al[i-2] * e
+        mu = P[i] - be[i-2] * e - al[i-1] * ga
+        al[i] = (-E[i] - be[i-1] * ga) / mu
+        be[i] = -EE[i] / mu
+        x[i] = (b[i] - x[i-2] * e - x[i-1] * ga) / mu
+#
+# Sustitución hacia atrás
+#
+    if N > 1:
+        x[N-2] -= al[N-2] * x[N-1]
+    for i in range(N-3, -1, -1):
+        x[i] -= al[i] * x[i+1] + be[i] * x[i+2]
+    return x
+
+def _columns(*arrays):
+    """
+    Regresa los arreglos de tamaño (N,) como columnas (N, 1), la forma que usan
+    los kernels compilados de TDMA/PDMA.
+    """
+    arrays = (np.asarray(a) for a in arrays)
+    return tuple(a[:, None] if a.ndim == 1 else a for a in arrays)
+
+def bandedMatvec(aP, aE, aW, aEE, aWW, x, out = None):
+    """
+    Función que calcula el producto A x de la matriz pentadiagonal definida por
+    los coeficientes (misma convención que Matrix) con un vector de incógnitas,
+    en precisión doble.
+
+    @param aP, aE, aW, aEE, aWW: coeficientes de los volúmenes (tamaño nvx)
+    @param x: vector de incógnitas de tamaño N = nvx - 2
+    @param out: arreglo donde se guarda el resultado [nulo por defecto]
+    @return: producto A x
+    """
+    P = np.asarray(aP[1:-1], dtype = np.float64)
+    E = aE[1:-1]
+    W = aW[1:-1]
+    EE = aEE[1:-1]
+    WW = aWW[1:-1]
+    y = np.multiply(P, x, out = out)
+    y[:-1] -= E[:-1] * x[1:]
+    y[1:] -= W[1:] * x[:-1]
+    y[:-2] -= EE[:-2] * x[2:]
+    y[2:] -= WW[2:] * x[:-2]
+    return y
+
+class FactorizationCache():
+    """
+    Clase que guarda la factorización LU en banda de la matriz de un problema
+    y la reutiliza mientras los coeficientes (aP, aE, aW, aEE, aWW) no cambien.
+    Para detectar cambios se calcula un hash de los coeficientes de los
+    volúmenes interiores; si coincide con el de la última factorización sólo
+    se hace la sustitución hacia adelante y hacia atrás.
+
+    Con dtype = np.float32 la factorización y las sustituciones se hacen en
+    precisión simple (la mitad del tráfico de memoria) y la precisión doble se
+    recupera con refinamiento iterativo: el residuo b - A x se calcula en
+    precisión doble y la corrección se resuelve con los factores en simple.
+    El refinamiento converge si cond(A) * 6e-8 < 1, lo que se cumple en los
+    problemas transitorios (aP domina gracias a rho dx / dt) pero no en
+    problemas estacionarios de difusión con mallas muy finas.
+    """
+
+    def __init__(self, dtype = np.float64, rtol = 1e-12, maxrefine = 10):
+        """
+        Constructor de la clase.
+
+        @param dtype: precisión de la factorización, np.float64 o np.float32 [np.float64 por defecto]
+        @param rtol: tolerancia relativa del residuo para el refinamiento iterativo [1e-12 por defecto]
+        @param maxrefine: número máximo de pasos de refinamiento [10 por defecto]
+        """
+        if dtype == np.float32:
+            self.__gbtrf, self.__gbtrs = lapack.sgbtrf, lapack.sgbtrs
+        elif dtype == np.float64:
+            self.__gbtrf, self.__gbtrs = lapack.dgbtrf, lapack.dgbtrs
+        else:
+            raise ValueError('Precisión no soportada: {}'.format(dtype))
+        self.__dtype = np.dtype(dtype)
+        self.__rtol = rtol
+        self.__maxrefine = maxrefine
+        self.__refinements = 0
+        self.__key = None
+        self.__A = None
+        self.__nvx = None
+        self.__factor = None
+        self.__hits = 0
+        self.__misses = 0
+
+    def hits(self):
+        """
+        Método que regresa el número de soluciones que reutilizaron la factorización.
+
+        @return: número de aciertos
+        """
+        return self.__hits
+
+    def misses(self):
+        """
+        Método que regresa el número de veces que se tuvo que factorizar.
+
+        @return: número de factorizaciones
+        """
+        return self.__misses
+
+    def refinements(self):
+        """
+        Método que regresa el número de pasos de refinamiento de la última solución.
+
+        @return: número de pasos de refinamiento
+        """
+        return self.__refinements
+
+    def clear(self):
+        """
+        Método que descarta la factorización guardada.
+        """
+        self.__key = None
+        self.__factor = None
+
+    def solve(self, coefficients, b):
+        """
+        Método que resuelve el sistema definido por los coeficientes, factorizando
+        sólo si la matriz cambió desde la última llamada.
+
+        @param coefficients: objeto con los coeficientes del problema (Coefficients o derivados)
+        @param b: lado derecho (Su[1:-1]), de tamaño (N,) o (N, k)
+        @return: solución x
+        """
+        key = self.key(coefficients)
+        if key != self.__key:
+            self.__factorize(coefficients)
+            self.__key = key
+            self.__misses += 1
+        else:
+            self.__hits += 1
+        lu, piv, l, u = self.__factor
+        x, info = self.__gbtrs(lu, l, u, b, piv)
+        self.__refinements = 0
+        if self.__dtype == np.float64:
+            return x
+#
+# Refinamiento iterativo: residuo en precisión doble, corrección en simple
+#
+        b = np.asarray(b, dtype = np.float64)
+        x = x.astype(np.float64)
+        bnorm = np.linalg.norm(b)
+        c = coefficients
+        while self.__refinements < self.__maxrefine:
+            r = b - bandedMatvec(c.aP(), c.aE(), c.aW(), c.aEE(), c.aWW(), x)
+            if np.linalg.norm(r) <= self.__rtol * bnorm:
+                break
+            d, info = self.__gbtrs(lu, l, u, r.astype(self.__dtype), piv)
+            x += d
+            self.__refinements += 1
+        return x
+
+    @staticmethod
+    def key(coefficients):
+        """
+        Método que calcula el hash de los coeficientes interiores de la matriz.
+
+        @param coefficients: objeto con los coeficientes del problema
+        @return: cadena con el hash
+        """
+        h = hashlib.blake2b(digest_size = 16)
+        for a in (coefficients.aP(), coefficients.aE(), coefficients.aW(),
+                  coefficients.aEE(), coefficients.aWW()):
+            h.update(np.ascontiguousarray(a[1:-1]).data)
+        return h.hexdigest()
+
+    def __factorize(self, coefficients):
+        """
+        Método que construye la matriz en banda y calcula su factorización LU (?gbtrf).
+        """
+        nvx = coefficients.aP().shape[0]
+        if self.__A is None or self.__nvx != nvx:
+            self.__A = Matrix(nvx, 'banded')
+            self.__nvx = nvx
+        self.__A.build(coefficients)
+        ab = self.__A.mat()
+        l, u = self.__A.bandwidth()
+        lab = np.zeros((2 * l + u + 1, ab.shape[1]), dtype = self.__dtype)
+        lab[l:] = ab
+        lu, piv, info = self.__gbtrf(lab, l, u, overwrite_ab = True)
+        if info > 0:
+            raise np.linalg.LinAlgError('La matriz del sistema es singular')
+        self.__factor = (lu, piv, l, u)
+
+if __name__ == '__main__':
+
+    from Diffusion import Diffusion1D
+    from Advection import Advection1D
+    from Matrix import Matrix
+
+    df1 = Diffusion1D(8, 1, 0.25)
+    df1.alloc(8)
+    df1.calcCoef()
+    df1.setSu(100)
+    df1.bcDirichlet('LEFT_WALL', 2)
+    df1.bcDirichlet('RIGHT_WALL', 1)
+    A = Matrix(8)
+    A.build(df1)
+    Su = df1.Su()
+    print(np.linalg.solve(A.mat(), Su[1:-1]))
+    print(tdma(df1.aP(), df1.aE(), df1.aW(), Su[1:-1]))
+    print('-' * 20)
+
+    B = np.column_stack((Su[1:-1], 2 * Su[1:-1]))
+    print(tdma(df1.aP(), df1.aE(), df1.aW(), B))
+    print('-' * 20)
+
+    af1 = Advection1D(8, 1, 0.25)
+    af1.setU(0.5)
+    af1.calcCoef('QUICK', 2, 1, 4)
+    A.build(af1)
+    print(np.linalg.solve(A.mat(), Su[1:-1]))
+    print(pdma(af1.aP(), af1.aE(), af1.aW(), af1.aEE(), af1.aWW(), Su[1:-1]))
+    print('-' * 20)
+
+    cache = FactorizationCache()
+    for k in range(3):
+        print(cache.solve(af1, Su[1:-1]))
+    print('hits = {}, misses = {}'.format(cache.hits(), cache.misses()))
+    print('-' * 20)
+
+#
+# Coeficientes en precisión simple, factorización en simple y refinamiento
+# iterativo en doble
+#
+    from Coefficients import Coefficients
+    from Temporal import Temporal1D
+    nvx = 100002
+    dx = 2.5 / (nvx - 2)
+    coef = Coefficients(nvx, dx, private = True)
+    coef.alloc(nvx, dtype = np.float32)
+    df1 = Diffusion1D(nvx, 0.001, dx, coefficients = coef)
+    df1.calcCoef()
+    af1 = Advection1D(nvx, 1.0, dx, coefficients = coef)
+    af1.setU(1.0)
+    af1.calcCoef('UpW')
+    tem = Temporal1D(nvx, 1.0, dx, 0.002, coefficients = coef)
+    tem.calcCoef(np.sin(np.linspace(0, 10, nvx)))
+    coef.bcDirichlet('LEFT_WALL', 1)
+    coef.bcDirichlet('RIGHT_WALL', 0)
+    b = coef.Su()[1:-1].astype(np.float64)
+    x64 = FactorizationCache().solve(coef, b)
+    cache32 = FactorizationCache(np.float32)
+    x32 = cache32.solve(coef, b)
+    print('block: {} {}'.format(coef.block().shape, coef.block().dtype))
+    print('refinamientos = {}, max |x32 - x64| / max |x64| = {:.3e}'.format(cache32.refinements(), np.abs(x32 - x64).max() / np.abs(x64).max()))
+    print('-' * 20)
@@ -6,21 +6,151 @@ Created on Tue Mar  6 18:15:28 2018
 @author: Luis Miguel de la Cruz Salas
 Documented by: Daniel Becerra Pedraza
 """
+import threading
 import numpy as np
+from scipy.linalg import solve_banded
+from scipy.sparse import csr_matrix, identity, kron
+from scipy.sparse.linalg import spsolve
+import Kernels
+
+# Patrones de dispersión CSR ya calculados, por (N, l): se calculan una sola
+# vez por malla y los comparten todas las matrices del mismo tamaño.
+_patterns = {}
+_patternsLock = threading.Lock()
+
+def _csrPattern(N, l):
+    """
+    Función que calcula (o recupera) el patrón CSR de una matriz en banda de
+    N x N con l diagonales a cada lado de la principal.
+    
+    @param N: número de incógnitas
+    @param l: número de diagonales inferiores (y superiores), 1 o 2
+    @return: (indptr, indices, posiciones), donde posiciones[k] indica en qué
+             lugar del arreglo data va la diagonal k (k = -l, ..., l)
+    """
+    key = (N, l)
+    with _patternsLock:
+        if key not in _patterns:
+            _patterns[key] = _newPattern(N, l)
+        return _patterns[key]
+
+def _newPattern(N, l):
+    """
+    Función que calcula el patrón CSR de una matriz en banda (ver _csrPattern).
+    """
+    offsets = range(-l, l + 1)
+    rows = []
+    cols = []
+    for k in offsets:
+        r = np.arange(max(0, -k), min(N, N - k))
+        rows.append(r)
+        cols.append(r + k)
+    rows = np.concatenate(rows)
+    cols = np.concatenate(cols)
+    order = np.lexsort((cols, rows))
+    where = np.empty_like(order)
+    where[order] = np.arange(order.size)
+    indptr = np.zeros(N + 1, dtype = np.int64)
+    np.cumsum(np.bincount(rows, minlength = N), out = indptr[1:])
+    positions = {}
+    start = 0
+    for k in offsets:
+        n = N - abs(k)
+        positions[k] = where[start:start + n]
+        start += n
+    return (indptr, cols[order], positions)
+
+def _cartesianPattern(shape):
+    """
+    Función que calcula (o recupera) el patrón CSR de la matriz de una malla
+    cartesiana de volúmenes interiores de tamaño shape (5 o 7 diagonales).
+    
+    El patrón es la suma de Kronecker de los patrones tridiagonales 1D de cada
+    eje (ver _csrPattern): kron(I, T_a, I) pone en su lugar las diagonales del
+    eje a, y la identidad la diagonal principal. Cada diagonal se marca con un
+    número para saber después en qué posiciones de data va. El costo es lineal
+    en el número de volúmenes.
+    
+    @param shape: número de volúmenes interiores en cada eje
+    @return: (indptr, indices, posiciones), donde posiciones[0] es la diagonal
+             principal y posiciones[(a, 1)] y posiciones[(a, -1)] las de los
+             vecinos al final y al inicio del eje a
+    """
+    key = ('cartesian',) + tuple(shape)
+    with _patternsLock:
+        if key in _patterns:
+            return _patterns[key]
+    N = int(np.prod(shape))
+    A = identity(N, format = 'csr')
+    for a, n in enumerate(shape):
+        indptr, indices, positions = _csrPattern(n, 1)
+        data = np.zeros(indices.size)
+        data[positions[1]] = 2 * a + 2
+        data[positions[-1]] = 2 * a + 3
+        T = csr_matrix((data, indices, indptr), shape = (n, n))
+        T.eliminate_zeros()
+        before = int(np.prod(shape[:a]))
+        after = int(np.prod(shape[a+1:]))
+        A = A + kron(kron(identity(before), T), identity(after), format = 'csr')
+    A.sort_indices()
+    labels = np.rint(A.data).astype(int)
+    positions = {0: np.flatnonzero(labels == 1)}
+    for a in range(len(shape)):
+        positions[(a, 1)] = np.flatnonzero(labels == 2 * a + 2)
+        positions[(a, -1)] = np.flatnonzero(labels == 2 * a + 3)
+    pattern = (A.indptr.astype(np.int64), A.indices.astype(np.int64), positions)
+    with _patternsLock:
+        _patterns[key] = pattern
+    return pattern
 
 class Matrix():
     """
     Clase que construye una matriz n diagonal (con n=3 o n=4 dependiendo del problema en este caso) con la cual se aproximará la solución de una ecouación determinada.
+
+    Se tienen tres formas de almacenamiento:
+        'dense'  : matriz completa de N x N (comportamiento original).
+        'banded' : sólo se guardan las diagonales, tomadas como vistas de los
+                   arreglos aP, aE, aW, aEE y aWW, y el sistema se resuelve con
+                   una factorización LU en banda. Si aEE y aWW son cero se usa
+                   automáticamente el formato tridiagonal.
+        'csr'    : matriz dispersa de scipy.sparse. El patrón (indptr, indices)
+                   se calcula una vez por malla; cada build sólo sobrescribe
+                   el arreglo data de forma vectorizada.
+    
+    En una malla cartesiana de 2 o 3 dimensiones (nvx es la tupla de volúmenes
+    por eje, ver CartesianCoefficients) sólo se puede usar 'csr'; el patrón
+    se construye con sumas de Kronecker de los patrones 1D y las incógnitas
+    se numeran en el orden de los arreglos de numpy (el último eje es el más
+    rápido), es decir, x = Su[coef.interior()].ravel().
     """
     
-    def __init__(self, nvx = None):
+    def __init__(self, nvx = None, storage = 'dense'):
         """
         Constructor de la clase.
         
         @param nvx: número de volúmenes
+        @param storage: tipo de almacenamiento, 'dense', 'banded' o 'csr' ['dense' por defecto]
         """
+        self.__shape = None
+        if np.ndim(nvx):
+            if storage != 'csr':
+                raise ValueError('En una malla cartesiana sólo se puede usar el almacenamiento csr')
+            self.__shape = tuple(n - 2 for n in nvx)
+            nvx = int(np.prod(self.__shape)) + 2
         self.__N = nvx - 2 
-        self.__A = np.eye(self.__N)
+        self.__storage = storage
+        self.__bands = None
+        self.__lu = (2, 2)
+        if storage == 'banded':
+            self.__A = None
+            self.__ab = np.zeros((5, self.__N))
+        elif storage == 'csr':
+            self.__A = None
+            self.__pattern = None
+        elif storage == 'dense':
+            self.__A = np.eye(self.__N)
+        else:
+            raise ValueError('Tipo de almacenamiento desconocido: {}'.format(storage))
 
     def __del__(self):
         """
@@ -29,13 +159,71 @@ class Matrix():
         del(self.__N)
         del(self.__A)
         
+    def storage(self):
+        """
+        Método que regresa el tipo de almacenamiento de la matriz.
+        
+        @return: 'dense', 'banded' o 'csr'
+        """
+        return self.__storage
+
+    def bandwidth(self):
+        """
+        Método que regresa el número de diagonales inferiores y superiores de la matriz en banda.
+        
+        @return: tupla (l, u), (1, 1) para tridiagonal y (2, 2) para pentadiagonal
+        """
+        return self.__lu
+
     def mat(self):
         """
         Método que regresa la matriz definida.
+        En modo 'banded' regresa el arreglo de diagonales en el formato de
+        LAPACK (ver scipy.linalg.solve_banded): ab[u + i - j, j] = A[i, j].
+        En modo 'csr' regresa un objeto scipy.sparse.csr_matrix.
         
         @return: matriz definida.
         """
+        if self.__storage == 'banded':
+            return self.__fillBands()
         return self.__A
+
+    def __fillBands(self):
+        """
+        Método que copia las diagonales (vistas de los coeficientes) al arreglo
+        de trabajo que usa la factorización LU en banda.
+        
+        @return: arreglo de diagonales de tamaño (l + u + 1, N)
+        """
+        aWW, aW, aP, aE, aEE = self.__bands
+        l, u = self.__lu
+        ab = self.__ab[:l + u + 1]
+        k = Kernels.kernel('bands')
+        if k is not None:
+            k(ab, aWW, aW, aP, aE, aEE, l)
+            return ab
+        ab[:] = 0.0
+        if l == 2:
+            np.negative(aEE[:-2], out = ab[0,2:])
+            np.negative(aWW[2:], out = ab[4,:-2])
+        np.negative(aE[:-1], out = ab[u-1,1:])
+        ab[u,:] = aP
+        np.negative(aW[1:], out = ab[u+1,:-1])
+        return ab
+
+    def solve(self, b):
+        """
+        Método que resuelve el sistema A x = b con la matriz construida.
+        
+        @param b: lado derecho del sistema (normalmente Su[1:-1])
+        @return: solución x
+        """
+        if self.__storage == 'banded':
+            return solve_banded(self.__lu, self.__fillBands(), b,
+                                overwrite_ab = True, check_finite = False)
+        if self.__storage == 'csr':
+            return spsolve(self.__A, b)
+        return np.linalg.solve(self.__A, b)
     
     def build(self, coefficients = None):
         """
@@ -55,12 +243,25 @@ class Matrix():
 # 2 | [  0. -4.  8. -4.]
 # 3 | [  0.  0. -4. 12.]]
 
+        if self.__shape is not None:
+            self.__buildCartesian(coefficients)
+            return
         aP = coefficients.aP()
         aE = coefficients.aE()
         aW = coefficients.aW()
         aEE = coefficients.aEE()
         aWW = coefficients.aWW()
+        if self.__storage == 'banded':
+            self.__buildBanded(aP, aE, aW, aEE, aWW)
+            return
+        if self.__storage == 'csr':
+            self.__buildCSR(aP, aE, aW, aEE, aWW)
+            return
         A = self.__A
+        k = Kernels.kernel('dense')
+        if k is not None:
+            k(A, aP, aE, aW, aEE, aWW)
+            return
         A[0][0] = aP[1]
         A[0][1] = -aE[1]
         A[0][2] = -aEE[1]
@@ -76,6 +277,65 @@ class Matrix():
         A[-1][-2] = -aW[-2]
         A[-1][-3] = -aWW[-2]
 
+    def __buildBanded(self, aP, aE, aW, aEE, aWW):
+        """
+        Método que guarda las diagonales como vistas de los coeficientes (sin copiarlos).
+        Si aEE y aWW son cero en los volúmenes interiores se usa el formato tridiagonal.
+        """
+        self.__bands = (aWW[1:-1], aW[1:-1], aP[1:-1], aE[1:-1], aEE[1:-1])
+        if aEE[1:-1].any() or aWW[1:-1].any():
+            self.__lu = (2, 2)
+        else:
+            self.__lu = (1, 1)
+
+    def __buildCSR(self, aP, aE, aW, aEE, aWW):
+        """
+        Método que llena la matriz CSR a partir de los coeficientes en un solo paso vectorizado.
+        El patrón de dispersión se reutiliza; sólo se sobrescribe el arreglo data.
+        """
+        self.__buildBanded(aP, aE, aW, aEE, aWW)
+        l = self.__lu[0]
+        N = self.__N
+        if self.__A is None or self.__pattern != l:
+            indptr, indices, positions = _csrPattern(N, l)
+            self.__A = csr_matrix((np.zeros(indices.size), indices, indptr), shape = (N, N))
+            self.__A.has_sorted_indices = True
+            self.__pattern = l
+            self.__positions = positions
+        data = self.__A.data
+        pos = self.__positions
+        aWW, aW, aP, aE, aEE = self.__bands
+        data[pos[0]] = aP
+        data[pos[1]] = -aE[:-1]
+        data[pos[-1]] = -aW[1:]
+        if l == 2:
+            data[pos[2]] = -aEE[:-2]
+            data[pos[-2]] = -aWW[2:]
+
+    def __buildCartesian(self, coefficients):
+        """
+        Método que llena la matriz CSR de una malla cartesiana a partir de los
+        coeficientes; cada diagonal se copia de una sola vez de la vista de los
+        volúmenes interiores que tienen ese vecino.
+        """
+        shape = self.__shape
+        if self.__A is None:
+            indptr, indices, positions = _cartesianPattern(shape)
+            self.__A = csr_matrix((np.zeros(indices.size), indices, indptr), shape = (self.__N, self.__N))
+            self.__A.has_sorted_indices = True
+            self.__positions = positions
+        data = self.__A.data
+        pos = self.__positions
+        inner = coefficients.interior()
+        data[pos[0]] = coefficients.aP()[inner].ravel()
+        for a in range(len(shape)):
+            aHigh, aLow = coefficients.neighbors(a)
+            cut = [slice(None)] * len(shape)
+            cut[a] = slice(None, -1)
+            data[pos[(a, 1)]] = -aHigh[inner][tuple(cut)].ravel()
+            cut[a] = slice(1, None)
+            data[pos[(a, -1)]] = -aLow[inner][tuple(cut)].ravel()
+
 if __name__ == '__main__':
 
     a = Matrix(6)
@@ -99,3 +359,23 @@ if __name__ == '__main__':
     a.build(df1)
     print(a.mat())
     print('-' * 20)  
+
+    b = Matrix(6, 'banded')
+    b.build(df1)
+    print(b.bandwidth(), b.mat(), sep = '\n')
+    print(a.solve(df1.Su()[1:-1]), b.solve(df1.Su()[1:-1]), sep = '\n')
+    print('-' * 20)  
+
+    c = Matrix(6, 'csr')
+    c.build(df1)
+    print(c.mat().toarray(), c.solve(df1.Su()[1:-1]), sep = '\n')
+    print('-' * 20)
+
+    from Diffusion import Diffusion2D
+    d = Diffusion2D(5, 4, 1, 0.25, 0.5)
+    d.alloc()
+    d.calcCoef()
+    e = Matrix(d.volumes(), 'csr')
+    e.build(d)
+    print(e.mat().toarray())
+    print('-' * 20)  
@@ -14,20 +14,25 @@ class Mesh():
     Método para contruir la malla en la cual se resolverá el problema de volumen finito dado.
     """
     
-    def __init__(self, nodes = None, volumes = None, length = None):
+    def __init__(self, nodes = None, volumes = None, length = None, faces = None):
         """
         Constructor de la clase.
         
         @param nodes: número de nodos [nulo por defecto]
         @param volumes: número de volumenes [nulo por defecto]
         @param lenght: longitud del tramo en que se realizará la aporximación [nula por defecto]
+        @param faces: posiciones de los nodos (caras de los volúmenes) para una malla no uniforme [nulo por defecto]
         """
         self.__nodes = nodes
         self.__volumes = volumes
         self.__length = length     
         self.__delta = 1
+        self.__faces = None
+        self.__geometry = None
         self.adjustNodesVolumes(nodes, volumes)
         self.calcDelta()
+        if faces is not None:
+            self.setFaces(faces)
     
     def __del__(self):
         """
@@ -61,6 +66,8 @@ class Mesh():
         """
         self.__nodes = nodes
         self.adjustNodesVolumes(nodes = nodes, volumes = None)
+        self.__faces = None
+        self.calcDelta()
         
     def volumes(self):
         """
@@ -76,6 +83,8 @@ class Mesh():
         """
         self.__volumes = volumes
         self.adjustNodesVolumes(nodes = None, volumes = volumes)
+        self.__faces = None
+        self.calcDelta()
         
     def length(self):
         """
@@ -89,15 +98,123 @@ class Mesh():
     def calcDelta(self):
         """
         Método que calcula el valor de los intervalos espaciales de acuerdo al número de nodos definidos.
+        En una malla no uniforme delta es el arreglo de anchos de los volúmenes (ver widths).
         """
-        if self.__length:
+        self.__geometry = None
+        if self.__faces is not None:
+            self.__delta = self.widths()
+        elif self.__length:
             self.__delta = self.__length / (self.__nodes - 1)
         
     def delta(self):
         """
-        Método que regresa el valor de los intervalos espaciales definidos.
+        Método que regresa el valor de los intervalos espaciales definidos: un
+        escalar si la malla es uniforme o el arreglo de anchos (tamaño nvx) si no lo es.
         """
         return self.__delta
+
+    def isUniform(self):
+        """
+        Método que indica si la malla es uniforme.
+        
+        @return: verdadero si todos los volúmenes tienen el mismo ancho
+        """
+        return self.__faces is None
+
+    def setFaces(self, faces):
+        """
+        Método que define una malla no uniforme a partir de las posiciones de los nodos
+        (caras de los volúmenes), dadas en orden creciente.
+        
+        @param faces: arreglo con las posiciones de los nodos
+        """
+        faces = np.array(faces, dtype = float)
+        if faces.ndim != 1 or faces.size < 2 or np.any(np.diff(faces) <= 0):
+            raise ValueError('Las posiciones de los nodos deben ser un arreglo creciente')
+        self.__nodes = faces.size
+        self.adjustNodesVolumes(nodes = self.__nodes, volumes = None)
+        self.__length = faces[-1] - faces[0]
+        self.__faces = faces
+        self.calcDelta()
+
+    def stretch(self, kind = 'geometric', factor = 1.1, where = 0.0):
+        """
+        Método que construye una malla no uniforme con el número de nodos y la longitud actuales.
+        
+        'geometric' : cada volumen es factor veces el anterior (factor > 1 agrupa
+                      los volúmenes en x = 0 y factor < 1 en x = length).
+        'tanh'      : agrupa los volúmenes alrededor de x = where; factor es la
+                      intensidad del agrupamiento (0 es una malla uniforme).
+        
+        @param kind: 'geometric' o 'tanh' ['geometric' por defecto]
+        @param factor: razón entre volúmenes vecinos o intensidad del agrupamiento [1.1 por defecto]
+        @param where: posición alrededor de la cual se agrupan los volúmenes con 'tanh' [0 por defecto]
+        """
+        n = self.__nodes
+        L = self.__length
+        if kind == 'geometric':
+            if factor == 1.0:
+                faces = np.linspace(0, L, n)
+            else:
+                faces = L * (factor ** np.arange(n) - 1) / (factor ** (n - 1) - 1)
+        elif kind == 'tanh':
+            if where <= 0:
+                faces = L * _clustered(n, factor)
+            elif where >= L:
+                faces = L - L * _clustered(n, factor)[::-1]
+            else:
+                nl = min(max(int(round((n - 1) * where / L)) + 1, 2), n - 1)
+                left = where - where * _clustered(nl, factor)[::-1]
+                right = where + (L - where) * _clustered(n - nl + 1, factor)
+                faces = np.concatenate((left[:-1], right))
+        else:
+            raise ValueError('Tipo de malla desconocido: {}'.format(kind))
+        self.setFaces(faces)
+
+    def faces(self):
+        """
+        Método que regresa las posiciones de los nodos (caras de los volúmenes).
+        
+        @return: arreglo de tamaño nvx - 1
+        """
+        return self.__table()[1]
+
+    def widths(self):
+        """
+        Método que regresa el ancho de cada volumen; los volúmenes de frontera
+        (índices 0 y nvx - 1) tienen ancho cero.
+        
+        @return: arreglo de tamaño nvx
+        """
+        return self.__table()[2]
+
+    def distances(self):
+        """
+        Método que regresa la distancia entre los centros de volúmenes vecinos
+        (la de los volúmenes junto a las fronteras es medio ancho).
+        
+        @return: arreglo de tamaño nvx - 1
+        """
+        return self.__table()[3]
+
+    def __table(self):
+        """
+        Método que calcula (una sola vez) la tabla de geometría: centros, caras,
+        anchos y distancias entre centros.
+        """
+        if self.__geometry is None:
+            if self.__faces is not None:
+                faces = self.__faces
+            else:
+                faces = np.linspace(0, self.__length, self.__nodes)
+            x = np.empty(self.__volumes)
+            x[0] = faces[0]
+            x[1:-1] = 0.5 * (faces[:-1] + faces[1:])
+            x[-1] = faces[-1]
+            w = np.zeros(self.__volumes)
+            w[1:-1] = np.diff(faces)
+            self.__geometry = (x, faces, w, np.diff(x))
+        return self.__geometry
     
     def createMesh(self):
         """
@@ -105,12 +222,139 @@ class Mesh():
         
         @return: arreglo con los valores espaciales de los nodos.
         """
+        if self.__faces is not None:
+            self.__x = self.__table()[0].copy()
+            return self.__x
         first_volume = self.__delta / 2
         final_volume = self.__length - first_volume
         self.__x = np.zeros(self.__volumes)
         self.__x[1:-1] = np.linspace(first_volume,final_volume,self.__volumes-2)
         self.__x[-1] = self.__length
         return self.__x
+
+class CartesianMesh():
+    """
+    Malla cartesiana de 2 o 3 dimensiones formada por el producto tensorial de
+    una malla 1D (Mesh) por eje; cada eje puede ser no uniforme.
+    """
+
+    def __init__(self, nodes = None, volumes = None, length = None, axes = None):
+        """
+        Constructor de la clase.
+
+        @param nodes: número de nodos en cada eje, p. ej. (nx, ny) [nulo por defecto]
+        @param volumes: número de volúmenes en cada eje [nulo por defecto]
+        @param length: longitud del dominio en cada eje [nulo por defecto]
+        @param axes: mallas 1D ya construidas, una por eje (en lugar de nodes, volumes y length) [nulo por defecto]
+        """
+        if axes is None:
+            n = len(nodes if nodes is not None else volumes)
+            nodes = nodes if nodes is not None else (None,) * n
+            volumes = volumes if volumes is not None else (None,) * n
+            length = length if length is not None else (None,) * n
+            axes = [Mesh(nodes = a, volumes = b, length = c) for a, b, c in zip(nodes, volumes, length)]
+        if len(axes) not in (2, 3):
+            raise ValueError('La malla cartesiana debe tener 2 o 3 ejes')
+        self.__axes = tuple(axes)
+
+    def dim(self):
+        """
+        Método que regresa el número de dimensiones.
+
+        @return: 2 o 3
+        """
+        return len(self.__axes)
+
+    def axes(self):
+        """
+        Método que regresa las mallas 1D de cada eje.
+
+        @return: tupla de objetos Mesh
+        """
+        return self.__axes
+
+    def nodes(self):
+        """
+        Método que regresa el número de nodos en cada eje.
+        """
+        return tuple(m.nodes() for m in self.__axes)
+
+    def volumes(self):
+        """
+        Método que regresa el número de volúmenes en cada eje (incluye los de frontera).
+        """
+        return tuple(m.volumes() for m in self.__axes)
+
+    def cells(self):
+        """
+        Método que regresa el número de volúmenes interiores (incógnitas).
+        """
+        return int(np.prod([n - 2 for n in self.volumes()]))
+
+    def length(self):
+        """
+        Método que regresa la longitud del dominio en cada eje.
+        """
+        return tuple(m.length() for m in self.__axes)
+
+    def delta(self):
+        """
+        Método que regresa el tamaño de los volúmenes en cada eje (escalar o arreglo de anchos, ver Mesh.delta).
+        """
+        return tuple(m.delta() for m in self.__axes)
+
+    def isUniform(self):
+        """
+        Método que indica si todos los ejes son uniformes.
+        """
+        return all(m.isUniform() for m in self.__axes)
+
+    def createMesh(self):
+        """
+        Método que construye las coordenadas de los centros de los volúmenes en cada eje.
+        Para graficar se puede usar np.meshgrid(*malla.createMesh(), indexing = 'ij').
+
+        @return: tupla de arreglos, uno por eje
+        """
+        return tuple(m.createMesh() for m in self.__axes)
+
+def _clustered(n, beta):
+    """
+    Función que regresa n puntos en [0, 1] agrupados en 0 con una tangente hiperbólica.
+    
+    @param n: número de puntos
+    @param beta: intensidad del agrupamiento (0 da puntos equiespaciados)
+    @return: arreglo de n puntos, de 0 a 1
+    """
+    xi = np.linspace(0, 1, n)
+    if beta == 0:
+        return xi
+    return 1 - np.tanh(beta * (1 - xi)) / np.tanh(beta)
+
+def faceDistances(dx):
+    """
+    Función que calcula la distancia entre los centros de volúmenes vecinos a
+    partir de los anchos (tamaño nvx, los de frontera con ancho cero).
+    
+    @param dx: anchos de los volúmenes
+    @return: arreglo de tamaño nvx - 1
+    """
+    dx = np.asarray(dx, dtype = float)
+    return 0.5 * (dx[:-1] + dx[1:])
+
+def faceWeights(dx):
+    """
+    Función que calcula el peso lambda de la interpolación lineal en cada cara,
+    phi_cara = lambda phi_izquierda + (1 - lambda) phi_derecha. En las fronteras
+    se toma 1/2, igual que en la malla uniforme (nodo fantasma simétrico).
+    
+    @param dx: anchos de los volúmenes (tamaño nvx)
+    @return: arreglo de tamaño nvx - 1
+    """
+    dx = np.array(dx, dtype = float)
+    dx[0] = dx[1]
+    dx[-1] = dx[-2]
+    return dx[1:] / (dx[:-1] + dx[1:])
         
 if __name__ == '__main__':
 
@@ -158,4 +402,18 @@ if __name__ == '__main__':
     print(m1.nodes(), m1.volumes(), m1.length(), m1.delta())
     m1.createMesh()
     print('_' * 20) 
-    
\ No newline at end of file
+
+    m1 = Mesh(nodes = 6, length = 1)
+    m1.stretch('geometric', 1.5)
+    print(m1.faces(), m1.createMesh(), m1.delta(), sep = '\n')
+    print('_' * 20) 
+
+    m1 = Mesh(nodes = 11, length = 2.5)
+    m1.stretch('tanh', 2.0, where = 1.0)
+    print(m1.faces(), m1.distances(), sep = '\n')
+    print('_' * 20)
+
+    m2 = CartesianMesh(nodes = (5, 4), length = (1.0, 0.5))
+    m2.axes()[1].stretch('geometric', 1.2)
+    print(m2.volumes(), m2.cells(), m2.delta(), sep = '\n')
+    print('_' * 20) 
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:05:47 2026
+
+Multimalla geométrica para los sistemas dominados por difusión en una
+dimensión (Diffusion1D con fuentes, problemas de aletas, etc.).
+
+Los niveles gruesos se construyen juntando pares de volúmenes vecinos y
+usando el operador de Galerkin A_c = R A P, con P la interpolación lineal
+entre centros de volumen y R = P^T / 2. Los suavizadores son vectorizados:
+Jacobi amortiguado o Gauss-Seidel por colores. Con Gauss-Seidel los renglones
+de un mismo color no deben estar acoplados, así que se usan tantos colores
+como el ancho de banda más uno (i % 3 en vez de i % 2): el nivel fino es
+tridiagonal (rojo-negro), pero con esta interpolación los operadores de
+Galerkin de los niveles gruesos son pentadiagonales (J se acopla con J +- 2).
+En el nivel más grueso se usa una factorización LU dispersa.
+
+Se puede usar como solver (ciclos V o W hasta alcanzar la tolerancia) o
+como precondicionador de los solvers de Krylov (un ciclo por aplicación).
+"""
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import LinearOperator, splu
+
+class Multigrid():
+    """
+    Clase que construye la jerarquía de niveles y aplica ciclos de multimalla.
+    """
+
+    def __init__(self, A, cycle = 'V', smoother = 'jacobi', omega = 2/3, nu1 = 2, nu2 = 2, coarsest = 32, maxlevels = 30):
+        """
+        Constructor de la clase.
+
+        @param A: objeto Matrix con almacenamiento 'csr' o matriz de scipy.sparse
+        @param cycle: tipo de ciclo, 'V' o 'W' ['V' por defecto]
+        @param smoother: 'jacobi' (amortiguado) o 'gs' (Gauss-Seidel por colores) ['jacobi' por defecto]
+        @param omega: factor de amortiguamiento de Jacobi [2/3 por defecto]
+        @param nu1: número de suavizados antes de restringir [2 por defecto]
+        @param nu2: número de suavizados después de interpolar [2 por defecto]
+        @param coarsest: tamaño máximo del nivel más grueso [32 por defecto]
+        @param maxlevels: número máximo de niveles [30 por defecto]
+        """
+        if cycle not in ('V', 'W'):
+            raise ValueError('Tipo de ciclo desconocido: {}'.format(cycle))
+        if smoother not in ('jacobi', 'gs'):
+            raise ValueError('Suavizador desconocido: {}'.format(smoother))
+        if hasattr(A, 'storage'):
+            A = A.mat()
+        A = csr_matrix(A)
+        self.__gamma = 1 if cycle == 'V' else 2
+        self.__smoother = smoother
+        self.__omega = omega
+        self.__nu1 = nu1
+        self.__nu2 = nu2
+        self.__cycles = 0
+        self.__levels = []
+        while A.shape[0] > coarsest and len(self.__levels) < maxlevels - 1:
+            P = interpolation(A.shape[0])
+            R = (0.5 * P.T).tocsr()
+            self.__levels.append(_Level(A, P, R))
+            A = (R @ A @ P).tocsr()
+        self.__levels.append(_Level(A, None, None))
+        self.__coarse = splu(A.tocsc())
+
+    def levels(self):
+        """
+        Método que regresa el número de niveles de la jerarquía.
+
+        @return: número de niveles
+        """
+        return len(self.__levels)
+
+    def cycles(self):
+        """
+        Método que regresa el número de ciclos de la última llamada a solve.
+
+        @return: número de ciclos
+        """
+        return self.__cycles
+
+    def solve(self, b, x0 = None, tol = 1e-8, maxiter = 100):
+        """
+        Método que resuelve A x = b aplicando ciclos hasta que la norma del
+        residuo relativo sea menor que tol.
+
+        @param b: lado derecho (normalmente Su[1:-1])
+        @param x0: valor inicial [nulo por defecto]
+        @param tol: tolerancia relativa del residuo [1e-8 por defecto]
+        @param maxiter: número máximo de ciclos [100 por defecto]
+        @return: solución x
+        """
+        A = self.__levels[0].A
+        x = np.zeros_like(b, dtype = float) if x0 is None else np.array(x0, dtype = float)
+        bnorm = np.linalg.norm(b)
+        self.__cycles = 0
+        if bnorm == 0.0:
+            return np.zeros_like(x)
+        while np.linalg.norm(b - A @ x) > tol * bnorm and self.__cycles < maxiter:
+            x = self.__cycle(0, b, x)
+            self.__cycles += 1
+        return x
+
+    def aspreconditioner(self):
+        """
+        Método que regresa un ciclo de multimalla (con valor inicial cero) como
+        LinearOperator, para usarse como precondicionador de Krylov.
+
+        @return: LinearOperator que aproxima A^{-1}
+        """
+        A = self.__levels[0].A
+        return LinearOperator(A.shape, matvec = lambda r: self.__cycle(0, r, np.zeros_like(r)), dtype = A.dtype)
+
+    def __cycle(self, k, b, x):
+        """
+        Método recursivo que aplica un ciclo V (gamma = 1) o W (gamma = 2) desde el nivel k.
+        """
+        level = self.__levels[k]
+        if level.P is None:
+            return self.__coarse.solve(b)
+        x = self.__smooth(level, b, x, self.__nu1, level.colors)
+        rc = level.R @ (b - level.A @ x)
+        ec = np.zeros_like(rc)
+        for g in range(self.__gamma):
+            ec = self.__cycle(k + 1, rc, ec)
+            if self.__levels[k + 1].P is None:
+                break
+        x += level.P @ ec
+        return self.__smooth(level, b, x, self.__nu2, level.colors[::-1])
+
+    def __smooth(self, level, b, x, nu, colors):
+        """
+        Método que aplica nu barridos del suavizador vectorizado. Después de
+        interpolar los colores se recorren en orden inverso para que el ciclo
+        sea simétrico (y sirva como precondicionador de CG).
+        """
+        if self.__smoother == 'jacobi':
+            w = self.__omega
+            for s in range(nu):
+                x += w * level.dinv * (b - level.A @ x)
+        else:
+            for s in range(nu):
+                for rows, Ac, dinv in colors:
+                    x[rows] += dinv * (b[rows] - Ac @ x)
+        return x
+
+class _Level():
+    """
+    Datos de un nivel de la jerarquía: operador, transferencias y datos del suavizador.
+    """
+
+    def __init__(self, A, P, R):
+        self.A = A
+        self.P = P
+        self.R = R
+        d = A.diagonal()
+        self.dinv = 1.0 / d
+        self.colors = []
+        coo = A.tocoo()
+        n = 1 + int(np.abs(coo.col - coo.row).max(initial = 0))
+        for c in range(n):
+            rows = np.arange(c, A.shape[0], n)
+            self.colors.append((rows, A[rows], 1.0 / d[rows]))
+
+def interpolation(N):
+    """
+    Función que construye la interpolación lineal de la malla gruesa (volúmenes
+    formados por los pares 2J, 2J+1 de la malla fina) a la malla fina.
+
+    @param N: número de incógnitas de la malla fina
+    @return: matriz P de tamaño N x ceil(N/2)
+    """
+    Nc = (N + 1) // 2
+    i = np.arange(N)
+    J = i // 2
+# Cada volumen fino toma 3/4 de su volumen grueso y 1/4 del vecino grueso
+# más cercano; en las orillas se toma sólo el volumen grueso.
+    K = np.where(i % 2 == 0, J - 1, J + 1)
+    inside = (K >= 0) & (K < Nc)
+    rows = np.concatenate((i, i[inside]))
+    cols = np.concatenate((J, K[inside]))
+    vals = np.concatenate((np.where(inside, 0.75, 1.0), np.full(inside.sum(), 0.25)))
+    return csr_matrix((vals, (rows, cols)), shape = (N, Nc))
+
+if __name__ == '__main__':
+
+    from Coefficients import Coefficients
+    from Diffusion import Diffusion1D
+    from Matrix import Matrix
+    import time
+
+#
+# Problema de la aleta (Tarea-4.3) con mallas cada vez más finas
+#
+    for N, smoother in ((N, s) for s in ('jacobi', 'gs') for N in (1000, 10000, 100000, 1000000)):
+        nvx = N + 1
+        dx = 1.0 / N
+        coef = Coefficients(nvx, dx)
+        coef.alloc(nvx)
+        coef.cleanCoefficients()
+        df1 = Diffusion1D(nvx, 1, dx)
+        df1.calcCoef()
+        df1.setSu(25 * 20)
+        df1.setSp(-25)
+        df1.bcDirichlet('LEFT_WALL', 100)
+        df1.bcNeumman('RIGHT_WALL', 0)
+        A = Matrix(nvx, 'csr')
+        A.build(coef)
+        t1 = time.time()
+        mg = Multigrid(A, smoother = smoother)
+        T = mg.solve(coef.Su()[1:-1], tol = 1e-10)
+        t2 = time.time()
+        print('{:>6s}, N = {:8d}, niveles = {:2d}, ciclos V = {:2d}, T[-1] = {:.6f}, tiempo = {:.3f} s'.format(smoother, N, mg.levels(), mg.cycles(), T[-1], t2 - t1))
+    print('-' * 20)
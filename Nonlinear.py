@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:27:41 2026
+
+Método de Newton para problemas con fuentes que dependen de la solución,
+por ejemplo pérdidas por radiación -eps (T^4 - T∞^4) o por convección con
+un coeficiente que depende de la temperatura.
+
+Los coeficientes que se reciben tienen la parte lineal del problema
+(difusión, advección, fronteras y fuentes fijas), A phi = Su. La fuente
+S(phi) se da como una función vectorizada junto con su derivada dS/dphi, y
+el sistema no lineal es
+
+    F(phi) = A phi - Su - S(phi) dx = 0,    J = A - diag(S'(phi) dx).
+
+En cada iteración se resuelve J d = -F con la factorización LU en banda de
+FactorizationCache y se busca el paso con retroceso (Armijo): phi + l d con
+l = 1, 1/2, 1/4, ... hasta que |F| baje. La matriz J sólo se vuelve a
+factorizar cuando la convergencia se hace lenta (|F| baja menos de reuse
+veces en una iteración) o cuando el paso con la J anterior no reduce el
+residuo; mientras tanto sólo se hacen las sustituciones con los factores
+guardados. Cerca de la solución la convergencia es cuadrática.
+"""
+
+import numpy as np
+from Coefficients import Coefficients
+from LinearSolvers import bandedMatvec, FactorizationCache
+
+class NewtonSolver():
+    """
+    Clase que resuelve A phi = Su + S(phi) dx con el método de Newton.
+    """
+
+    def __init__(self, rtol = 1e-10, atol = 1e-12, maxiter = 50, reuse = 0.1, dtype = np.float64):
+        """
+        Constructor de la clase.
+
+        @param rtol: tolerancia relativa de |F| respecto al residuo inicial [1e-10 por defecto]
+        @param atol: tolerancia absoluta de |F| [1e-12 por defecto]
+        @param maxiter: número máximo de iteraciones [50 por defecto]
+        @param reuse: se conserva la factorización si |F| bajó al menos 1/reuse veces (0 factoriza siempre) [0.1 por defecto]
+        @param dtype: precisión de la factorización (ver FactorizationCache) [np.float64 por defecto]
+        """
+        self.__rtol = rtol
+        self.__atol = atol
+        self.__maxiter = maxiter
+        self.__reuse = reuse
+        self.__cache = FactorizationCache(dtype)
+        self.__jac = None
+        self.__history = []
+        self.__converged = False
+
+    def iterations(self):
+        """
+        Método que regresa el número de iteraciones de la última solución.
+
+        @return: número de iteraciones
+        """
+        return len(self.__history) - 1
+
+    def factorizations(self):
+        """
+        Método que regresa el número de factorizaciones de la matriz jacobiana (acumulado).
+
+        @return: número de factorizaciones
+        """
+        return self.__cache.misses()
+
+    def history(self):
+        """
+        Método que regresa la norma del residuo |F| en cada iteración de la última solución.
+
+        @return: lista de normas
+        """
+        return self.__history
+
+    def converged(self):
+        """
+        Método que indica si la última solución cumplió la tolerancia.
+        """
+        return self.__converged
+
+    def residual(self, coefficients, S, phi):
+        """
+        Método que calcula el residuo no lineal F = A phi - Su - S(phi) dx en los volúmenes interiores.
+
+        @param coefficients: objeto Coefficients con la parte lineal del problema
+        @param S: función vectorizada S(phi)
+        @param phi: solución (tamaño nvx, con los valores de frontera en los extremos)
+        @return: arreglo de tamaño nvx - 2
+        """
+        aP, aE, aW, aEE, aWW, Su = coefficients.block()
+        F = bandedMatvec(aP, aE, aW, aEE, aWW, phi[1:-1])
+        F -= Su[1:-1]
+        F -= S(phi)[1:-1] * _interior(coefficients.delta())
+        return F
+
+    def solve(self, coefficients, S, dSdphi, phi):
+        """
+        Método que resuelve el problema no lineal partiendo de phi.
+
+        @param coefficients: objeto Coefficients con la parte lineal del problema (no se modifica)
+        @param S: función vectorizada S(phi) (fuente por unidad de volumen)
+        @param dSdphi: función vectorizada con la derivada dS/dphi
+        @param phi: valor inicial (tamaño nvx); se sobrescribe con la solución
+        @return: phi
+        """
+        nvx = phi.shape[0]
+        if self.__jac is None or self.__jac.aP().shape[0] != nvx:
+            self.__jac = Coefficients(nvx, private = True)
+            self.__jac.alloc(nvx)
+        jac = self.__jac
+        dx = _interior(coefficients.delta())
+        trial = phi.copy()
+        F = self.residual(coefficients, S, phi)
+        norm = np.linalg.norm(F)
+        self.__history = [norm]
+        self.__converged = False
+        tol = self.__atol + self.__rtol * norm
+        fresh = False
+        update = True
+        while len(self.__history) <= self.__maxiter:
+            if norm <= tol:
+                self.__converged = True
+                break
+            if update:
+                jac.block()[:] = coefficients.block()
+                jac.aP()[1:-1] -= dSdphi(phi)[1:-1] * dx
+                fresh = True
+            d = self.__cache.solve(jac, -F)
+#
+# Búsqueda en la línea con retroceso; si la jacobiana es de una iteración
+# anterior y el paso completo no reduce |F|, se factoriza de nuevo
+#
+            l = 1.0
+            while True:
+                trial[1:-1] = phi[1:-1] + l * d
+                Ft = self.residual(coefficients, S, trial)
+                normt = np.linalg.norm(Ft)
+                if normt <= (1 - 1e-4 * l) * norm or l < 1e-3:
+                    break
+                if not fresh:
+                    break
+                l *= 0.5
+            if not fresh and normt > (1 - 1e-4) * norm:
+                update = True
+                continue
+            update = normt > self.__reuse * norm
+            fresh = False
+            phi[1:-1] = trial[1:-1]
+            F = Ft
+            norm = normt
+            self.__history.append(norm)
+        return phi
+
+def _interior(delta):
+    """
+    Regresa el ancho de los volúmenes interiores (escalar o arreglo).
+    """
+    return delta[1:-1] if np.ndim(delta) else delta
+
+if __name__ == '__main__':
+
+    from Diffusion import Diffusion1D
+    from LinearSolvers import tdma
+
+#
+# Aleta con pérdidas por convección y por radiación (temperaturas en K):
+#   d2T/dx2 - n2 (T - T∞) - e (T^4 - T∞^4) = 0,  T(0) = TA,  dT/dx(1) = 0
+#
+    n2 = 25.0
+    e = 1e-8
+    TA = 373.15
+    Tinf = 293.15
+    S = lambda T: -n2 * (T - Tinf) - e * (T**4 - Tinf**4)
+    dS = lambda T: -n2 - 4 * e * T**3
+
+    def problem(nvx):
+        dx = 1.0 / (nvx - 2)
+        df1 = Diffusion1D(nvx, 1.0, dx)
+        df1.alloc(nvx)
+        df1.calcCoef()
+        df1.bcDirichlet('LEFT_WALL', TA)
+        df1.bcNeumman('RIGHT_WALL', 0.0)
+        T = np.full(nvx, Tinf)
+        T[0] = TA
+        return df1, T
+
+    for nvx in (52, 1002):
+        for reuse in (0.0, 0.1):
+            df1, T = problem(nvx)
+            newton = NewtonSolver(reuse = reuse)
+            newton.solve(df1, S, dS, T)
+            print('nvx = {:4d}, reuse = {}: iteraciones = {}, factorizaciones = {}, |F| = {}'.format(
+                  nvx, reuse, newton.iterations(), newton.factorizations(),
+                  ', '.join('{:.1e}'.format(f) for f in newton.history())))
+#
+# Picard como en Tarea-4.3 (convección implícita con setSp, radiación con
+# la solución anterior) y linealización de Coefficients.setSource en cada barrido
+#
+        for name in ('Picard', 'setSource'):
+            df1, T = problem(nvx)
+            block = df1.block().copy()
+            for k in range(1, 501):
+                df1.block()[:] = block
+                if name == 'Picard':
+                    df1.setSu(n2 * Tinf - e * (T**4 - Tinf**4))
+                    df1.setSp(-n2)
+                else:
+                    df1.setSource(S, dS, T)
+                old = T.copy()
+                T[1:-1] = tdma(df1.aP(), df1.aE(), df1.aW(), df1.Su()[1:-1])
+                if np.abs(T - old).max() < 1e-10:
+                    break
+            print('nvx = {:4d}, {:>9s}: iteraciones = {}'.format(nvx, name, k))
+    print('-' * 20)
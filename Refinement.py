@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:36:14 2026
+
+Refinamiento adaptativo de la malla (AMR) en una dimensión para problemas
+transitorios con frentes que se mueven.
+
+La malla parte de una malla base uniforme; cada volumen se puede dividir a
+la mitad hasta maxlevel veces. Cada cierto número de pasos (regrid) se
+calcula un indicador (gradiente o curvatura) en cada volumen: los volúmenes
+con indicador grande se refinan y los pares de hermanos con indicador
+pequeño se juntan. Alrededor de los volúmenes refinados se deja una franja
+de buffer volúmenes para que el frente no salga de la zona fina antes del
+siguiente regrid, y la malla se gradúa para que dos volúmenes vecinos
+difieran a lo más en un nivel.
+
+La solución se pasa a la malla nueva de forma conservativa: se reconstruye
+lineal por volumen (pendiente limitada con minmod) y se integra sobre los
+volúmenes nuevos, así que la integral de phi no cambia.
+
+La malla resultante es un Mesh no uniforme (ver Mesh.setFaces), de modo que
+los coeficientes se vuelven a construir con los mismos términos
+(Diffusion1D, Advection1D con CD o UpW, Temporal1D).
+"""
+
+import numpy as np
+from Mesh import Mesh
+
+class AdaptiveMesh1D():
+    """
+    Clase que adapta una malla 1D a la solución refinando y juntando volúmenes.
+    """
+
+    def __init__(self, length, cells, maxlevel = 4, indicator = 'gradient', refine = 0.02, coarsen = 0.005, buffer = 2):
+        """
+        Constructor de la clase.
+
+        @param length: longitud del dominio
+        @param cells: número de volúmenes de la malla base (nivel 0)
+        @param maxlevel: número máximo de divisiones de un volumen base [4 por defecto]
+        @param indicator: 'gradient' (salto de phi en el volumen) o 'curvature' ['gradient' por defecto]
+        @param refine: valor del indicador (relativo al rango de phi) por encima del cual se refina [0.02 por defecto]
+        @param coarsen: valor del indicador por debajo del cual se junta [0.005 por defecto]
+        @param buffer: número de volúmenes alrededor de los refinados que también se refinan [2 por defecto]
+        """
+        if indicator not in ('gradient', 'curvature'):
+            raise ValueError('Indicador desconocido: {}'.format(indicator))
+        self.__length = length
+        self.__L = maxlevel
+        self.__nfine = cells * 2**maxlevel
+        self.__h = length / self.__nfine
+        self.__indicator = indicator
+        self.__refine = refine
+        self.__coarsen = coarsen
+        self.__buffer = buffer
+        self.__start = np.arange(cells) * 2**maxlevel
+        self.__level = np.zeros(cells, dtype = int)
+        self.__mesh = Mesh()
+        self.__mesh.setFaces(self.faces())
+
+    def mesh(self):
+        """
+        Método que regresa la malla actual.
+
+        @return: objeto Mesh (no uniforme)
+        """
+        return self.__mesh
+
+    def levels(self):
+        """
+        Método que regresa el nivel de refinamiento de cada volumen interior.
+
+        @return: arreglo de enteros de tamaño nvx - 2
+        """
+        return self.__level
+
+    def state(self):
+        """
+        Método que regresa el estado de la malla (para reiniciar una simulación, ver Checkpoint).
+
+        @return: (inicio de cada volumen en la malla más fina, nivel de cada volumen)
+        """
+        return (self.__start.copy(), self.__level.copy())
+
+    def setState(self, state):
+        """
+        Método que restablece la malla que regresó state.
+
+        @param state: estado guardado
+        """
+        start, level = state
+        self.__start = np.array(start)
+        self.__level = np.array(level)
+        self.__mesh.setFaces(self.faces())
+
+    def faces(self):
+        """
+        Método que regresa las posiciones de las caras de los volúmenes.
+
+        @return: arreglo de tamaño nvx - 1
+        """
+        return np.append(self.__start, self.__nfine) * self.__h
+
+    def indicator(self, phi):
+        """
+        Método que calcula el indicador de refinamiento en cada volumen interior,
+        relativo al rango de phi.
+
+        @param phi: solución en la malla actual (tamaño nvx)
+        @return: arreglo de tamaño nvx - 2
+        """
+        x = self.__mesh.createMesh()
+        w = self.__mesh.widths()[1:-1]
+        scale = np.ptp(phi)
+        if scale == 0:
+            return np.zeros(w.size)
+        if self.__indicator == 'gradient':
+            ind = np.abs(phi[2:] - phi[:-2]) * w / (x[2:] - x[:-2])
+        else:
+            g = np.diff(phi) / np.diff(x)
+            ind = 2 * np.abs(g[1:] - g[:-1]) / (x[2:] - x[:-2]) * w**2
+        return ind / scale
+
+    def regrid(self, phi):
+        """
+        Método que adapta la malla a phi y pasa phi a la malla nueva de forma conservativa.
+
+        @param phi: solución en la malla actual (tamaño nvx, con los valores de frontera en los extremos)
+        @return: (phi en la malla nueva, verdadero si la malla cambió)
+        """
+        L = self.__L
+        ind = self.indicator(phi)
+        want = self.__level + (ind > self.__refine) - (ind < self.__coarsen)
+        want = np.clip(want, 0, L)
+        size = 2**(L - self.__level)
+        d = self.__grade(np.repeat(want, size))
+        start, level = self.__leaves(d)
+        if start.size == self.__start.size and np.array_equal(start, self.__start):
+            return phi, False
+        old = self.faces()
+        self.__start = start
+        self.__level = level
+        new = self.faces()
+        phi = transfer(old, phi, new)
+        self.__mesh.setFaces(new)
+        return phi, True
+
+    def __grade(self, d):
+        """
+        Método que agrega la franja de buffer volúmenes alrededor de cada nivel
+        y gradúa los niveles deseados (en la malla más fina) para que dos
+        volúmenes vecinos difieran a lo más en un nivel.
+        """
+        L = self.__L
+        for l in range(L, 0, -1):
+            mask = d >= l
+            if not mask.any():
+                continue
+            span = 2**(L - l)
+            grow = _dilate(mask, self.__buffer * span)
+            d[grow] = np.maximum(d[grow], l)
+            grow = _dilate(grow, 2 * span)
+            d[grow] = np.maximum(d[grow], l - 1)
+        return d
+
+    def __leaves(self, d):
+        """
+        Método que construye los volúmenes (hojas) partiendo de la malla base y
+        dividiendo cada volumen mientras algún nivel deseado en su interior sea mayor.
+        """
+        L = self.__L
+        start = np.arange(self.__nfine // 2**L) * 2**L
+        level = np.zeros(start.size, dtype = int)
+        while True:
+            split = np.maximum.reduceat(d, start) > level
+            if not split.any():
+                return start, level
+            reps = np.where(split, 2, 1)
+            level = np.repeat(np.where(split, level + 1, level), reps)
+            start = np.repeat(start, reps)
+            second = (np.cumsum(reps) - 1)[split]
+            start[second] += 2**(L - level[second])
+
+def transfer(old, phi, new):
+    """
+    Función que pasa una solución de una malla a otra conservando la integral:
+    phi se reconstruye lineal en cada volumen (pendiente limitada con minmod)
+    y se promedia sobre los volúmenes nuevos.
+
+    @param old: caras de la malla actual (tamaño nvx - 1)
+    @param phi: solución en la malla actual (tamaño nvx, con los valores de frontera en los extremos)
+    @param new: caras de la malla nueva, en el mismo intervalo
+    @return: solución en la malla nueva (tamaño new.size + 1)
+    """
+    x = np.empty(old.size + 1)
+    x[0] = old[0]
+    x[1:-1] = 0.5 * (old[:-1] + old[1:])
+    x[-1] = old[-1]
+    g = np.diff(phi) / np.diff(x)
+    s = np.where(g[:-1] * g[1:] > 0, np.sign(g[1:]) * np.minimum(np.abs(g[:-1]), np.abs(g[1:])), 0.0)
+    p = phi[1:-1]
+    xl = old[:-1]
+    xc = x[1:-1]
+#
+# Integral acumulada de la reconstrucción en las caras nuevas
+#
+    I = np.concatenate(([0.0], np.cumsum(p * np.diff(old))))
+    j = np.clip(np.searchsorted(old, new, side = 'right') - 1, 0, p.size - 1)
+    y = new - xl[j]
+    In = I[j] + p[j] * y + 0.5 * s[j] * ((new - xc[j])**2 - (xl[j] - xc[j])**2)
+    out = np.empty(new.size + 1)
+    out[0] = phi[0]
+    out[1:-1] = np.diff(In) / np.diff(new)
+    out[-1] = phi[-1]
+    return out
+
+def _dilate(mask, r):
+    """
+    Regresa la máscara extendida r posiciones hacia cada lado.
+    """
+    n = mask.size
+    c = np.concatenate(([0], np.cumsum(mask)))
+    i = np.arange(n)
+    return c[np.minimum(i + r + 1, n)] - c[np.maximum(i - r, 0)] > 0
+
+if __name__ == '__main__':
+
+    from scipy.special import erfc
+    from Coefficients import Coefficients
+    from Diffusion import Diffusion1D
+    from Advection import Advection1D
+    from Temporal import Temporal1D
+    from Assembly import Assembler
+
+#
+# Problema de la Tarea-6.1 (CD) con malla fija y con malla adaptativa
+#
+    def solve(amr = None, N = 350, k = 5):
+        if amr is None:
+            malla = Mesh(nodes = N, length = 2.5)
+        else:
+            malla = amr.mesh()
+        phi = np.zeros(malla.volumes())
+        phi[0] = 1.0
+        if amr is not None:
+            for i in range(6):
+                phi, changed = amr.regrid(phi)
+                malla = amr.mesh()
+        def build(malla):
+            nvx = malla.volumes()
+            dx = malla.delta()
+            coef = Coefficients(nvx, dx, private = True)
+            coef.alloc(nvx)
+            tem = Temporal1D(nvx, 1.0, dx, 0.002, coefficients = coef)
+            adv1 = Advection1D(nvx, 1.0, dx, coefficients = coef)
+            adv1.setU(1.0)
+            asm = Assembler(coef)
+            asm.addTerm(Diffusion1D(nvx, 0.001, dx, coefficients = coef))
+            asm.addTerm(adv1)
+            asm.setTemporal(tem)
+            asm.addBoundary('LEFT_WALL', 'Dirichlet', 1.0)
+            asm.addBoundary('RIGHT_WALL', 'Dirichlet', 0.0)
+            return asm
+        asm = build(malla)
+        cells = []
+        for step in range(1, 501):
+            asm.step(phi)
+            if amr is not None and step % k == 0:
+                phi, changed = amr.regrid(phi)
+                if changed:
+                    malla = amr.mesh()
+                    asm = build(malla)
+            cells.append(malla.volumes() - 2)
+        return malla.createMesh(), phi, np.mean(cells)
+
+    xr, pr = solve(N = 5001)[:2]
+    for name, args in (('uniforme N = 350', dict(N = 350)),
+                       ('uniforme N = 100', dict(N = 100)),
+                       ('AMR (25 volúmenes base, 5 niveles)', dict(amr = AdaptiveMesh1D(2.5, 25, 5)))):
+        x, phi, n = solve(**args)
+        print('{:>36s}: volúmenes (promedio) = {:6.1f}, error = {:.3e}'.format(name, n, np.abs(phi - np.interp(x, xr, pr)).max()))
+    print('-' * 20)
+
+#
+# Conservación de la integral al refinar y al juntar
+#
+    amr = AdaptiveMesh1D(1.0, 8, 3, refine = 0.05)
+    phi = np.concatenate(([1.0], 0.5 * erfc((amr.mesh().createMesh()[1:-1] - 0.5) / 0.05), [0.0]))
+    w = amr.mesh().widths()
+    total = np.sum(phi * w)
+    for i in range(4):
+        phi, changed = amr.regrid(phi)
+    print('volúmenes = {}, niveles = {}'.format(amr.mesh().volumes() - 2, amr.levels()))
+    print('cambio de la integral = {:.3e}'.format(np.sum(phi * amr.mesh().widths()) - total))
+    print('-' * 20)
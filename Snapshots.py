@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:08:52 2026
+
+Escritura de la historia de una simulación transitoria sin guardarla en
+memoria.
+
+SnapshotStore recibe Phi en cada paso de tiempo:
+
+    - cada stride pasos copia Phi (tomando uno de cada decimate puntos, y
+      siempre los dos extremos) a un arreglo espacio-tiempo en disco,
+    - en cada paso calcula reducciones (mínimo, máximo, integral y norma L2
+      sobre los volúmenes interiores) y las agrega a una tabla.
+
+Con un archivo .npy los arreglos son memmaps de NumPy (np.load con
+mmap_mode = 'r' los lee sin cargarlos completos): nombre.npy (instantáneas,
+tamaño (ninstantáneas, npuntos)), nombre_t.npy (tiempo de cada instantánea),
+nombre_x.npy (posiciones) y nombre_steps.npy (reducciones, una fila por
+paso). Como el tamaño de un .npy es fijo se reserva para steps pasos y al
+cerrar se recorta a lo que se escribió. Con start > 0 se continúa una
+historia que ya existe (al reiniciar desde un punto de control): se
+conservan sus primeros start pasos y se sigue escribiendo a partir de ahí.
+Con .h5 (si h5py está instalado) se
+usa un solo archivo con los conjuntos 'frames', 't', 'x' y 'steps',
+con bloques (chunks) que crecen conforme se escriben; load() copia sus
+instantáneas a memoria y cierra el archivo.
+
+Escribir una instantánea es sólo copiar npuntos valores a la página del
+memmap; el sistema operativo los manda a disco en segundo plano.
+"""
+
+import os
+import numpy as np
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# Columnas de la tabla de reducciones
+columns = ('step', 't', 'min', 'max', 'integral', 'l2')
+
+class SnapshotStore():
+    """
+    Clase que guarda instantáneas y reducciones de una simulación transitoria.
+    """
+
+    def __init__(self, filename, x, dx, steps, stride = 1, decimate = 1, dtype = np.float64, start = 0):
+        """
+        Constructor de la clase.
+
+        @param filename: nombre del archivo, .npy (memmap) o .h5 (h5py)
+        @param x: posiciones de los nodos (tamaño nvx)
+        @param dx: valor de los intervalos en x, o arreglo de anchos (tamaño nvx), para la integral y la norma
+        @param steps: número máximo de pasos que se registrarán
+        @param stride: se guarda una instantánea cada stride pasos [1 por defecto]
+        @param decimate: se guarda uno de cada decimate puntos [1 por defecto]
+        @param dtype: tipo de las instantáneas (np.float32 ocupa la mitad) [np.float64 por defecto]
+        @param start: número de pasos de la historia existente que se conservan (0 la sobrescribe) [0 por defecto]
+        """
+        base, ext = os.path.splitext(filename)
+        if ext not in ('.npy', '.h5', '.hdf5'):
+            raise ValueError('Formato desconocido: {} (se usa .npy o .h5)'.format(ext))
+        if ext != '.npy' and h5py is None:
+            raise ValueError('h5py no está instalado, use un archivo .npy')
+        if start > steps:
+            raise ValueError('start = {} es mayor que steps = {}'.format(start, steps))
+        if start and not os.path.exists(filename):
+            raise ValueError('No existe {} para continuar la historia'.format(filename))
+        x = np.asarray(x, dtype = float)
+        nvx = x.shape[0]
+        index = np.arange(0, nvx, decimate)
+        if index[-1] != nvx - 1:
+            index = np.append(index, nvx - 1)
+        w = np.asarray(dx, dtype = float)
+        self.__w = w[1:-1] if w.ndim else np.full(nvx - 2, float(w))
+        self.__index = index
+        self.__stride = stride
+        self.__steps = steps
+        self.__nframes = (start - 1) // stride + 1 if start else 0
+        self.__nsteps = start
+        nframes = (steps - 1) // stride + 1
+        rows = (self.__nframes, self.__nframes, start)
+        shapes = ((index.size,), (), (len(columns),))
+        self.__h5 = None
+        if ext == '.npy':
+            self.__names = (filename, base + '_t.npy', base + '_steps.npy')
+            if start:
+                for name, n, shape in zip(self.__names, rows, shapes):
+                    _check(np.load(name, mmap_mode = 'r'), n, shape, name)
+                for name in self.__names:
+                    os.replace(name, name + '.prev')
+            self.__frames = np.lib.format.open_memmap(filename, 'w+', dtype, (nframes, index.size))
+            self.__t = np.lib.format.open_memmap(self.__names[1], 'w+', np.float64, (nframes,))
+            self.__table = np.lib.format.open_memmap(self.__names[2], 'w+', np.float64, (steps, len(columns)))
+            np.save(base + '_x.npy', x[index])
+            if start:
+                for a, name, n in zip((self.__frames, self.__t, self.__table), self.__names, rows):
+                    old = np.load(name + '.prev', mmap_mode = 'r')
+                    for k in range(0, n, 4096):
+                        a[k:min(k + 4096, n)] = old[k:min(k + 4096, n)]
+                    del old
+                    os.remove(name + '.prev')
+        elif start:
+            self.__h5 = h5py.File(filename, 'a')
+            self.__frames, self.__t, self.__table = self.__h5['frames'], self.__h5['t'], self.__h5['steps']
+            for a, n, shape in zip((self.__frames, self.__t, self.__table), rows, shapes):
+                _check(a, n, shape, filename)
+            self.__frames.resize(rows[0], axis = 0)
+            self.__t.resize(rows[0], axis = 0)
+            self.__table.resize(-(-start // 1024) * 1024, axis = 0)
+        else:
+            self.__h5 = h5py.File(filename, 'w')
+            self.__h5.create_dataset('x', data = x[index])
+            self.__frames = self.__h5.create_dataset('frames', (0, index.size), dtype, maxshape = (None, index.size),
+                                                     chunks = (max(1, min(64, 2**20 // (8 * index.size))), index.size))
+            self.__t = self.__h5.create_dataset('t', (0,), np.float64, maxshape = (None,), chunks = (1024,))
+            self.__table = self.__h5.create_dataset('steps', (0, len(columns)), np.float64, maxshape = (None, len(columns)),
+                                                    chunks = (1024, len(columns)))
+            self.__h5['steps'].attrs['columns'] = ','.join(columns)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def frames(self):
+        """
+        Método que regresa el número de instantáneas guardadas.
+        """
+        return self.__nframes
+
+    def steps(self):
+        """
+        Método que regresa el número de pasos registrados.
+        """
+        return self.__nsteps
+
+    def record(self, phi, t):
+        """
+        Método que registra un paso: agrega sus reducciones y, cada stride
+        pasos, guarda la instantánea.
+
+        @param phi: solución (tamaño nvx)
+        @param t: tiempo
+        """
+        n = self.__nsteps
+        if n >= self.__steps:
+            raise ValueError('Se registraron más de steps = {} pasos'.format(self.__steps))
+        p = phi[1:-1]
+        row = (n, t, p.min(), p.max(), np.dot(p, self.__w), np.sqrt(np.dot(p * p, self.__w)))
+        if self.__h5 is None:
+            self.__table[n] = row
+        else:
+            if n % 1024 == 0:
+                self.__table.resize(n + 1024, axis = 0)
+            self.__table[n] = row
+        if n % self.__stride == 0:
+            k = self.__nframes
+            if self.__h5 is not None:
+                self.__frames.resize(k + 1, axis = 0)
+                self.__t.resize(k + 1, axis = 0)
+            self.__frames[k] = phi[self.__index]
+            self.__t[k] = t
+            self.__nframes += 1
+        self.__nsteps += 1
+
+    def close(self):
+        """
+        Método que termina de escribir los archivos, recortándolos a lo que se registró.
+        """
+        if self.__h5 is not None:
+            if self.__h5.id.valid:
+                self.__table.resize(self.__nsteps, axis = 0)
+                self.__h5.close()
+            return
+        if self.__frames is None:
+            return
+        for a in (self.__frames, self.__t, self.__table):
+            a.flush()
+        self.__frames = self.__t = self.__table = None
+        for name, rows in zip(self.__names, (self.__nframes, self.__nframes, self.__nsteps)):
+            _truncate(name, rows)
+
+def load(filename):
+    """
+    Función que abre lo que escribió SnapshotStore. Con .npy las instantáneas
+    no se cargan en memoria (memmap de sólo lectura); con .h5 se copian y el
+    archivo se cierra antes de regresar.
+
+    @param filename: nombre del archivo (.npy o .h5)
+    @return: diccionario con 'x', 't', 'frames' y 'steps' (un arreglo por columna de la tabla de reducciones)
+    """
+    base, ext = os.path.splitext(filename)
+    if ext == '.npy':
+        table = np.load(base + '_steps.npy')
+        data = {'x': np.load(base + '_x.npy'),
+                't': np.load(base + '_t.npy'),
+                'frames': np.load(filename, mmap_mode = 'r')}
+    else:
+        if h5py is None:
+            raise ValueError('h5py no está instalado')
+        with h5py.File(filename, 'r') as f:
+            table = f['steps'][:]
+            data = {'x': f['x'][:], 't': f['t'][:], 'frames': f['frames'][:]}
+    data['steps'] = dict(zip(columns, table.T))
+    return data
+
+def _check(a, rows, shape, filename):
+    """
+    Verifica que el arreglo a de una historia existente tiene al menos rows
+    filas de tamaño shape.
+    """
+    if a.shape[0] < rows or tuple(a.shape[1:]) != shape:
+        raise ValueError('{} no tiene los {} pasos (o los puntos) de la historia que se continúa'.format(filename, rows))
+
+def _truncate(filename, rows):
+    """
+    Recorta un archivo .npy a sus primeras rows filas, reescribiendo el
+    encabezado con la misma longitud.
+    """
+    with open(filename, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        start = f.tell()
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+        if shape[0] == rows:
+            return
+        shape = (rows,) + shape[1:]
+        header = repr({'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': fortran, 'shape': shape})
+        size = offset - start - (2 if version == (1, 0) else 4)
+        f.seek(offset - size)
+        f.write(header.ljust(size - 1).encode('latin1') + b'\n')
+        f.truncate(offset + rows * int(np.prod(shape[1:], dtype = int)) * dtype.itemsize)
+
+if __name__ == '__main__':
+
+    import time
+    import tempfile
+    from Coefficients import Coefficients
+    from Diffusion import Diffusion1D
+    from Advection import Advection1D
+    from Temporal import Temporal1D
+    from Assembly import Assembler
+
+#
+# Problema de la Tarea-6.1 (CD) con N grande: tiempo del ciclo con y sin
+# instantáneas (cada 10 pasos, uno de cada 4 puntos)
+#
+    nvx = 4001
+    dx = 2.5 / (nvx - 1)
+    x = np.concatenate(([0.0], (np.arange(nvx - 2) + 0.5) * dx, [2.5]))
+
+    def problem():
+        coef = Coefficients(nvx, dx, private = True)
+        coef.alloc(nvx)
+        adv1 = Advection1D(nvx, 1.0, dx, coefficients = coef)
+        adv1.setU(1.0)
+        asm = Assembler(coef)
+        asm.addTerm(Diffusion1D(nvx, 0.001, dx, coefficients = coef))
+        asm.addTerm(adv1)
+        asm.addBoundary('LEFT_WALL', 'Dirichlet', 1.0)
+        asm.addBoundary('RIGHT_WALL', 'Dirichlet', 0.0)
+        asm.setTemporal(Temporal1D(nvx, 1.0, dx, 0.002, coefficients = coef))
+        phi = np.zeros(nvx)
+        phi[0] = 1.0
+        return asm, phi
+
+    steps = 500
+    asm, phi = problem()
+    t1 = time.time()
+    for n in range(steps):
+        asm.step(phi)
+    print('sin instantáneas: {:.3f} s'.format(time.time() - t1))
+    with tempfile.TemporaryDirectory() as tmp:
+        name = os.path.join(tmp, 'phi.npy')
+        asm, phi = problem()
+        t1 = time.time()
+        with SnapshotStore(name, x, dx, steps + 100, stride = 10, decimate = 4) as store:
+            store.record(phi, 0.0)
+            for n in range(1, steps + 1):
+                asm.step(phi)
+                store.record(phi, n * 0.002)
+        print('con instantáneas: {:.3f} s'.format(time.time() - t1))
+        data = load(name)
+        print('instantáneas = {}, puntos = {}, MB = {:.1f}'.format(
+              data['frames'].shape[0], data['frames'].shape[1], os.path.getsize(name) / 2**20))
+        s = data['steps']
+        print('integral: t = {:.3f} -> {:.4f}, t = {:.3f} -> {:.4f} (u t = {:.4f})'.format(
+              s['t'][0], s['integral'][0], s['t'][-1], s['integral'][-1], s['t'][-1]))
+        print('max |última instantánea - phi(t = {:.3f})| = {:.1e}'.format(
+              data['t'][-1], np.abs(data['frames'][-1] - phi[::4]).max()))
+#
+# Continuación: se interrumpe en el paso 300 y se sigue desde el paso 200
+# (como al reiniciar desde un punto de control); la historia es la misma
+#
+        other = os.path.join(tmp, 'otra.npy')
+        asm, phi = problem()
+        with SnapshotStore(other, x, dx, steps + 100, stride = 10, decimate = 4) as store:
+            store.record(phi, 0.0)
+            for n in range(1, 301):
+                asm.step(phi)
+                store.record(phi, n * 0.002)
+                if n == 200:
+                    phi200 = phi.copy()
+        asm, phi = problem()
+        phi[:] = phi200
+        with SnapshotStore(other, x, dx, steps + 100, stride = 10, decimate = 4, start = 201) as store:
+            for n in range(201, steps + 1):
+                asm.step(phi)
+                store.record(phi, n * 0.002)
+        again = load(other)
+        print('historia continuada desde el paso 200 igual = {}'.format(
+              all(np.array_equal(again[k], data[k]) for k in ('x', 't', 'frames')) and
+              all(np.array_equal(again['steps'][k], s[k]) for k in columns)))
+        del data, again
+    print('-' * 20)
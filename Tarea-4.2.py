@@ -95,15 +95,15 @@ print('A = ', A.mat(),
       'b = {}'.format(Su[1:-1]), sep='\n')
 print('.'+'-'*70+'.')
 #
-# Se resuelve el sistema usando un algoritmo del módulo linalg
+# Se resuelve el sistema usando el algoritmo de Thomas (TDMA)
 #
-T[1:-1] = np.linalg.solve(A.mat(),Su[1:-1])
+T[1:-1] = fvm.tdma(df1.aP(), df1.aE(), df1.aW(), Su[1:-1])
 print('Solución = {}'.format(T))
 print('.'+'-'*70+'.')
 #
-# Se resuelve el sistema usando un algoritmo del módulo linalg
+# Se resuelve el sistema usando el algoritmo de Thomas (TDMA)
 #
-T[1:-1] = np.linalg.solve(A.mat(),Su[1:-1])
+T[1:-1] = fvm.tdma(df1.aP(), df1.aE(), df1.aW(), Su[1:-1])
 #
 # Se construye un vector de coordenadas del dominio
 #
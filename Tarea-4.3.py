@@ -70,10 +70,14 @@ n2 = 25 # /m^2
 n = 5
 fluxB = 0 # Flujo igual a cero
 N = 6 # Número de nodos
+Agrupamiento = 0.0 # 0: malla uniforme; > 0: agrupa los volúmenes en la base de la aleta (tanh)
+Radiacion = 0.0 # > 0: pérdida adicional por radiación -Radiacion (T^4 - T∞^4) (en K), no lineal: se resuelve con Newton (la solución analítica es sin radiación)
 #
 # Creamos la malla y obtenemos datos importantes
 #
 malla = fvm.Mesh(nodes = N, length = longitud)
+if Agrupamiento:
+    malla.stretch('tanh', Agrupamiento)
 nx    = malla.nodes()     # Número de nodos
 nvx   = malla.volumes()   # Número de volúmenes
 delta = malla.delta()     # Tamaño de los volúmenes
@@ -86,7 +90,7 @@ fvm.printData(Longitud = longitud,
               n2 = n2,
               Nodos = nx, 
               Volúmenes = nvx,
-              Delta = delta)
+              Delta = np.min(delta[1:-1]) if np.ndim(delta) else delta)
 #
 #  Creamos los coeficientes de FVM
 #
@@ -113,15 +117,27 @@ print('A = ', A.mat(),
       'b = {}'.format(Su[1:-1]), sep='\n')
 print('.'+'-'*70+'.')
 #
-# Se resuelve el sistema usando un algoritmo del módulo linalg
+# Se resuelve el sistema usando el algoritmo de Thomas (TDMA)
 #
-T[1:-1] = np.linalg.solve(A.mat(),Su[1:-1])
+T[1:-1] = fvm.tdma(df1.aP(), df1.aE(), df1.aW(), Su[1:-1])
 print('Solución = {}'.format(T))
 print('.'+'-'*70+'.')
 #
-# Se resuelve el sistema usando un algoritmo del módulo linalg
+# Se resuelve el sistema usando el algoritmo de Thomas (TDMA)
 #
-T[1:-1] = np.linalg.solve(A.mat(),Su[1:-1])
+T[1:-1] = fvm.tdma(df1.aP(), df1.aE(), df1.aW(), Su[1:-1])
+#
+# La radiación se agrega como fuente no lineal S(T) con su derivada; Newton
+# parte de la solución sin radiación
+#
+if Radiacion:
+    S = lambda T: -Radiacion * ((T + 273.15)**4 - (Tambiente + 273.15)**4)
+    dS = lambda T: -4 * Radiacion * (T + 273.15)**3
+    newton = fvm.NewtonSolver()
+    newton.solve(df1, S, dS, T)
+    print('Newton: iteraciones = {}, factorizaciones = {}'.format(newton.iterations(), newton.factorizations()),
+          '|F| = {}'.format(', '.join('{:.1e}'.format(f) for f in newton.history())), sep = '\n')
+    print('.'+'-'*70+'.')
 T[-1] = T[-2] # Condición de frontera tipo Neumman
 #
 # Se construye un vector de coordenadas del dominio
@@ -95,9 +95,9 @@ print('A = ', A.mat(),
       'b = {}'.format(Su[1:-1]), sep='\n')
 print('.'+'-'*70+'.')
 #
-# Se resuelve el sistema usando un algoritmo del módulo linalg
+# Se resuelve el sistema usando el algoritmo de Thomas (TDMA)
 #
-Phi[1:-1] = np.linalg.solve(A.mat(),Su[1:-1])
+Phi[1:-1] = fvm.tdma(coef.aP(), coef.aE(), coef.aW(), Su[1:-1])
 print('Solución = {}'.format(Phi))
 print('.'+'-'*70+'.')
 #
@@ -88,9 +88,9 @@ print('A = ', A.mat(),
       'b = {}'.format(Su[1:-1]), sep='\n')
 print('.'+'-'*70+'.')
 #
-# Se resuelve el sistema usando un algoritmo del módulo linalg
+# Se resuelve el sistema usando el algoritmo pentadiagonal (PDMA)
 #
-Phi[1:-1] = np.linalg.solve(A.mat(),Su[1:-1])
+Phi[1:-1] = fvm.pdma(coef.aP(), coef.aE(), coef.aW(), coef.aEE(), coef.aWW(), Su[1:-1])
 print('Solución = {}'.format(Phi))
 print('.'+'-'*70+'.')
 #
@@ -47,6 +47,7 @@ Analytical solution:
 """
 
 import FiniteVolumeMethod as fvm
+import os
 import numpy as np
 import scipy as sp
 import viscoflow as vfl
@@ -55,6 +56,60 @@ def analyticSol(x, u, t, Gamma):
  	sol = 0.5 * (sp.special.erfc((x - u * t)/(2 * np.sqrt(Gamma * t))) + np.exp(u * x) * np.exp(-Gamma) * sp.special.erfc((x + u * t)/(2 * np.sqrt(Gamma * t))))
  	return sol
 
+def construye(malla):
+    """
+    Construye los coeficientes, los términos de FVM, el ensamble y la matriz
+    sobre una malla. Con malla adaptativa se vuelve a llamar cada vez que la
+    malla cambia.
+    """
+    nvx = malla.volumes()   # Número de volúmenes
+    dx = malla.delta()      # Tamaño de los volúmenes
+#
+#  Creamos los coeficientes de FVM
+#
+    coef = fvm.Coefficients()
+    coef.alloc(nvx, Precision)
+
+    df1 = fvm.Diffusion1D(nvx, Gamma = gamma, dx = dx)
+
+    adv1 = fvm.Advection1D(nvx, rho = rho, dx = dx)
+    adv1.setU(u)
+
+    D = gamma/dx if malla.isUniform() else None # sólo se usa con QUICK (malla uniforme)
+
+    if Theta == "BDF2":
+        tem = fvm.BDF2Temporal1D(nvx, rho = rho, dx = dx, dt = dt)
+    else:
+        tem = fvm.Temporal1D(nvx, rho = rho, dx = dx, dt = dt, theta = Theta)
+
+#
+# Se registran los términos en el orden en que se calculan; en cada paso sólo
+# se recalculan los que cambiaron (aquí ninguno, así que sólo se actualiza la
+# parte temporal de Su con la solución anterior). La parte temporal va al
+# final para que el método theta escale toda la parte espacial
+#
+    asm = fvm.Assembler(coef)
+    asm.addTerm(df1)
+    if Esquema == "UpW":
+        asm.addTerm(adv1, 'UpW')
+    elif Esquema == "UpW2":
+        asm.addTerm(adv1, 'UpW2', PhiA, PhiB)
+    elif Esquema == "QUICK":
+        asm.addTerm(adv1, 'QUICK', PhiA, PhiB, D)
+    else:
+        asm.addTerm(adv1)
+#
+# Se aplican las condiciones de frontera dependiendo del esquema a usar
+#
+    if Esquema != "UpW2" and Esquema != "QUICK":
+        asm.addBoundary('LEFT_WALL', 'Dirichlet', PhiA)   # Se actualizan los coeficientes
+        asm.addBoundary('RIGHT_WALL', 'Dirichlet', PhiB) # de acuerdo a las cond. de frontera
+    if Solver != "explicit" and not Estacionario:
+        asm.setTemporal(tem)
+
+    A = fvm.Matrix(nvx, Almacenamiento)  # Matriz del sistema
+    return coef, adv1, tem, asm, A
+
 
 longitud = 2.5 # metros
 PhiA = 1
@@ -65,12 +120,56 @@ u = 1.0 #m/s
 Ti = 0.0
 Tf = 1.0
 dt = 0.002
+Theta = 1.0 # 1: Euler implícito, 0.5: Crank-Nicolson (segundo orden, permite dt 5-10 veces mayor), 0: explícito, "BDF2": BDF2 de paso variable (segundo orden)
+Adaptativo = False # True: dt adaptativo (paso doble con control PI, dt es el paso inicial; no se combina con Refinamiento); con Theta = 1 se usa Crank-Nicolson (Theta = 0.5): Euler implícito, de primer orden, necesita unos 3000 pasos para ToleranciaT = 1e-3 y Crank-Nicolson unos 480
+ToleranciaT = 1e-3 # tolerancia relativa del error local en el tiempo (con Adaptativo)
+Estacionario = False # True: sólo el estado estacionario, con paso ficticio creciente (SER) que empieza en dt; termina en cuanto se cumple ToleranciaE
+ToleranciaE = 1e-10 # reducción relativa del residuo (o cambio relativo de Phi) con la que termina Estacionario
+Instantaneas = "" # archivo .npy (memmap) o .h5 donde se guarda la historia de Phi con sus reducciones por paso ("" no se guarda; no se combina con Refinamiento)
+CadaT = 10 # se guarda Phi cada CadaT pasos (las reducciones se guardan en todos)
+CadaX = 1 # se guarda uno de cada CadaX puntos de Phi
+PuntoControl = "" # archivo del punto de control (estado completo para reiniciar; "" no se guarda); se escribe de forma atómica y en segundo plano; al reiniciar, Instantaneas continúa la historia existente
+CadaP = 100 # pasos entre puntos de control
+Reiniciar = True # si PuntoControl existe se continúa desde él (con los mismos parámetros)
 N  = 350 # Número de nodos
 Esquema = "QUICK" #CD, UpW, UpW2 y QUICK, si no se especifica se usará diferencias centradas. 
+Agrupamiento = 0.0 # 0: malla uniforme; > 0: agrupa los volúmenes alrededor del frente x = u Tf (tanh, sólo con CD y UpW)
+Refinamiento = 0 # 0: malla fija; k > 0: malla adaptativa (AMR) que sigue al frente, se adapta cada k pasos (sólo con CD y UpW)
+Almacenamiento = "banded" # dense, banded (sólo se guardan las diagonales de la matriz) o csr (dispersa)
+Solver = "cached" # cached (reutiliza la factorización LU), fused (ensambla y resuelve con TDMA/PDMA en un solo kernel), explicit (sin sistema lineal), direct, bicgstab, gmres o cg (los de Krylov requieren Almacenamiento = "csr")
+Explicito = "rk3" # euler, rk2 o rk3 (SSP), con Solver = "explicit"; cada paso dt se divide en subpasos estables
+Precondicionador = "ilu0" # jacobi, ilu0, banded o mg (multimalla)
+Tolerancia = 1e-10 # tolerancia relativa del residuo para los solvers de Krylov
+Precision = np.float64 # np.float64 o np.float32 (coeficientes y factorización en simple con refinamiento iterativo)
+Backend = "numpy" # numpy o numba (kernels compilados, si Numba está instalado)
+Graficas = "sync" # sync (pyplot en el ciclo, se muestra la figura) o async (se dibuja en otro hilo con Agg y sólo se guarda el archivo); las curvas se reducen con LTTB a la resolución de la figura
+fvm.setBackend(Backend)
+vfl.setMode(Graficas)
+if Adaptativo and Theta == 1:
+    Theta = 0.5 # con paso adaptativo se usa un método de segundo orden
 #
 # Creamos la malla y obtenemos datos importantes
 #
-malla = fvm.Mesh(nodes = N, length = longitud)
+if Refinamiento:
+    amr = fvm.AdaptiveMesh1D(longitud, cells = 25, maxlevel = 5) # volúmenes de 0.1 m a 0.003 m
+    malla = amr.mesh()
+else:
+    malla = fvm.Mesh(nodes = N, length = longitud)
+    if Agrupamiento:
+        malla.stretch('tanh', Agrupamiento, where = u * Tf)
+#
+# Se construye el arreglo donde se guardará la solución
+#
+Phi = np.zeros(malla.volumes()) # El arreglo contiene ceros
+Phi[0]  = PhiA        # Condición de frontera izquierda
+Phi[-1] = PhiB        # Condición de frontera derecha
+#
+# La malla adaptativa se ajusta primero a la condición inicial
+#
+if Refinamiento:
+    for k in range(6):
+        Phi, cambio = amr.regrid(Phi)
+    malla = amr.mesh()
 nx    = malla.nodes()     # Número de nodos
 nvx   = malla.volumes()   # Número de volúmenes
 dx = malla.delta()     # Tamaño de los volúmenes
@@ -84,79 +183,161 @@ fvm.printData(Longitud = longitud,
               Conductividad = gamma,
               Nodos = nx, 
               Volúmenes = nvx,
-              Delta = dx)
+              Delta = np.min(dx[1:-1]) if np.ndim(dx) else dx)
 
+coef, adv1, tem, asm, A = construye(malla)
 #
-# Se construye el arreglo donde se guardará la solución
-#
-Phi = np.zeros(nvx) # El arreglo contiene ceros
-Phi[0]  = PhiA        # Condición de frontera izquierda
-Phi[-1] = PhiB        # Condición de frontera derecha
-
-#
-#  Creamos los coeficientes de FVM
+# Se continúa desde el punto de control, si existe: se verifica que los
+# parámetros y los coeficientes reconstruidos son los mismos y se
+# restablecen Phi, el tiempo, el paso, la malla adaptativa y los niveles
+# anteriores de la parte temporal
 #
-coef = fvm.Coefficients()
-coef.alloc(nvx)
+inicio, t = 0, Ti
+estado = None
+if PuntoControl:
+    parametros = dict(N = N, longitud = longitud, PhiA = PhiA, PhiB = PhiB, gamma = gamma, rho = rho, u = u,
+                      Ti = Ti, Tf = Tf, dt = dt, Theta = Theta, Adaptativo = Adaptativo, ToleranciaT = ToleranciaT,
+                      Esquema = Esquema, Agrupamiento = Agrupamiento, Refinamiento = Refinamiento,
+                      Solver = Solver, Explicito = Explicito)
+    punto = fvm.Checkpointer(PuntoControl, every = CadaP)
+    if Reiniciar and os.path.exists(PuntoControl):
+        estado = fvm.Checkpointer.load(PuntoControl)
+        fvm.Checkpointer.check(estado, **parametros)
+        if Refinamiento:
+            amr.setState(estado['malla'])
+            malla = amr.mesh()
+            nvx = malla.volumes()
+            dx = malla.delta()
+            x = malla.createMesh()
+            coef, adv1, tem, asm, A = construye(malla)
+        tem.setDeltaT(estado['dtTemporal'])
+        if fvm.FactorizationCache.key(asm.assemble()) != estado['clave']:
+            raise ValueError('Los coeficientes reconstruidos no son los del punto de control')
+        inicio, t = estado['paso'], estado['t']
+        Phi = estado['Phi'].copy()
+        tem.setHistory(estado['historia'])
+        print('Se continúa desde el paso {} (t = {})'.format(inicio, t))
 
-df1 = fvm.Diffusion1D(nvx, Gamma = gamma, dx = dx)
+def guarda(i, t):
+    """
+    Guarda el punto de control del paso i (la escritura sigue en segundo plano).
+    """
+    punto.save(dict(parametros, paso = i, t = t, Phi = Phi, historia = tem.history(), dtTemporal = tem.deltaT(),
+                    controlador = paso.state() if Adaptativo else None,
+                    malla = amr.state() if Refinamiento else None,
+                    clave = fvm.FactorizationCache.key(asm.assemble())))
 
-adv1 = fvm.Advection1D(nvx, rho = rho, dx = dx)
-adv1.setU(u)
-
-D = gamma/dx
-
-tem = fvm.Temporal1D(nvx, rho = rho, dx = dx, dt = dt)
+if Solver == "cached":
+    cache = fvm.FactorizationCache(Precision)
+elif Solver == "explicit":
+    subpasos = int(np.ceil(dt / fvm.stableDeltaT(u, gamma, dx, rho, Esquema, Explicito)))
+    explicito = fvm.ExplicitStepper(asm, rho, dx, Explicito)
+elif Solver != "direct" and Solver != "fused":
+    krylov = fvm.KrylovSolver(Solver, Precondicionador, rtol = Tolerancia)
 
 # Calculamos la solución analítica
 #
 Phiaf = analyticSol(x, u, Tf-Ti, gamma)
 vfl.grafica(x,Phiaf,kind='-',label='solución analítica')
 
-for i in range(1,int((Tf-Ti)/dt)+1):
 #
-# Iniciamos con coeficientes cero
-#
-    print('Time step = {}'.format(i * dt), sep = '\t')
-    coef.cleanCoefficients()
+# Historia de la solución en disco (con paso adaptativo se reserva para 10
+# veces los pasos de dt fijo; al continuar desde un punto de control se
+# conservan los pasos 0 a estado['paso'] de la historia que ya existe y se
+# sigue escribiendo después de ellos)
 #
-#  Calculamos los coeficientes de FVM de la Difusión
-#
-    df1.calcCoef()
+if Instantaneas:
+    if Refinamiento:
+        raise ValueError('Instantaneas no se combina con Refinamiento (cambia el número de volúmenes)')
+    historia = fvm.SnapshotStore(Instantaneas, x, dx, (10 if Adaptativo else 1) * int((Tf-Ti)/dt) + 1, stride = CadaT, decimate = CadaX,
+                                 start = 0 if estado is None else estado['paso'] + 1)
+    if estado is None:
+        historia.record(Phi, t)
+
 #
-#  Calculamos los coeficientes de FVM de la Advección
+# Con paso adaptativo el controlador escoge dt (sólo se recalcula la parte
+# temporal de los coeficientes) y se grafica en los mismos tiempos que con
+# paso fijo
 #
+if Adaptativo:
     adv1.setU(u)
-    if Esquema == "UpW":
-        adv1.calcCoef('UpW')
-    elif Esquema == "UpW2":
-        adv1.calcCoef('UpW2', PhiA, PhiB)
-    elif Esquema == "QUICK":
-        adv1.calcCoef('QUICK', PhiA, PhiB, D)
-    else:
-        adv1.calcCoef()
+    paso = fvm.AdaptiveStepper(asm, tem, rtol = ToleranciaT)
+    if estado is not None:
+        paso.setState(estado['controlador'])
+    for k in range(1, int(round((Tf-Ti)/(100*dt))) + 1):
+        tk = Ti + k * 100 * dt
+        if tk <= t:
+            continue
+        while t < tk:
+            t = paso.step(Phi, t, tk)
+            if Instantaneas:
+                historia.record(Phi, t)
+            if PuntoControl and punto.due(paso.accepted()):
+                guarda(paso.accepted(), t)
+            print('Time = {}, dt = {}'.format(t, paso.deltaT()), sep = '\t')
+        vfl.grafica(x,Phi,title='Solución de $\partial phi /\partial t + \partial ( rho*u*phi)/\partial x = \partial ( Gamma (\partial T /\partial x ))/\partial x$ con FVM', label='Step = {}'.format(tk))
+    print('Pasos aceptados = {}, rechazados = {}'.format(paso.accepted(), paso.rejected()))
+
 #
-#  Calculamos los coeficientes de FVM de la parte temporal
+# Estado estacionario: el paso ficticio crece conforme baja el residuo y se
+# termina en cuanto el residuo o el cambio de Phi cumplen la tolerancia
 #
-    tem.calcCoef(Phi)
- 
+if Estacionario:
+    adv1.setU(u)
+    estacionario = fvm.PseudoTransient(asm, rho, dx, dt = dt, rtol = ToleranciaE, dtol = ToleranciaE)
+    convergio = estacionario.solve(Phi, maxsteps = int((Tf-Ti)/dt))
+    for k, (R, cambio) in enumerate(estacionario.history(), 1):
+        print('Paso = {}, residuo = {:.3e}, cambio = {:.3e}'.format(k, R, cambio), sep = '\t')
+    print('Pasos = {}, convergió = {}'.format(estacionario.steps(), convergio))
+    vfl.grafica(x,Phi,title='Solución de $\partial phi /\partial t + \partial ( rho*u*phi)/\partial x = \partial ( Gamma (\partial T /\partial x ))/\partial x$ con FVM', label='estacionario')
+
+pasos = 0 if Adaptativo or Estacionario else int((Tf-Ti)/dt)
+for i in range(inicio+1,pasos+1):
 #
-# Se aplican las condiciones de frontera dependiendo del esquema a usar
+# Se calculan los coeficientes de FVM (difusión, advección, parte temporal y
+# condiciones de frontera), recalculando sólo los términos que cambiaron
 #
-    if Esquema != "UpW2" and Esquema != "QUICK":
-        coef.bcDirichlet('LEFT_WALL', PhiA)   # Se actualizan los coeficientes
-        coef.bcDirichlet('RIGHT_WALL', PhiB) # de acuerdo a las cond. de frontera
+    print('Time step = {}'.format(i * dt), sep = '\t')
+    adv1.setU(u)
+    if Solver == "fused":
+        asm.step(Phi) # Ensamble y solución en una sola llamada
+    elif Solver == "explicit":
+        explicito.step(Phi, dt / subpasos, subpasos) # Subpasos explícitos estables
+    else:
+        asm.assemble(Phi)
 
 #
 # Se construye el sistema lineal de ecuaciones a partir de los coef. de FVM
 #
     Su = coef.Su()  # Vector del lado derecho
-    A = fvm.Matrix(malla.volumes())  # Matriz del sistema
-    A.build(coef) # Construcción de la matriz en la memoria
+    if Solver not in ("cached", "fused", "explicit"):
+        A.build(coef) # Construcción de la matriz en la memoria
 #
-# Se resuelve el sistema usando un algoritmo del módulo linalg
+# Se resuelve el sistema: con la factorización guardada (sólo se factoriza
+# si los coeficientes cambiaron), directo o con Krylov, iniciando con la
+# solución del paso de tiempo anterior
 #
-    Phi[1:-1] = np.linalg.solve(A.mat(),Su[1:-1])
+    if Solver == "cached":
+        Phi[1:-1] = cache.solve(coef, Su[1:-1])
+    elif Solver == "direct":
+        Phi[1:-1] = A.solve(Su[1:-1])
+    elif Solver not in ("fused", "explicit"):
+        Phi[1:-1] = krylov.solve(A, Su[1:-1], x0 = Phi[1:-1])
+    if Instantaneas:
+        historia.record(Phi, Ti + i * dt)
+#
+# Con malla adaptativa, cada Refinamiento pasos se adapta la malla al frente,
+# se pasa Phi a la malla nueva y se vuelven a construir los coeficientes
+#
+    if Refinamiento and i % Refinamiento == 0:
+        Phi, cambio = amr.regrid(Phi)
+        if cambio:
+            malla = amr.mesh()
+            x = malla.createMesh()
+            coef, adv1, tem, asm, A = construye(malla)
+            if Solver == "explicit":
+                subpasos = int(np.ceil(dt / fvm.stableDeltaT(u, gamma, malla.delta(), rho, Esquema, Explicito)))
+                explicito = fvm.ExplicitStepper(asm, rho, malla.delta(), Explicito)
     
 #
 # Usamos Viscoflow para graficar
@@ -165,6 +346,13 @@ for i in range(1,int((Tf-Ti)/dt)+1):
     if (i % 100 == 0):
         etiqueta = 'Step = {}'.format(i*dt)
         vfl.grafica(x,Phi,title='Solución de $\partial phi /\partial t + \partial ( rho*u*phi)/\partial x = \partial ( Gamma (\partial T /\partial x ))/\partial x$ con FVM', label=etiqueta)
+    if PuntoControl and punto.due(i):
+        guarda(i, Ti + i * dt)
+
+if Instantaneas:
+    historia.close()
+if PuntoControl:
+    punto.close()
 
 vfl.show('Problema6-ADT_' + Esquema + '_' + str(N) + 'nodos.png')
 
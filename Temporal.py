@@ -9,26 +9,42 @@ Documented by: Daniel Becerra Pedraza
 
 import numpy as np
 from Coefficients import Coefficients
+from LinearSolvers import bandedMatvec
 
 class Temporal1D(Coefficients):
     """
     Clase que modela la parte Temporal, hereda atributos y métodos de Coefficients.
+
+    La integración en el tiempo es el método theta: con A phi = Su la parte
+    espacial (difusión, advección y condiciones de frontera),
+
+        (rho dx / dt + theta A) phi_nuevo = rho dx / dt phi_old + Su - (1 - theta) A phi_old,
+
+    theta = 1 es Euler implícito, 0.5 Crank-Nicolson (segundo orden) y 0
+    explícito. Con theta < 1 la parte temporal debe calcularse al final, con
+    los demás términos y las fronteras ya en los coeficientes: calcMatrixCoef
+    guarda (1 - theta) A en banda y escala A por theta, y calcSourceCoef resta
+    el producto de la parte explícita por phi_old.
     """
     
-    def __init__(self, nvx = None, rho = None, dx = None, dt = None):
+    def __init__(self, nvx = None, rho = None, dx = None, dt = None, coefficients = None, theta = 1.0):
         """
         Constructor de la clase.
         
         @param nvx: número de volúmenes [nulo por defecto]
         @param rho: densidad [nulo por defecto]
-        @param dx: valor de los intervalos en x  [nulo por defecto]
+        @param dx: valor de los intervalos en x, o arreglo de anchos (tamaño nvx) en una malla no uniforme [nulo por defecto]
         @param dt: valor de los intervalos en el tiempo  [nulo por defecto]
+        @param coefficients: objeto Coefficients (private = True) en cuyos arreglos se escribirán los coeficientes [nulo por defecto]
+        @param theta: peso de la parte implícita, 1 implícito, 0.5 Crank-Nicolson, 0 explícito [1 por defecto]
         """
-        super().__init__(nvx)
+        super().__init__(nvx, coefficients = coefficients)
         self.__nvx = nvx
         self.__rho = rho
         self.__dx = dx
         self.__dt = dt
+        self.__theta = theta
+        self.__explicit = None
 
     def __del__(self):
         """
@@ -47,20 +63,240 @@ class Temporal1D(Coefficients):
         """
         return self.__dt
 
+    def sourceFactor(self):
+        """
+        Método que regresa el factor dx / dt con el que la solución anterior entra a Su.
+        
+        @return dx / dt (arreglo de tamaño nvx en una malla no uniforme)
+        """
+        return self.__dx / self.__dt
+
+    def setDeltaT(self, dt):
+        """
+        Método para asignar un nuevo valor al intervalo temporal.
+        
+        @param dt: valor del intervalo de tiempo
+        """
+        if dt != self.__dt:
+            self.__dt = dt
+            self.touch()
+
+    def theta(self):
+        """
+        Método que regresa el peso theta de la parte implícita.
+        
+        @return theta
+        """
+        return self.__theta
+
+    def setTheta(self, theta):
+        """
+        Método para asignar el peso theta de la parte implícita.
+        
+        @param theta: valor entre 0 y 1
+        """
+        if not 0 <= theta <= 1:
+            raise ValueError('theta debe estar entre 0 y 1')
+        if theta != self.__theta:
+            self.__theta = theta
+            self.touch()
+
+    def order(self):
+        """
+        Método que regresa el orden en el tiempo del método (2 con Crank-Nicolson, 1 si no).
+        
+        @return: orden
+        """
+        return 2 if self.__theta == 0.5 else 1
+
+    def sourceRows(self):
+        """
+        Método que regresa los renglones del bloque de coeficientes (ver
+        Coefficients.block) que modifica calcSourceCoef: sólo Su.
+        
+        @return: tupla de números de renglón
+        """
+        return (5,)
+
+    def history(self):
+        """
+        Método que regresa el estado de los niveles anteriores de la solución;
+        el método theta sólo usa phi_old, así que no hay estado.
+        
+        @return: nulo
+        """
+        return None
+
+    def setHistory(self, history):
+        """
+        Método que restablece el estado que regresó history (ver BDF2Temporal1D).
+        
+        @param history: estado guardado
+        """
+        pass
+
     def calcCoef(self, phi_old):
         """
         Método que calcula la parte temporal de los coeficientes que aparecerán en la matriz que se resolverá.
         
         @param phi_old: valor anterior de $\phi_{p}$
         """
+        self.calcMatrixCoef()
+        self.calcSourceCoef(phi_old)
+
+    def calcMatrixCoef(self):
+        """
+        Método que calcula la parte temporal de aP (sólo depende de rho, dx y dt).
+        Con theta < 1 guarda la parte explícita (1 - theta) A y escala A por theta.
+        """
+        theta = self.__theta
+        if theta != 1:
+            bands = self.block()[:5]
+            self.__explicit = (1 - theta) * bands
+            bands *= theta
+        else:
+            self.__explicit = None
         aP = self.aP()
-        Su = self.Su()
         rho = self.__rho
         dx_dt = self.__dx / self.__dt
+        if np.ndim(dx_dt):
+            dx_dt = dx_dt[1:-1]
+
+        aP[1:-1] += rho * dx_dt 
+
+    def calcSourceCoef(self, phi_old):
+        """
+        Método que calcula la parte temporal de Su (depende de la solución anterior).
+        
+        @param phi_old: valor anterior de $\phi_{p}$
+        """
+        Su = self.Su()
+        dx_dt = self.__dx / self.__dt
+        if np.ndim(dx_dt):
+            dx_dt = dx_dt[1:-1]
+
+        Su[1:-1] += phi_old[1:-1] * dx_dt
+        if self.__explicit is not None:
+            Su[1:-1] -= bandedMatvec(*self.__explicit, phi_old[1:-1])
 
-        for i in range(1,self.__nvx-1):
-            aP[i] += rho * dx_dt 
-            Su[i] += phi_old[i] * dx_dt
+class BDF2Temporal1D(Temporal1D):
+    """
+    Clase que modela la parte Temporal con BDF2 de paso variable. Con
+    w = dt_n / dt_(n-1),
+
+        rho dx / dt (a0 phi_nuevo - a1 phi_n + a2 phi_(n-1)) + A phi_nuevo = Su,
+
+    a0 = (1 + 2w) / (1 + w), a1 = 1 + w, a2 = w^2 / (1 + w); con w = 1 son
+    los coeficientes 3/2, 2, 1/2 de paso fijo. Es de segundo orden y
+    A-estable, como Euler implícito.
+
+    Los dos últimos niveles de la solución se guardan en un buffer circular:
+    cada llamada a calcSourceCoef(phi_old) corresponde a un paso nuevo y
+    agrega phi_old como el nivel más reciente. El primer paso (sin nivel
+    anterior) es Euler implícito. Para repetir un paso desde el mismo estado
+    (paso adaptativo) se guarda y restablece el buffer con history y setHistory.
+
+    La parte de aP que depende de w se suma en calcSourceCoef (rho dx / dt
+    por a0 - 1), así que la etapa de calcMatrixCoef es la misma que la de
+    Temporal1D y sólo se recalcula al cambiar dt.
+    """
+
+    def __init__(self, nvx = None, rho = None, dx = None, dt = None, coefficients = None):
+        """
+        Constructor de la clase.
+        
+        @param nvx: número de volúmenes [nulo por defecto]
+        @param rho: densidad [nulo por defecto]
+        @param dx: valor de los intervalos en x, o arreglo de anchos (tamaño nvx) en una malla no uniforme [nulo por defecto]
+        @param dt: valor de los intervalos en el tiempo  [nulo por defecto]
+        @param coefficients: objeto Coefficients (private = True) en cuyos arreglos se escribirán los coeficientes [nulo por defecto]
+        """
+        super().__init__(nvx, rho, dx, dt, coefficients = coefficients)
+        self.__rho = rho
+        self.__dx = dx
+        self.__levels = np.zeros((2, nvx))
+        self.__head = 0
+        self.__count = 0
+        self.__dtOld = None
+
+    def order(self):
+        """
+        Método que regresa el orden en el tiempo del siguiente paso: 1 si es el
+        paso de arranque (Euler implícito, todavía no hay un nivel guardado) y
+        2 si no. Depende del buffer, así que se lee después de setHistory.
+        
+        @return: orden
+        """
+        return 2 if self.__count >= 1 else 1
+
+    def sourceRows(self):
+        """
+        Método que regresa los renglones del bloque de coeficientes que modifica
+        calcSourceCoef: aP (la corrección que depende de w) y Su.
+        
+        @return: tupla de números de renglón
+        """
+        return (0, 5)
+
+    def setTheta(self, theta):
+        """
+        BDF2 no tiene parte explícita.
+        """
+        if theta != 1:
+            raise ValueError('BDF2 no admite theta distinto de 1')
+
+    def history(self):
+        """
+        Método que regresa una copia del buffer de niveles anteriores.
+        
+        @return: estado (niveles, posición, número de niveles, paso anterior)
+        """
+        return (self.__levels.copy(), self.__head, self.__count, self.__dtOld)
+
+    def setHistory(self, history):
+        """
+        Método que restablece el buffer de niveles anteriores.
+        
+        @param history: estado que regresó history
+        """
+        levels, self.__head, self.__count, self.__dtOld = history
+        self.__levels[:] = levels
+
+    def clearHistory(self):
+        """
+        Método que borra los niveles anteriores (el siguiente paso será Euler implícito).
+        """
+        self.__count = 0
+        self.__dtOld = None
+
+    def calcSourceCoef(self, phi_old):
+        """
+        Método que agrega phi_old al buffer y calcula la parte temporal de Su
+        (y la corrección de aP que depende de w).
+        
+        @param phi_old: valor anterior de $\phi_{p}$
+        """
+        dt = self.deltaT()
+        dtOld = self.__dtOld
+        self.__head = 1 - self.__head
+        self.__levels[self.__head] = phi_old
+        self.__count = min(self.__count + 1, 2)
+        self.__dtOld = dt
+        if self.__count < 2:
+            super().calcSourceCoef(phi_old)
+            return
+        older = self.__levels[1 - self.__head]
+        w = dt / dtOld
+        a0 = (1 + 2 * w) / (1 + w)
+        a1 = 1 + w
+        a2 = w * w / (1 + w)
+        dx_dt = self.__dx / dt
+        if np.ndim(dx_dt):
+            dx_dt = dx_dt[1:-1]
+        aP = self.aP()
+        Su = self.Su()
+        aP[1:-1] += self.__rho * dx_dt * (a0 - 1)
+        Su[1:-1] += dx_dt * (a1 * phi_old[1:-1] - a2 * older[1:-1])
 
 if __name__ == '__main__':
     
@@ -74,8 +310,37 @@ if __name__ == '__main__':
     tf1.alloc(6)
     tf1.calcCoef(phi_old)
     print(tf1.aP())
-    print('-' * 20)  
-
+    print('-' * 20)
 
+#
+# Error en el tiempo del problema de la Tarea-6.1 (CD, N = 350) contra una
+# solución con dt muy pequeño: Crank-Nicolson es de segundo orden
+#
+    from Diffusion import Diffusion1D
+    from Advection import Advection1D
+    from Assembly import Assembler
 
+    def solve(dt, theta, nvx = 351, T = 1.0):
+        dx = 2.5 / (nvx - 1)
+        coef = Coefficients(nvx, dx, private = True)
+        coef.alloc(nvx)
+        adv1 = Advection1D(nvx, 1.0, dx, coefficients = coef)
+        adv1.setU(1.0)
+        asm = Assembler(coef)
+        asm.addTerm(Diffusion1D(nvx, 0.001, dx, coefficients = coef))
+        asm.addTerm(adv1)
+        asm.addBoundary('LEFT_WALL', 'Dirichlet', 1.0)
+        asm.addBoundary('RIGHT_WALL', 'Dirichlet', 0.0)
+        if theta == 'BDF2':
+            asm.setTemporal(BDF2Temporal1D(nvx, 1.0, dx, dt, coefficients = coef))
+        else:
+            asm.setTemporal(Temporal1D(nvx, 1.0, dx, dt, coefficients = coef, theta = theta))
+        phi = np.zeros(nvx)
+        phi[0] = 1.0
+        return asm.step(phi, int(round(T / dt)))
 
+    ref = solve(0.0002, 0.5)
+    for theta in (1.0, 0.5, 'BDF2'):
+        for dt in (0.02, 0.01, 0.005, 0.002):
+            print('theta = {}, dt = {:5.3f}, error = {:.3e}'.format(theta, dt, np.abs(solve(dt, theta) - ref).max()))
+    print('-' * 20)  
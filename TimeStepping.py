@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:14:37 2026
+
+Paso de tiempo adaptativo para los problemas transitorios que se ensamblan
+con Assembler.
+
+El error local de cada paso se estima con el paso doble: se da un paso con
+dt y dos con dt / 2 desde el mismo estado; la diferencia entre ambos,
+dividida entre 2^p - 1 (p = 1 con Euler implícito y p = 2 con
+Crank-Nicolson o BDF2, ver Temporal1D.order), es el error del resultado con dos pasos, que es el que se
+conserva. El error se mide relativo a la solución,
+
+    err = max |e_i| / (atol + rtol |phi_i|),
+
+y el paso se acepta si err <= 1. El nuevo dt lo da un controlador PI
+(Gustafsson), que usa también el error del paso aceptado anterior para
+que dt no oscile:
+
+    dt_nuevo = dt * safety * err^(-0.7 / (p + 1)) * err_anterior^(0.4 / (p + 1)).
+
+Al cambiar dt sólo cambia la parte temporal (Temporal1D.setDeltaT), así que
+Assembler sólo recalcula esa etapa (que es la última). Con BDF2 los
+niveles anteriores se guardan antes de los intentos y se restablecen antes
+de cada uno, de modo que sólo queda la historia de los dos medios pasos
+aceptados.
+
+Para los problemas dominados por advección también hay un integrador
+explícito (Euler, SSP-RK2 o SSP-RK3) que aplica directamente los
+coeficientes ensamblados de la parte espacial,
+
+    rho dx dphi/dt = Su - aP phi + aE phi_E + aW phi_W + aEE phi_EE + aWW phi_WW,
+
+con operaciones sobre arreglos completos y sin construir ninguna matriz;
+stableDeltaT da el paso estable a partir de los límites CFL y del número
+de difusión (con UpW2 y QUICK, de los coeficientes ensamblados).
+
+Cuando sólo interesa el estado estacionario, PseudoTransient avanza en un
+tiempo ficticio con Euler implícito y hace crecer el paso conforme baja el
+residuo (SER, switched evolution relaxation),
+
+    dt_n = dt_0 (R_0 / R_n)^exponent,
+
+de modo que los primeros pasos son robustos y los últimos son casi un
+método de Newton (dt infinito); se detiene en cuanto el residuo o el cambio
+de la solución cumplen la tolerancia.
+"""
+
+import numpy as np
+from LinearSolvers import bandedMatvec, tdma, pdma
+from Coefficients import Coefficients
+from Diffusion import Diffusion1D
+from Advection import Advection1D
+from Assembly import Assembler
+
+class AdaptiveStepper():
+    """
+    Clase que avanza un problema transitorio con paso de tiempo adaptativo.
+    """
+
+    def __init__(self, assembler, temporal, rtol = 1e-3, atol = 1e-6, dtmin = 1e-10, dtmax = np.inf, safety = 0.9):
+        """
+        Constructor de la clase.
+
+        @param assembler: objeto Assembler con todos los términos registrados
+        @param temporal: objeto Temporal1D registrado en assembler (su dt es el paso inicial)
+        @param rtol: tolerancia relativa del error local [1e-3 por defecto]
+        @param atol: tolerancia absoluta del error local [1e-6 por defecto]
+        @param dtmin: paso mínimo; si se necesita uno menor se lanza un error [1e-10 por defecto]
+        @param dtmax: paso máximo [infinito por defecto]
+        @param safety: factor de seguridad del controlador [0.9 por defecto]
+        """
+        self.__asm = assembler
+        self.__tem = temporal
+        self.__rtol = rtol
+        self.__atol = atol
+        self.__dtmin = dtmin
+        self.__dtmax = dtmax
+        self.__safety = safety
+        self.__dt = temporal.deltaT()
+        self.__errOld = 1.0
+        self.__accepted = 0
+        self.__rejected = 0
+        self.__full = None
+        self.__half = None
+
+    def deltaT(self):
+        """
+        Método que regresa el paso que se intentará en la siguiente llamada a step.
+
+        @return dt
+        """
+        return self.__dt
+
+    def accepted(self):
+        """
+        Método que regresa el número de pasos aceptados.
+        """
+        return self.__accepted
+
+    def rejected(self):
+        """
+        Método que regresa el número de pasos rechazados.
+        """
+        return self.__rejected
+
+    def state(self):
+        """
+        Método que regresa el estado del controlador (para reiniciar una simulación, ver Checkpoint).
+
+        @return: (dt, error anterior, aceptados, rechazados)
+        """
+        return (self.__dt, self.__errOld, self.__accepted, self.__rejected)
+
+    def setState(self, state):
+        """
+        Método que restablece el estado que regresó state.
+
+        @param state: estado guardado
+        """
+        self.__dt, self.__errOld, self.__accepted, self.__rejected = state
+
+    def step(self, phi, t, tend = np.inf):
+        """
+        Método que da un paso de tiempo aceptado (repitiéndolo con un dt menor
+        si el error es muy grande) sin pasar de tend.
+
+        @param phi: solución en el tiempo t; se sobrescribe con la nueva
+        @param t: tiempo actual
+        @param tend: tiempo que no se debe rebasar [infinito por defecto]
+        @return: nuevo tiempo
+        """
+        if self.__full is None or self.__full.shape != phi.shape:
+            self.__full = np.empty_like(phi)
+            self.__half = np.empty_like(phi)
+        history = self.__tem.history()
+        while True:
+            dt = min(self.__dt, self.__dtmax)
+            last = t + dt >= tend * (1 - 1e-12)
+            if last:
+                dt = tend - t
+            full = self.__full
+            half = self.__half
+            full[:] = phi
+            half[:] = phi
+            self.__tem.setHistory(history)
+            p = self.__tem.order()
+            self.__tem.setDeltaT(dt)
+            self.__asm.step(full)
+            self.__tem.setHistory(history)
+            self.__tem.setDeltaT(0.5 * dt)
+            self.__asm.step(half, 2)
+            e = (half[1:-1] - full[1:-1]) / (2**p - 1)
+            err = np.max(np.abs(e) / (self.__atol + self.__rtol * np.abs(half[1:-1])))
+            err = max(err, 1e-10)
+            if err <= 1.0:
+                factor = self.__safety * err**(-0.7 / (p + 1)) * self.__errOld**(0.4 / (p + 1))
+                self.__errOld = err
+                if not last or factor < 1:
+                    self.__dt = dt * min(5.0, max(0.2, factor))
+                phi[:] = half
+                self.__accepted += 1
+                return tend if last else t + dt
+            self.__rejected += 1
+            self.__dt = dt * max(0.2, self.__safety * err**(-1.0 / (p + 1)))
+            if self.__dt < self.__dtmin:
+                raise ValueError('El paso de tiempo necesario es menor que dtmin = {}'.format(self.__dtmin))
+
+class ExplicitStepper():
+    """
+    Clase que avanza un problema transitorio con un método explícito sobre los
+    coeficientes de la parte espacial (el Assembler no debe tener parte temporal).
+    """
+
+    methods = ('euler', 'rk2', 'rk3')
+
+    def __init__(self, assembler, rho, dx, method = 'rk3'):
+        """
+        Constructor de la clase.
+
+        @param assembler: objeto Assembler con los términos espaciales y las fronteras (sin setTemporal)
+        @param rho: densidad
+        @param dx: valor de los intervalos en x, o arreglo de anchos (tamaño nvx)
+        @param method: 'euler', 'rk2' (SSP-RK2) o 'rk3' (SSP-RK3) ['rk3' por defecto]
+        """
+        if method not in self.methods:
+            raise ValueError('Método explícito desconocido: {}'.format(method))
+        self.__asm = assembler
+        self.__method = method
+        m = rho * np.asarray(dx, dtype = float)
+        self.__mass = m[1:-1] if m.ndim else m
+        self.__stages = None
+
+    def rate(self, phi, out = None):
+        """
+        Método que calcula dphi/dt en los volúmenes interiores con los coeficientes actuales.
+
+        @param phi: solución (tamaño nvx)
+        @param out: arreglo donde se guarda el resultado (tamaño nvx - 2) [nulo por defecto]
+        @return: dphi/dt
+        """
+        aP, aE, aW, aEE, aWW, Su = self.__asm.assemble().block()
+        r = bandedMatvec(aP, aE, aW, aEE, aWW, phi[1:-1], out = out)
+        np.subtract(Su[1:-1], r, out = r)
+        r /= self.__mass
+        return r
+
+    def step(self, phi, dt, nsteps = 1):
+        """
+        Método que avanza nsteps pasos de tamaño dt.
+
+        @param phi: solución anterior; se sobrescribe con la nueva
+        @param dt: paso de tiempo (ver stableDeltaT)
+        @param nsteps: número de pasos [1 por defecto]
+        @return: phi
+        """
+        if self.__stages is None or self.__stages.shape[1] != phi.shape[0]:
+            self.__stages = np.empty((3, phi.shape[0]))
+        u0, u1, r = self.__stages
+        r = r[1:-1]
+        for n in range(nsteps):
+            x = phi[1:-1]
+            if self.__method == 'euler':
+                x += dt * self.rate(phi, out = r)
+                continue
+            u0[:] = phi
+            u1[:] = phi
+            u1[1:-1] += dt * self.rate(phi, out = r)
+            if self.__method == 'rk2':
+                u1[1:-1] += dt * self.rate(u1, out = r)
+                x[:] = 0.5 * u0[1:-1] + 0.5 * u1[1:-1]
+            else:
+                u1[1:-1] += dt * self.rate(u1, out = r)
+                u1[1:-1] = 0.75 * u0[1:-1] + 0.25 * u1[1:-1]
+                u1[1:-1] += dt * self.rate(u1, out = r)
+                x[:] = u0[1:-1] / 3 + 2 * u1[1:-1] / 3
+        return phi
+
+class PseudoTransient():
+    """
+    Clase que calcula el estado estacionario de un problema con continuación
+    pseudo-transitoria: en cada paso se resuelve
+
+        (rho dx / dt_n + A) phi_nuevo = Su + rho dx / dt_n phi,
+
+    con los coeficientes de la parte espacial (el Assembler no debe tener
+    parte temporal), y el residuo R_n = max |Su - A phi| / (rho dx) se usa
+    para escoger dt_n y para detenerse.
+    """
+
+    def __init__(self, assembler, rho, dx, dt = 1e-2, dtmax = 1e12, exponent = 1.0, rtol = 1e-8, atol = 1e-12, dtol = 0.0):
+        """
+        Constructor de la clase.
+
+        @param assembler: objeto Assembler con los términos espaciales y las fronteras (sin setTemporal)
+        @param rho: densidad
+        @param dx: valor de los intervalos en x, o arreglo de anchos (tamaño nvx)
+        @param dt: paso ficticio inicial [1e-2 por defecto]
+        @param dtmax: paso ficticio máximo [1e12 por defecto]
+        @param exponent: exponente de SER [1 por defecto]
+        @param rtol: se detiene cuando el residuo baja rtol veces el residuo inicial [1e-8 por defecto]
+        @param atol: se detiene cuando el residuo es menor que atol [1e-12 por defecto]
+        @param dtol: se detiene cuando max |cambio de phi| <= dtol max |phi| (0 no se usa) [0 por defecto]
+        """
+        self.__asm = assembler
+        m = rho * np.asarray(dx, dtype = float)
+        self.__mass = m[1:-1] if m.ndim else m
+        self.__dt0 = dt
+        self.__dt = dt
+        self.__dtmax = dtmax
+        self.__exponent = exponent
+        self.__rtol = rtol
+        self.__atol = atol
+        self.__dtol = dtol
+        self.__history = []
+        self.__work = None
+
+    def deltaT(self):
+        """
+        Método que regresa el último paso ficticio.
+
+        @return dt
+        """
+        return self.__dt
+
+    def steps(self):
+        """
+        Método que regresa el número de pasos dados.
+        """
+        return len(self.__history)
+
+    def history(self):
+        """
+        Método que regresa el residuo y el cambio máximo de phi de cada paso.
+
+        @return: lista de parejas (residuo, cambio)
+        """
+        return self.__history
+
+    def residual(self, phi):
+        """
+        Método que calcula el residuo estacionario R = max |Su - A phi| / (rho dx)
+        con los coeficientes de la parte espacial.
+
+        @param phi: solución (tamaño nvx)
+        @return: residuo
+        """
+        aP, aE, aW, aEE, aWW, Su = self.__asm.assemble().block()
+        r = bandedMatvec(aP, aE, aW, aEE, aWW, phi[1:-1])
+        np.subtract(Su[1:-1], r, out = r)
+        r /= self.__mass
+        return np.max(np.abs(r))
+
+    def solve(self, phi, maxsteps = 1000):
+        """
+        Método que avanza en el tiempo ficticio hasta cumplir la tolerancia o dar maxsteps pasos.
+        Cada llamada empieza con el paso ficticio inicial y con el historial vacío.
+
+        @param phi: solución inicial; se sobrescribe con la del estado estacionario
+        @param maxsteps: número máximo de pasos [1000 por defecto]
+        @return: verdadero si se cumplió la tolerancia
+        """
+        self.__history = []
+        self.__dt = self.__dt0
+        if self.__work is None or self.__work.shape[1] != phi.shape[0] - 2:
+            self.__work = np.empty((3, phi.shape[0] - 2))
+        old = self.__work[2]
+        R0 = None
+        for n in range(maxsteps):
+            R = self.residual(phi)
+            if R0 is None:
+                R0 = max(R, 1e-300)
+            if R <= self.__atol + self.__rtol * R0:
+                return True
+            self.__dt = min(self.__dtmax, self.__dt0 * (R0 / R)**self.__exponent)
+            aP, aE, aW, aEE, aWW, Su = self.__asm.assemble().block()
+            m_dt = self.__mass / self.__dt
+            aP[1:-1] += m_dt
+            Su[1:-1] += m_dt * phi[1:-1]
+            self.__asm.modified(0, 5)
+            old[:] = phi[1:-1]
+            if aEE[1:-1].any() or aWW[1:-1].any():
+                pdma(aP, aE, aW, aEE, aWW, Su[1:-1], x = phi[1:-1], work = self.__work[:2])
+            else:
+                tdma(aP, aE, aW, Su[1:-1], x = phi[1:-1], work = self.__work[0])
+            old -= phi[1:-1]
+            change = np.max(np.abs(old))
+            self.__history.append((R, change))
+            if change <= self.__dtol * np.max(np.abs(phi[1:-1])):
+                return True
+        return False
+
+def stableDeltaT(u, Gamma, dx, rho = 1.0, scheme = 'UpW', method = 'rk3', safety = 0.9):
+    """
+    Función que calcula el paso de tiempo estable de los métodos explícitos a
+    partir del número de Courant C = |u| dt / dx y del número de difusión
+    D = Gamma dt / (rho dx^2):
+
+        UpW: C + 2 D <= 1 (Euler, y también SSP-RK2 y SSP-RK3, cuyo
+            coeficiente SSP es 1: los coeficientes de UpW son positivos).
+        CD con Euler o SSP-RK2: D <= 1/2 y C^2 <= 2 D (sin difusión es inestable).
+        CD con SSP-RK3: C / sqrt(3) + 4 D / 2.51 <= 1 (límites del método en
+            los ejes imaginario y real).
+        UpW2 y QUICK: tienen coeficientes negativos, así que Euler no es
+            estable con C + 2 D <= 1; el paso se obtiene de los coeficientes
+            ensamblados (ver _stencilDeltaT).
+
+    @param u: velocidad (escalar o arreglo en las caras)
+    @param Gamma: coeficiente de difusión
+    @param dx: valor de los intervalos en x, o arreglo de anchos (se usa el menor)
+    @param rho: densidad [1 por defecto]
+    @param scheme: esquema de la advección, 'CD' (o ''), 'UpW', 'UpW2' o 'QUICK' ['UpW' por defecto]
+    @param method: 'euler', 'rk2' o 'rk3' ['rk3' por defecto]
+    @param safety: fracción del límite que se usa [0.9 por defecto]
+    @return: paso de tiempo
+    """
+    h = np.asarray(dx, dtype = float)
+    h = h[1:-1].min() if h.ndim else float(h)
+    a = np.max(np.abs(u)) / h
+    d = Gamma / (rho * h**2)
+    if scheme == 'UpW':
+        return safety / (a + 2 * d)
+    if scheme in ('UpW2', 'QUICK'):
+        return safety * _stencilDeltaT(a, d, scheme, method)
+    if method == 'rk3':
+        return safety / (a / np.sqrt(3) + 4 * d / 2.51)
+    if d == 0:
+        raise ValueError('Diferencias centradas con {} y sin difusión es inestable'.format(method))
+    return safety * min(0.5 / d, 2 * d / a**2 if a > 0 else np.inf)
+
+def _stencilDeltaT(a, d, scheme, method):
+    """
+    Regresa el mayor dt estable de un esquema con coeficientes negativos. Se
+    ensambla un problema pequeño con rho = dx = 1, u = a, Gamma = d y
+    fronteras de Dirichlet, y se toma el menor de dos límites:
+
+        - von Neumann con los coeficientes de un volumen interior: para cada
+          modo exp(i k x) el operador vale
+              z(k) = -(aP - aE e^(ik) - aW e^(-ik) - aEE e^(2ik) - aWW e^(-2ik))
+          y se pide |R(dt z(k))| <= 1, con R el polinomio del método
+          (1 + z, 1 + z + z^2/2 o 1 + z + z^2/2 + z^3/6); esto captura los
+          modos largos, para los que Euler y SSP-RK2 necesitan difusión,
+        - Gershgorin con todos los renglones (incluyendo los de las
+          fronteras, que con UpW2 y QUICK tienen aP más grande):
+              dt <= 2 / max(aP + |aE| + |aW| + |aEE| + |aWW|),
+          el disco |1 + z| <= 1 de Euler, que también está en la región de
+          SSP-RK2 y SSP-RK3 (con coeficientes positivos es C + 2 D <= 1).
+    """
+    nvx = 11
+    coef = Coefficients(nvx, 1.0, private = True)
+    coef.alloc(nvx)
+    adv1 = Advection1D(nvx, 1.0, 1.0, coefficients = coef)
+    adv1.setU(float(a))
+    asm = Assembler(coef)
+    asm.addTerm(Diffusion1D(nvx, d, 1.0, coefficients = coef))
+    asm.addTerm(adv1, scheme, 0.0, 0.0, d)
+    asm.addBoundary('LEFT_WALL', 'Dirichlet', 0.0)
+    asm.addBoundary('RIGHT_WALL', 'Dirichlet', 0.0)
+    aP, aE, aW, aEE, aWW, Su = (c[1:-1].copy() for c in asm.assemble().block())
+    aW[0] = aWW[:2] = aE[-1] = aEE[-2:] = 0
+    g = 2 / np.max(np.abs(aP) + np.abs(aE) + np.abs(aW) + np.abs(aEE) + np.abs(aWW))
+    i = nvx // 2 - 1
+    k = np.concatenate((np.geomspace(1e-3, 0.1, 50, endpoint = False), np.linspace(0.1, np.pi, 200)))
+    e = np.exp(1j * k)
+    z = -(aP[i] - aE[i] * e - aW[i] / e - aEE[i] * e**2 - aWW[i] / e**2)
+    R = {'euler': (1, 1), 'rk2': (1, 1, 1 / 2), 'rk3': (1, 1, 1 / 2, 1 / 6)}[method]
+    dt = 3.0 / np.abs(z).max() * np.geomspace(1e-6, 1, 1000)
+    bad = np.flatnonzero((np.abs(np.polyval(R[::-1], np.outer(dt, z))) > 1 + 1e-12).any(axis = 1))
+    if bad.size and bad[0] == 0:
+        raise ValueError('{} con {} es inestable con este número de difusión'.format(scheme, method))
+    return min(g, dt[bad[0] - 1] if bad.size else dt[-1])
+
+if __name__ == '__main__':
+
+    import time
+    from Temporal import Temporal1D, BDF2Temporal1D
+
+#
+# Problema de la Tarea-6.1 (N = 350): paso fijo contra paso adaptativo,
+# ambos comparados con una solución de dt muy pequeño
+#
+    nvx = 351
+    dx = 2.5 / (nvx - 1)
+
+    def problem(dt, theta, scheme = '', temporal = True):
+        coef = Coefficients(nvx, dx, private = True)
+        coef.alloc(nvx)
+        adv1 = Advection1D(nvx, 1.0, dx, coefficients = coef)
+        adv1.setU(1.0)
+        if theta == 'BDF2':
+            tem = BDF2Temporal1D(nvx, 1.0, dx, dt, coefficients = coef)
+        else:
+            tem = Temporal1D(nvx, 1.0, dx, dt, coefficients = coef, theta = theta)
+        asm = Assembler(coef)
+        asm.addTerm(Diffusion1D(nvx, 0.001, dx, coefficients = coef))
+        asm.addTerm(adv1, scheme, 1.0, 0.0, 0.001 / dx)
+        asm.addBoundary('LEFT_WALL', 'Dirichlet', 1.0)
+        asm.addBoundary('RIGHT_WALL', 'Dirichlet', 0.0)
+        if temporal:
+            asm.setTemporal(tem)
+        phi = np.zeros(nvx)
+        phi[0] = 1.0
+        return asm, tem, phi
+
+    asm, tem, ref = problem(0.0002, 0.5)
+    asm.step(ref, 5000)
+    asm, tem, phi = problem(0.002, 1.0)
+    asm.step(phi, 500)
+    print('{:>28s}: pasos = {:4d}, error = {:.3e}'.format('fijo, implícito, dt = 0.002', 500, np.abs(phi - ref).max()))
+    for theta, rtol in ((1.0, 1e-2), (0.5, 1e-3), (0.5, 1e-4), ('BDF2', 1e-3), ('BDF2', 1e-4)):
+        asm, tem, phi = problem(1e-4, theta)
+        stepper = AdaptiveStepper(asm, tem, rtol = rtol, atol = 1e-4)
+        t = 0.0
+        while t < 1.0:
+            t = stepper.step(phi, t, 1.0)
+        name = 'theta = {}, rtol = {:.0e}'.format(theta, rtol)
+        print('{:>28s}: pasos = {:4d} (rechazados {}), error = {:.3e}, dt final = {:.3e}'.format(
+              name, stepper.accepted(), stepper.rejected(), np.abs(phi - ref).max(), stepper.deltaT()))
+    print('-' * 20)
+
+#
+# Métodos explícitos con el paso estable, contra Euler implícito con dt = 0.002;
+# con todos los esquemas la solución debe quedar acotada (max |phi| del
+# orden de la del implícito)
+#
+    for scheme in ('UpW', 'CD', 'UpW2', 'QUICK'):
+        asm, tem, ref = problem(0.00005, 0.5, scheme)
+        asm.step(ref, 20000)
+        asm, tem, phi = problem(0.002, 1.0, scheme)
+        t1 = time.time()
+        asm.step(phi, 500)
+        print('{:>5s}, {:>9s}: pasos = {:4d}, error = {:.3e}, max |phi| = {:.3f}, tiempo = {:.3f} s'.format(
+              scheme, 'implícito', 500, np.abs(phi - ref).max(), np.abs(phi).max(), time.time() - t1))
+        for method in ExplicitStepper.methods:
+            dt = stableDeltaT(1.0, 0.001, dx, scheme = scheme, method = method)
+            n = int(np.ceil(1.0 / dt))
+            asm, tem, phi = problem(dt, 1.0, scheme, temporal = False)
+            t1 = time.time()
+            ExplicitStepper(asm, 1.0, dx, method).step(phi, 1.0 / n, n)
+            print('{:>5s}, {:>9s}: pasos = {:4d}, error = {:.3e}, max |phi| = {:.3f}, tiempo = {:.3f} s'.format(
+                  scheme, method, n, np.abs(phi - ref).max(), np.abs(phi).max(), time.time() - t1))
+    print('-' * 20)
+
+#
+# Estado estacionario del mismo problema: marcha con dt fijo contra
+# continuación pseudo-transitoria (SER)
+#
+    for scheme in ('UpW', 'CD'):
+        asm, tem, ref = problem(1.0, 1.0, scheme, temporal = False)
+        aP, aE, aW, aEE, aWW, Su = asm.assemble().block()
+        tdma(aP, aE, aW, Su[1:-1], x = ref[1:-1])
+        asm, tem, phi = problem(0.002, 1.0, scheme)
+        t1 = time.time()
+        n = 0
+        while n < 100000:
+            old = phi.copy()
+            asm.step(phi)
+            n += 1
+            if np.max(np.abs(phi - old)) <= 1e-12:
+                break
+        print('{:>3s}, {:>14s}: pasos = {:5d}, error = {:.3e}, tiempo = {:.3f} s'.format(
+              scheme, 'dt = 0.002', n, np.abs(phi - ref).max(), time.time() - t1))
+        asm, tem, phi = problem(0.002, 1.0, scheme, temporal = False)
+        t1 = time.time()
+        ptc = PseudoTransient(asm, 1.0, dx, dt = 0.002, rtol = 1e-10)
+        ptc.solve(phi)
+        print('{:>3s}, {:>14s}: pasos = {:5d}, error = {:.3e}, tiempo = {:.3f} s, dt final = {:.1e}'.format(
+              scheme, 'SER', ptc.steps(), np.abs(phi - ref).max(), time.time() - t1, ptc.deltaT()))
+        steps, dt = ptc.steps(), ptc.deltaT()
+        phi = problem(0.002, 1.0, scheme, temporal = False)[2]
+        ptc.solve(phi)
+        print('{:>3s}, {:>14s}: mismos pasos y dt = {}'.format(scheme, 'SER de nuevo', (ptc.steps(), ptc.deltaT()) == (steps, dt)))
+    print('-' * 20)
@@ -9,15 +9,155 @@ Documented by: Daniel Becerra Pedraza
 #
 # @Author : Luis M. de la Cruz Salas, 2018
 #
+# Las curvas con más puntos que la resolución de la figura se reducen con
+# LTTB (Largest-Triangle-Three-Buckets), que conserva la forma (picos y
+# frentes) de la curva.
+#
+# Con setMode('async') grafica sólo copia los arreglos a una cola y regresa;
+# un hilo los reduce y los dibuja en una figura de Matplotlib sin pyplot
+# (Agg, sin ventana), y show espera a que se vacíe la cola y guarda el
+# archivo. Así graficar dentro del ciclo de tiempo casi no cuesta.
+#
+import queue
+import threading
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 #plt.style.use('ggplot')
 
+_mode = 'sync'
+_points = None
+_renderer = None
+
+def setMode(mode = 'sync', points = None):
+    """
+    Función que escoge cómo se grafica.
+    
+    @param mode: 'sync' (pyplot, en el mismo hilo) o 'async' (hilo con Agg, show sólo guarda el archivo) ['sync' por defecto]
+    @param points: número de puntos al que se reducen las curvas [nulo por defecto: dos por pixel del ancho de la figura]
+    """
+    global _mode, _points, _renderer
+    if mode not in ('sync', 'async'):
+        raise ValueError('Modo desconocido: {}'.format(mode))
+    if _renderer is not None:
+        _renderer.stop()
+        _renderer = None
+    _mode = mode
+    _points = points
+    if mode == 'async':
+        _renderer = _Renderer()
+
+def lttb(x, y, n):
+    """
+    Función que reduce una curva a n puntos con LTTB: se conservan el primer y
+    el último punto, y en cada uno de los n - 2 grupos intermedios el punto que
+    forma el triángulo de mayor área con el punto escogido en el grupo
+    anterior y el promedio del grupo siguiente.
+    
+    @param x: arreglo de valores en el eje horizontal
+    @param y: arreglo de valores en el eje vertical
+    @param n: número de puntos de la curva reducida
+    @return: (x, y) reducidos (los mismos arreglos si tienen n puntos o menos)
+    """
+    size = len(x)
+    if n >= size or n < 3:
+        return x, y
+    x = np.asarray(x)
+    y = np.asarray(y)
+    edges = (np.arange(n - 1) * ((size - 2) / (n - 2))).astype(int) + 1
+    edges[-1] = size - 1
+    count = np.diff(np.append(edges, size))
+    mx = np.add.reduceat(x, edges) / count
+    my = np.add.reduceat(y, edges) / count
+    index = np.empty(n, dtype = int)
+    index[0] = a = 0
+    index[-1] = size - 1
+    xa, ya = x[0], y[0]
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((xa - mx[i + 1]) * (y[lo:hi] - ya) - (xa - x[lo:hi]) * (my[i + 1] - ya))
+        a = lo + area.argmax()
+        index[i + 1] = a
+        xa, ya = x[a], y[a]
+    return x[index], y[index]
+
+def _pixels(fig):
+    """
+    Regresa el número de puntos de las curvas: points o dos por pixel del ancho de la figura.
+    """
+    if _points is not None:
+        return _points
+    return int(2 * fig.get_figwidth() * fig.dpi)
+
+def _draw(ax, x, phi, title, label, kind):
+    """
+    Dibuja una curva (reducida con LTTB) en los ejes ax.
+    """
+    x, phi = lttb(x, phi, _pixels(ax.figure))
+    ax.set_title(title)
+    ax.set_xlabel('$x$ [m]')
+    ax.set_ylabel('$\phi$ [...]')
+    if kind:
+        ax.plot(x,phi,kind,label=label,lw=2)
+    else:
+        ax.plot(x,phi,'--', label = label)
+
+class _Renderer():
+    """
+    Hilo que dibuja las curvas de la cola en una figura Agg.
+    """
+
+    def __init__(self):
+        self.__queue = queue.Queue()
+        self.__new()
+        self.__thread = threading.Thread(target = self.__run, daemon = True)
+        self.__thread.start()
+
+    def put(self, item):
+        self.__queue.put(item)
+
+    def join(self):
+        self.__queue.join()
+        if self.__error is not None:
+            e, self.__error = self.__error, None
+            raise e
+
+    def stop(self):
+        self.__queue.put(None)
+        self.__thread.join()
+
+    def __new(self):
+        self.__fig = Figure()
+        FigureCanvasAgg(self.__fig)
+        self.__ax = self.__fig.add_subplot()
+        self.__error = None
+
+    def __run(self):
+        while True:
+            item = self.__queue.get()
+            try:
+                if item is None:
+                    return
+                if item[0] == 'plot':
+                    _draw(self.__ax, *item[1:])
+                else:
+                    self.__ax.legend()
+                    self.__ax.grid()
+                    if item[1]:
+                        self.__fig.savefig(item[1])
+                    self.__new()
+            except Exception as e:
+                self.__error = e
+            finally:
+                self.__queue.task_done()
+
 def grafica(x, phi, title = None, label = None, kind = None):
     """
     Función que se encarga de comenzarla graficación de un arreglo de valores (phi) correspondientes a otro arreglo de valores (x).
+    Con setMode('async') sólo se copian los arreglos y la curva se dibuja en otro hilo.
     
     @param x: arreglo de valores que se graficarán en el eje horizontal
     @param phi: arreglo de valores que se graficarán en el eje vertical
@@ -25,20 +165,22 @@ def grafica(x, phi, title = None, label = None, kind = None):
     @param label: etiqueta de los vaores a graficar
     @param kind: método de graficación (línea contínua, segmentada, punteada, puntos, cuadrados, estrellas, etc.)
     """
-    plt.title(title)
-    plt.xlabel('$x$ [m]')
-    plt.ylabel('$\phi$ [...]')
-    if kind:
-        plt.plot(x,phi,kind,label=label,lw=2)
-    else:
-        plt.plot(x,phi,'--', label = label)
+    if _renderer is not None:
+        _renderer.put(('plot', np.array(x), np.array(phi), title, label, kind))
+        return
+    _draw(plt.gca(), x, phi, title, label, kind)
 
 def show(filename = None):
     """
     Función que se encarga de mostrar alguna gráfica construida previamente.
+    Con setMode('async') espera a que se dibujen las curvas pendientes y sólo guarda el archivo.
     
     @param filename: nombre del archivo en el que se desea guardar la gráfica [nulo por defecto]
     """
+    if _renderer is not None:
+        _renderer.put(('show', filename))
+        _renderer.join()
+        return
     plt.legend()
     plt.grid()
     if filename:
@@ -62,4 +204,36 @@ if __name__ == '__main__':
         return line
     ani = FuncAnimation(fig, animate, np.arange(1,10), interval=100)
     plt.show()
-    
\ No newline at end of file
+    
+
+#
+# Tiempo de 20 llamadas a grafica con un frente de 200000 puntos: pyplot
+# con todos los puntos, pyplot con LTTB y en segundo plano
+#
+    import os
+    import time
+    import tempfile
+    x = np.linspace(0, 2.5, 2 * 10**5)
+    curves = [0.5 * special.erfc((x - 0.1 * k) / 0.01) for k in range(20)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, points in (('sync', 10**7), ('sync', None), ('async', None)):
+            setMode(mode, points)
+            t1 = time.time()
+            for k in range(20):
+                grafica(x, curves[k], label = 'Step = {}'.format(k))
+            t2 = time.time()
+            name = os.path.join(tmp, 'frente.png')
+            if mode == 'sync':
+                plt.legend(loc = 'upper right')
+                plt.savefig(name)
+                plt.close()
+            else:
+                show(name)
+            print('{:5s}, puntos = {:>8}: ciclo = {:.3f} s, total = {:.3f} s'.format(
+                  mode, points or 'pixeles', t2 - t1, time.time() - t1))
+    setMode('sync')
+    x = np.linspace(0, 1, 10**5)
+    y = np.where(x > 0.5, 1.0, 0.0) + 0.01 * np.sin(200 * x)
+    xr, yr = lttb(x, y, 100)
+    print('LTTB: {} -> {} puntos, max y = {:.3f} ({:.3f}), min y = {:.3f} ({:.3f})'.format(
+          x.size, xr.size, yr.max(), y.max(), yr.min(), y.min()))